@@ -7,6 +7,7 @@ import asyncio
 import time
 import statistics
 import sys
+import tracemalloc
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
@@ -19,7 +20,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from utils.crc import CRC16ARC
 from core.parser import FrameParser
 from core.processor import DBCProcessor
-from core.models import CommAddr, CommData, ParsedMessage
+from core.models import CommAddr, CommAddrRecord, CommData, CommDataRecord, ParsedMessage
 from interfaces.grpc.server import GRPCServer
 from service import DBCService
 from config import Settings, GRPCConfig, ProcessingConfig, MetricsConfig
@@ -38,6 +39,21 @@ class BenchmarkResult:
     memory_usage_mb: float
 
 
+def _grpc_load_client(port: int, frames: bytes, duration: float) -> int:
+    """Клиент нагрузки (отдельный процесс, своё соединение): кадров обработано за duration"""
+    import grpc
+    from interfaces.grpc.protocol import pb2, pb2_grpc
+
+    processed = 0
+    with grpc.insecure_channel(f"127.0.0.1:{port}") as channel:
+        stub = pb2_grpc.DBCServiceStub(channel)
+        request = pb2.FrameBatchRequest(topic="load", frames=frames)
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            processed += stub.ProcessFrameBatch(request, timeout=30).count
+    return processed
+
+
 class BenchmarkRunner:
     def __init__(self):
         self.results: List[BenchmarkResult] = []
@@ -110,7 +126,55 @@ BO_ 300 HighFreqMessage: 8 Vector__XXX
             errors=errors,
             memory_usage_mb=0  # Minimal memory for CRC
         )
-    
+
+    async def benchmark_crc_modes(self, num_frames: int = 100000) -> List[BenchmarkResult]:
+        """Сравнение побитового, табличного и пакетного расчёта CRC"""
+        print(f"🔧 Benchmarking CRC modes ({num_frames:,} frames, backend={CRC16ARC.BACKEND})...")
+
+        frames = [self.create_test_frame(dev_addr=(i % 31) + 1, msg_id=(i % 500) + 100,
+                                         payload=bytes([(i + j) % 256 for j in range(8)]))
+                  for i in range(num_frames)]
+        buffer = b"".join(frames)
+
+        results = []
+        modes = [
+            ("CRC Bitwise", CRC16ARC.calculate_bitwise),
+            ("CRC Table", CRC16ARC.calculate_table),
+            (f"CRC Default ({CRC16ARC.BACKEND})", CRC16ARC.calculate),
+        ]
+
+        for name, func in modes:
+            errors = 0
+            start_time = time.perf_counter()
+            for frame in frames:
+                if func(frame[:10]) != int.from_bytes(frame[10:12], "little"):
+                    errors += 1
+            duration = time.perf_counter() - start_time
+            results.append(self._throughput_result(name, num_frames, duration, errors))
+
+        start_time = time.perf_counter()
+        mask = CRC16ARC.calculate_many(buffer)
+        duration = time.perf_counter() - start_time
+        results.append(
+            self._throughput_result("CRC Bulk (numpy)", num_frames, duration, int((~mask).sum()))
+        )
+
+        return results
+
+    def _throughput_result(self, name: str, count: int, duration: float, errors: int) -> BenchmarkResult:
+        """Результат для бенчмарков без замера латентности отдельных операций"""
+        return BenchmarkResult(
+            test_name=name,
+            total_messages=count,
+            duration=duration,
+            messages_per_second=count / duration,
+            avg_latency_ms=duration * 1000 / count,
+            p95_latency_ms=0,
+            p99_latency_ms=0,
+            errors=errors,
+            memory_usage_mb=0
+        )
+
     async def benchmark_frame_parsing(self, num_frames: int = 50000) -> BenchmarkResult:
         """Бенчмарк парсинга CAN кадров"""
         print(f"📋 Benchmarking frame parsing ({num_frames:,} frames)...")
@@ -156,6 +220,131 @@ BO_ 300 HighFreqMessage: 8 Vector__XXX
             memory_usage_mb=self.get_memory_usage()
         )
     
+    async def benchmark_batch_parsing(self, num_frames: int = 200000, batch_size: int = 1000) -> BenchmarkResult:
+        """Бенчмарк пакетного парсинга (parse_batch)"""
+        print(f"📦 Benchmarking batch parsing ({num_frames:,} frames, batch={batch_size})...")
+
+        parser = FrameParser()
+        frames = [
+            self.create_test_frame(dev_addr=(i % 31) + 1, msg_id=(i % 500) + 100)
+            for i in range(batch_size)
+        ]
+        buffer = b"".join(frames)
+        num_batches = num_frames // batch_size
+
+        latencies = []
+        errors = 0
+
+        start_time = time.perf_counter()
+
+        for _ in range(num_batches):
+            op_start = time.perf_counter()
+            batch = await parser.parse_batch(buffer)
+            errors += int(batch.rejected.sum())
+            latencies.append((time.perf_counter() - op_start) * 1000)
+
+        duration = time.perf_counter() - start_time
+
+        await parser.close()
+
+        return BenchmarkResult(
+            test_name=f"Batch Parsing (x{batch_size})",
+            total_messages=num_batches * batch_size,
+            duration=duration,
+            messages_per_second=num_batches * batch_size / duration,
+            avg_latency_ms=statistics.mean(latencies),
+            p95_latency_ms=float(np.percentile(latencies, 95)),
+            p99_latency_ms=float(np.percentile(latencies, 99)),
+            errors=errors,
+            memory_usage_mb=self.get_memory_usage()
+        )
+
+    async def benchmark_frame_records(self, num_frames: int = 1_000_000) -> List[BenchmarkResult]:
+        """Сравнение pydantic моделей и __slots__ записей: память и скорость создания"""
+        print(f"🧱 Benchmarking frame records ({num_frames:,} frames)...")
+
+        payload = bytes([0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08])
+
+        def build_models():
+            return [
+                CommData(frame_id=CommAddr(dev_addr=i & 0x1F, msg_id=i & 0x3FF, reserved=0),
+                         data=payload, crc16=0x1234)
+                for i in range(num_frames)
+            ]
+
+        def build_records():
+            return [
+                CommDataRecord(CommAddrRecord(i & 0x1F, i & 0x3FF, 0), payload, 0x1234)
+                for i in range(num_frames)
+            ]
+
+        results = []
+        for name, build in [("Pydantic CommData", build_models), ("Slots CommDataRecord", build_records)]:
+            tracemalloc.start()
+            start_time = time.perf_counter()
+            frames = build()
+            duration = time.perf_counter() - start_time
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del frames
+
+            result = self._throughput_result(name, num_frames, duration, 0)
+            result.memory_usage_mb = peak / 1024 / 1024
+            results.append(result)
+
+        return results
+
+    async def benchmark_frame_allocations(self, num_frames: int = 50000) -> List[BenchmarkResult]:
+        """
+        Аллокации на кадр (tracemalloc) в покадровом пути parse + process:
+        eager - строки raw_payload/crc16 формируются сразу (как в ParsedMessage),
+        lazy - ParsedMessageRecord без обращения к строковым полям.
+        """
+        print(f"🧮 Benchmarking allocations per frame ({num_frames:,} frames)...")
+
+        tmp_path = Path("/tmp/dbc_benchmark")
+        tmp_path.mkdir(exist_ok=True)
+        processor = DBCProcessor(self.create_test_dbc_file(tmp_path), cache_enabled=False)
+        await processor.initialize()
+        parser = FrameParser()
+
+        frames = [
+            self.create_test_frame(dev_addr=(i % 31) + 1, msg_id=[100, 200, 300][i % 3],
+                                   payload=(i * 2654435761 % (1 << 64)).to_bytes(8, "little"))
+            for i in range(num_frames)
+        ]
+
+        def run(eager: bool) -> list:
+            results = []
+            for frame in frames:
+                message = processor._process_sync(parser._parse_sync(frame), "bench")
+                results.append(message.to_model() if eager else message)
+            return results
+
+        results = []
+        for name, eager in (("Eager ParsedMessage", True), ("Lazy ParsedMessageRecord", False)):
+            tracemalloc.start()
+            start_time = time.perf_counter()
+            kept = run(eager)
+            duration = time.perf_counter() - start_time
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            stats = snapshot.statistics("filename")
+            blocks = sum(stat.count for stat in stats) / num_frames
+            size = sum(stat.size for stat in stats) / num_frames
+            print(f"   {name:<26} {blocks:5.1f} blocks/frame {size:7.1f} bytes/frame "
+                  f"(peak {peak / num_frames:.0f} bytes/frame)")
+            del kept
+
+            result = self._throughput_result(f"Alloc {name}", num_frames, duration, 0)
+            result.memory_usage_mb = size * num_frames / 1024 / 1024
+            results.append(result)
+
+        await processor.close()
+        return results
+
     async def benchmark_dbc_processing(self, num_messages: int = 25000) -> BenchmarkResult:
         """Бенчмарк DBC обработки"""
         print(f"🗃️  Benchmarking DBC processing ({num_messages:,} messages)...")
@@ -215,6 +404,35 @@ BO_ 300 HighFreqMessage: 8 Vector__XXX
             memory_usage_mb=self.get_memory_usage()
         )
     
+    async def benchmark_columnar_decode(self, num_frames: int = 300000) -> List[BenchmarkResult]:
+        """Построчное декодирование против колоночного decode_batch"""
+        print(f"🧮 Benchmarking columnar decode ({num_frames:,} frames)...")
+
+        tmp_path = Path("/tmp/dbc_benchmark")
+        tmp_path.mkdir(exist_ok=True)
+        processor = DBCProcessor(self.create_test_dbc_file(tmp_path))
+        await processor.initialize()
+
+        rng = np.random.default_rng(0)
+        msg_ids = np.array([100, 200, 300], dtype=np.uint16)[rng.integers(0, 3, num_frames)]
+        payloads = rng.integers(0, 256, size=(num_frames, 8), dtype=np.uint8)
+
+        start_time = time.perf_counter()
+        for can_id, row in zip(msg_ids.tolist(), payloads):
+            processor._decoders[can_id].decode(row.tobytes())
+        row_duration = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        await processor.decode_batch(msg_ids, payloads)
+        column_duration = time.perf_counter() - start_time
+
+        await processor.close()
+
+        return [
+            self._throughput_result("Row Decode (compiled)", num_frames, row_duration, 0),
+            self._throughput_result("Columnar decode_batch", num_frames, column_duration, 0),
+        ]
+
     async def benchmark_grpc_publishing(self, num_messages: int = 20000) -> BenchmarkResult:
         """Бенчмарк gRPC публикации"""
         print(f"🌐 Benchmarking gRPC publishing ({num_messages:,} messages)...")
@@ -375,6 +593,389 @@ BO_ 300 HighFreqMessage: 8 Vector__XXX
             memory_usage_mb=self.get_memory_usage()
         )
     
+    async def benchmark_batch_size_curve(
+        self, num_frames: int = 20000, batch_sizes: tuple = (1, 10, 100, 500, 1000, 5000)
+    ) -> List[BenchmarkResult]:
+        """Кривая пропускная способность / латентность в зависимости от max_batch_size"""
+        print(f"📈 Benchmarking batch size curve ({num_frames:,} frames, sizes={batch_sizes})...")
+
+        tmp_path = Path("/tmp/dbc_benchmark")
+        tmp_path.mkdir(exist_ok=True)
+        dbc_file = self.create_test_dbc_file(tmp_path)
+
+        frames = [
+            self.create_test_frame(dev_addr=(i % 31) + 1, msg_id=[100, 200, 300][i % 3])
+            for i in range(num_frames)
+        ]
+
+        results = []
+        for batch_size in batch_sizes:
+            settings = Settings(
+                dbc_file=dbc_file,
+                grpc=GRPCConfig(host="localhost", port=50058, max_workers=4),
+                processing=ProcessingConfig(max_batch_size=batch_size, batch_timeout_ms=5.0),
+                metrics=MetricsConfig(enabled=False)
+            )
+            service = DBCService(settings)
+            await service.dbc_processor.initialize()
+
+            submitted: Dict[str, float] = {}
+            latencies: List[float] = []
+
+            async def publish(message, _latencies=latencies, _submitted=submitted):
+                _latencies.append((time.perf_counter() - _submitted[message.source_topic]) * 1000)
+                return True
+
+            service.grpc_server.publish_message = publish
+            await service.batcher.start()
+
+            start_time = time.perf_counter()
+            for i, frame in enumerate(frames):
+                topic = str(i)
+                submitted[topic] = time.perf_counter()
+                await service.submit_message(topic, frame)
+            await service.batcher.stop()
+            duration = time.perf_counter() - start_time
+
+            await service.shutdown()
+
+            results.append(BenchmarkResult(
+                test_name=f"Batching (size={batch_size})",
+                total_messages=num_frames,
+                duration=duration,
+                messages_per_second=num_frames / duration,
+                avg_latency_ms=statistics.mean(latencies),
+                p95_latency_ms=float(np.percentile(latencies, 95)),
+                p99_latency_ms=float(np.percentile(latencies, 99)),
+                errors=service.stats["errors"],
+                memory_usage_mb=self.get_memory_usage()
+            ))
+
+        return results
+
+    async def benchmark_worker_pool(self, num_frames: int = 200000, batch_size: int = 5000,
+                                    workers: int = 4) -> List[BenchmarkResult]:
+        """Parse + decode в основном процессе против пула процессов (shared memory)"""
+        print(f"🧵 Benchmarking decode worker pool ({num_frames:,} frames, {workers} workers)...")
+
+        from core.workers import DecodeWorkerPool
+
+        tmp_path = Path("/tmp/dbc_benchmark")
+        tmp_path.mkdir(exist_ok=True)
+        processor = DBCProcessor(self.create_test_dbc_file(tmp_path))
+        await processor.initialize()
+        parser = FrameParser()
+
+        buffer = b"".join(
+            self.create_test_frame(dev_addr=(i % 31) + 1, msg_id=[100, 200, 300][i % 3],
+                                   payload=bytes([(i + j) % 256 for j in range(8)]))
+            for i in range(batch_size)
+        )
+        num_batches = num_frames // batch_size
+
+        start_time = time.perf_counter()
+        for _ in range(num_batches):
+            batch = await parser.parse_batch(buffer)
+            processor.decode_frames(batch)
+        inline_duration = time.perf_counter() - start_time
+
+        pool = DecodeWorkerPool(processor.dbc_file, workers=workers, slot_frames=batch_size)
+        await pool.start(processor)
+        start_time = time.perf_counter()
+        await asyncio.gather(*[pool.process(buffer) for _ in range(num_batches)])
+        pool_duration = time.perf_counter() - start_time
+        await pool.close()
+        await processor.close()
+
+        total = num_batches * batch_size
+        return [
+            self._throughput_result("Decode Inline", total, inline_duration, 0),
+            self._throughput_result(f"Decode Pool (x{workers})", total, pool_duration, 0),
+        ]
+
+    async def benchmark_dbc_startup(self, num_messages: int = 2000, runs: int = 3) -> List[BenchmarkResult]:
+        """Старт процессора: разбор DBC против предкомпилированного артефакта (.dbcc)"""
+        print(f"📦 Benchmarking DBC startup ({num_messages:,} messages)...")
+
+        from core.artifact import artifact_path
+
+        tmp_path = Path("/tmp/dbc_benchmark")
+        tmp_path.mkdir(exist_ok=True)
+        lines = ['VERSION ""', ""]
+        for i in range(num_messages):
+            lines.append(f"BO_ {i + 1} Message{i}: 8 Vector__XXX")
+            for j in range(8):
+                lines.append(f' SG_ Signal{i}_{j} : {j * 8}|8@1+ (0.5,{j}) [0|255] "V" Vector__XXX')
+            lines.append("")
+        dbc_file = tmp_path / "startup.dbc"
+        dbc_file.write_text("\n".join(lines))
+        artifact_path(dbc_file).unlink(missing_ok=True)
+
+        async def startup(use_artifact: bool) -> float:
+            processor = DBCProcessor(dbc_file, use_artifact=use_artifact)
+            start = time.perf_counter()
+            await processor.initialize()
+            duration = time.perf_counter() - start
+            await processor.close()
+            return duration
+
+        parse = min([await startup(False) for _ in range(runs)])
+        build = await startup(True)  # первая загрузка: разбор + запись артефакта
+        cached = min([await startup(True) for _ in range(runs)])
+
+        print(f"   parse {parse * 1000:.0f} ms, build {build * 1000:.0f} ms, artifact {cached * 1000:.0f} ms "
+              f"(x{parse / cached:.1f})")
+        return [
+            self._throughput_result("DBC Startup (parse)", num_messages, parse, 0),
+            self._throughput_result("DBC Startup (artifact)", num_messages, cached, 0),
+        ]
+
+    async def benchmark_multiprocess_scaling(self, max_workers: int = 4, duration: float = 5.0,
+                                             batch_size: int = 1000) -> List[BenchmarkResult]:
+        """Супервизор с 1..max_workers процессами на одном порту (SO_REUSEPORT)"""
+        print(f"🔀 Benchmarking multi-process scaling (1..{max_workers} workers, {duration:.0f}s each)...")
+
+        import multiprocessing as mp
+        import socket
+        from concurrent.futures import ProcessPoolExecutor
+        from config import SupervisorConfig
+        from supervisor import Supervisor
+
+        tmp_path = Path("/tmp/dbc_benchmark")
+        tmp_path.mkdir(exist_ok=True)
+        dbc_file = self.create_test_dbc_file(tmp_path)
+        frames = b"".join(
+            self.create_test_frame(dev_addr=(i % 31) + 1, msg_id=[100, 200, 300][i % 3])
+            for i in range(batch_size)
+        )
+        # Клиентов больше, чем воркеров: нагрузка не упирается в клиента
+        clients = max_workers * 2
+        loop = asyncio.get_running_loop()
+
+        results = []
+        workers = 1
+        while workers <= max_workers:
+            with socket.socket() as sock:
+                sock.bind(("127.0.0.1", 0))
+                port = sock.getsockname()[1]
+            settings = Settings(
+                dbc_file=dbc_file,
+                grpc=GRPCConfig(host="127.0.0.1", port=port),
+                metrics=MetricsConfig(enabled=False),
+                supervisor=SupervisorConfig(workers=workers, metrics_dir=tmp_path / "metrics"),
+            )
+            supervisor = Supervisor(settings)
+            supervisor.start()
+            try:
+                if not supervisor.wait_ready(60):
+                    raise RuntimeError("Workers failed to start")
+                with ProcessPoolExecutor(clients, mp_context=mp.get_context("spawn")) as pool:
+                    start_time = time.perf_counter()
+                    counts = await asyncio.gather(*[
+                        loop.run_in_executor(pool, _grpc_load_client, port, frames, duration)
+                        for _ in range(clients)
+                    ])
+                    elapsed = time.perf_counter() - start_time
+            finally:
+                supervisor.stop()
+
+            total = sum(counts)
+            print(f"   {workers} worker(s): {total / elapsed:,.0f} frames/s")
+            results.append(self._throughput_result(f"Supervisor x{workers}", total, elapsed, 0))
+            workers *= 2
+        return results
+
+    async def benchmark_grpc_batch_rpc(self, num_frames: int = 50000,
+                                       batch_size: int = 1000) -> List[BenchmarkResult]:
+        """ProcessFrames (кадр на сообщение) против ProcessFrameBatch (N кадров на сообщение)"""
+        print(f"📦 Benchmarking single-frame vs batched RPC ({num_frames:,} frames)...")
+
+        from interfaces.grpc.protocol import pb2
+
+        tmp_path = Path("/tmp/dbc_benchmark")
+        tmp_path.mkdir(exist_ok=True)
+        settings = Settings(
+            dbc_file=self.create_test_dbc_file(tmp_path),
+            grpc=GRPCConfig(host="localhost", port=50059, max_workers=4),
+            processing=ProcessingConfig(max_batch_size=batch_size, batch_timeout_ms=5.0),
+            metrics=MetricsConfig(enabled=False)
+        )
+        service = DBCService(settings)
+        await service.dbc_processor.initialize()
+        servicer = service.grpc_server._servicer
+        servicer.set_message_handler(service.submit_message)
+        servicer.set_batch_handler(service.process_frame_batch)
+        await service.batcher.start()
+
+        frames = [
+            self.create_test_frame(dev_addr=(i % 31) + 1, msg_id=[100, 200, 300][i % 3])
+            for i in range(num_frames)
+        ]
+
+        # Сериализация запросов и ответов учитывается - как на проводе
+        async def single_requests():
+            for i, frame in enumerate(frames):
+                data = pb2.FrameRequest(topic="bench", payload=frame, timestamp=i).SerializeToString()
+                yield pb2.FrameRequest.FromString(data)
+
+        start_time = time.perf_counter()
+        wire_bytes = 0
+        async for response in servicer.ProcessFrames(single_requests(), None):
+            wire_bytes += len(response.SerializeToString())
+        single_duration = time.perf_counter() - start_time
+
+        async def batch_requests():
+            for start in range(0, num_frames, batch_size):
+                request = pb2.FrameBatchRequest(
+                    topic="bench", frames=b"".join(frames[start:start + batch_size])
+                )
+                yield pb2.FrameBatchRequest.FromString(request.SerializeToString())
+
+        start_time = time.perf_counter()
+        async for response in servicer.StreamFrameBatches(batch_requests(), None):
+            wire_bytes += len(response.SerializeToString())
+        batch_duration = time.perf_counter() - start_time
+
+        await service.shutdown()
+        return [
+            self._throughput_result("gRPC Single-Frame", num_frames, single_duration, 0),
+            self._throughput_result(f"gRPC Batch (x{batch_size})", num_frames, batch_duration, 0),
+        ]
+
+    async def benchmark_raw_ingest(self, num_frames: int = 100000,
+                                   batch_size: int = 1000) -> List[BenchmarkResult]:
+        """Приём по localhost: gRPC ProcessFrameBatch против сырого TCP и UDP (без protobuf)"""
+        print(f"🔌 Benchmarking raw TCP/UDP ingest vs gRPC ({num_frames:,} frames)...")
+
+        import grpc
+        from interfaces.grpc.protocol import pb2, pb2_grpc
+        from config import IngestConfig
+
+        tmp_path = Path("/tmp/dbc_benchmark")
+        tmp_path.mkdir(exist_ok=True)
+        settings = Settings(
+            dbc_file=self.create_test_dbc_file(tmp_path),
+            grpc=GRPCConfig(host="127.0.0.1", port=0, max_workers=4),
+            ingest=IngestConfig(enabled=True, host="127.0.0.1", tcp_port=0, udp_port=0,
+                                max_batch_frames=batch_size),
+            processing=ProcessingConfig(max_batch_size=batch_size),
+            metrics=MetricsConfig(enabled=False)
+        )
+        service = DBCService(settings)
+        serving = asyncio.create_task(service.start())
+        while not service.running:
+            await asyncio.sleep(0.01)
+
+        frames = b"".join(
+            self.create_test_frame(dev_addr=(i % 31) + 1, msg_id=[100, 200, 300][i % 3])
+            for i in range(num_frames)
+        )
+        chunk = batch_size * 12
+
+        async def wait_processed(target: int, timeout: float = 30.0) -> None:
+            deadline = time.perf_counter() + timeout
+            while service.stats["total"] < target and time.perf_counter() < deadline:
+                await asyncio.sleep(0.001)
+
+        # gRPC: запрос на пачку, ответ со всеми кадрами
+        async with grpc.aio.insecure_channel(f"127.0.0.1:{service.grpc_server.port}") as channel:
+            stub = pb2_grpc.DBCServiceStub(channel)
+            start_time = time.perf_counter()
+            for start in range(0, len(frames), chunk):
+                await stub.ProcessFrameBatch(
+                    pb2.FrameBatchRequest(topic="bench", frames=frames[start:start + chunk])
+                )
+            grpc_duration = time.perf_counter() - start_time
+
+        # TCP: поток кадров, граница пачек не передаётся
+        ingest = service.ingest_server
+        base = service.stats["total"]
+        start_time = time.perf_counter()
+        _, writer = await asyncio.open_connection("127.0.0.1", ingest.tcp_port)
+        for start in range(0, len(frames), chunk):
+            writer.write(frames[start:start + chunk])
+            await writer.drain()
+        await wait_processed(base + num_frames)
+        tcp_duration = time.perf_counter() - start_time
+        writer.close()
+        await writer.wait_closed()
+
+        # UDP: 100 кадров в датаграмме (1200 байт - в пределах MTU), потери учитываются
+        base = service.stats["total"]
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(
+            asyncio.DatagramProtocol, remote_addr=("127.0.0.1", ingest.udp_port)
+        )
+        datagram = 100 * 12
+        start_time = time.perf_counter()
+        for start in range(0, len(frames), datagram):
+            transport.sendto(frames[start:start + datagram])
+            if start % chunk == 0:
+                await asyncio.sleep(0)  # слушатель в том же loop - даём ему читать
+        await wait_processed(base + num_frames, timeout=2.0)
+        udp_duration = time.perf_counter() - start_time
+        udp_received = service.stats["total"] - base
+        transport.close()
+
+        await service.shutdown()
+        await serving
+        return [
+            self._throughput_result(f"gRPC ProcessFrameBatch (x{batch_size})", num_frames, grpc_duration, 0),
+            self._throughput_result("Raw TCP Ingest", num_frames, tcp_duration, 0),
+            self._throughput_result("Raw UDP Ingest (x100)", udp_received, udp_duration,
+                                    num_frames - udp_received),
+        ]
+
+    async def benchmark_wire_size(self, num_frames: int = 10000, batch_size: int = 1000) -> List[BenchmarkResult]:
+        """Байт на кадр на проводе: JSON, типизированный DecodedFrame и компактный поток"""
+        print(f"📏 Benchmarking bytes-on-wire per frame ({num_frames:,} frames)...")
+
+        from interfaces.grpc.compact import CompactEncoder
+        from interfaces.grpc.server import DBCServicer
+
+        tmp_path = Path("/tmp/dbc_benchmark")
+        tmp_path.mkdir(exist_ok=True)
+        processor = DBCProcessor(self.create_test_dbc_file(tmp_path))
+        await processor.initialize()
+        parser = FrameParser()
+
+        buffer = b"".join(
+            self.create_test_frame(dev_addr=(i % 31) + 1, msg_id=[100, 200, 300][i % 3],
+                                   payload=bytes([(i + j) % 256 for j in range(8)]))
+            for i in range(batch_size)
+        )
+        batch = await parser.parse_batch(buffer)
+        messages = processor.build_messages(batch, processor.decode_frames(batch), ["bench"] * batch_size)
+        num_batches = num_frames // batch_size
+        servicer = DBCServicer()
+
+        results = []
+        sizes = {}
+        for name, as_json in (("JSON", True), ("Typed", False)):
+            total_bytes = 0
+            start_time = time.perf_counter()
+            for _ in range(num_batches):
+                for message in messages:
+                    total_bytes += len(servicer._create_response(message, as_json).SerializeToString())
+            duration = time.perf_counter() - start_time
+            sizes[name] = total_bytes / (num_batches * batch_size)
+            results.append(self._throughput_result(f"Encode {name}", num_batches * batch_size, duration, 0))
+
+        encoder = CompactEncoder()
+        total_bytes = 0
+        start_time = time.perf_counter()
+        for _ in range(num_batches):
+            total_bytes += len(encoder.encode(processor.schema, messages).SerializeToString())
+        duration = time.perf_counter() - start_time
+        sizes["Compact"] = total_bytes / (num_batches * batch_size)
+        results.append(self._throughput_result("Encode Compact", num_batches * batch_size, duration, 0))
+
+        for name, size in sizes.items():
+            print(f"   {name:<8} {size:8.1f} bytes/frame (input: 12)")
+
+        await processor.close()
+        return results
+
     def get_memory_usage(self) -> float:
         """Получить использование памяти в MB"""
         try:
@@ -431,15 +1032,29 @@ async def main():
         benchmarks = [
             runner.benchmark_crc_calculation(),
             runner.benchmark_frame_parsing(),
+            runner.benchmark_batch_parsing(),
             runner.benchmark_dbc_processing(),
             runner.benchmark_grpc_publishing(),
             runner.benchmark_full_pipeline(),
             runner.benchmark_concurrent_processing(),
         ]
         
+        runner.results.extend(await runner.benchmark_crc_modes())
+        runner.results.extend(await runner.benchmark_frame_records())
+        runner.results.extend(await runner.benchmark_frame_allocations())
+        runner.results.extend(await runner.benchmark_columnar_decode())
+
         for benchmark in benchmarks:
             result = await benchmark
             runner.results.append(result)
+
+        runner.results.extend(await runner.benchmark_batch_size_curve())
+        runner.results.extend(await runner.benchmark_worker_pool())
+        runner.results.extend(await runner.benchmark_dbc_startup())
+        runner.results.extend(await runner.benchmark_multiprocess_scaling())
+        runner.results.extend(await runner.benchmark_grpc_batch_rpc())
+        runner.results.extend(await runner.benchmark_raw_ingest())
+        runner.results.extend(await runner.benchmark_wire_size())
         
         runner.print_results()
         
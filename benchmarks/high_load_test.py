@@ -204,6 +204,34 @@ BO_ 300 HighFreqMessage: 8 Vector__XXX
             memory_usage_mb=self.get_memory_usage()
         )
 
+    async def test_capture_replay(self, capture_file: Path, dbc_file: Path) -> BenchmarkResult:
+        """Записанный трафик (реальное распределение ID) через полный пакетный pipeline"""
+        from core.replay import Capture, replay
+
+        print(f"📼 CAPTURE REPLAY TEST ({capture_file})...")
+        settings = Settings(
+            dbc_file=dbc_file,
+            grpc=GRPCConfig(host="localhost", port=50061, max_workers=16),
+            metrics=MetricsConfig(enabled=False)
+        )
+        service = DBCService(settings)
+        await service.dbc_processor.initialize()
+
+        report = await replay(Capture(capture_file), service.process_frame_batch)
+        await service.shutdown()
+
+        return BenchmarkResult(
+            test_name=f"CAPTURE REPLAY ({capture_file.name})",
+            total_messages=report.frames,
+            duration=report.duration_s,
+            messages_per_second=report.frames_per_second,
+            avg_latency_ms=report.latency_p50_ms,
+            p95_latency_ms=report.latency_p95_ms,
+            p99_latency_ms=report.latency_p99_ms,
+            errors=report.errors,
+            memory_usage_mb=self.get_memory_usage()
+        )
+
     async def test_concurrent_massive(self, num_frames: int = 100000, concurrency: int = 32) -> BenchmarkResult:
         """МАССИВНЫЙ конкурентный тест - 100k кадров на 32 воркерах!"""
         print(f"⚡ MASSIVE CONCURRENT TEST ({num_frames:,} frames, {concurrency} workers)...")
@@ -320,6 +348,9 @@ async def main():
             tester.test_full_pipeline_extreme(200000),   # 200k full pipeline  
             tester.test_concurrent_massive(100000, 32), # 100k concurrent x32
         ]
+        # Запись реального трафика: python benchmarks/high_load_test.py capture.log dbc/file.dbc
+        if len(sys.argv) == 3:
+            tests.append(tester.test_capture_replay(Path(sys.argv[1]), Path(sys.argv[2])))
         
         for test in tests:
             print(f"\n{'='*60}")
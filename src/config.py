@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Literal
 
-from pydantic import Field
+from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
 
@@ -11,13 +12,73 @@ class GRPCConfig(BaseSettings):
     port: int = 50051
     max_workers: int = 10
     max_message_size: int = 4 * 1024 * 1024
+    stream_queue_size: int = 10000
+    # typed - DecodedFrame в ответе, json - устаревший формат с JSON в FrameResponse.data
+    response_format: Literal["typed", "json"] = "typed"
+    # Буфер подписчика Subscribe и поведение при его переполнении (по умолчанию)
+    subscriber_buffer_size: int = 1000
+    subscriber_overflow: Literal["block", "drop_oldest", "drop_newest", "conflate"] = "drop_oldest"
+    # > 0 - подписчикам только последние значения по (dev_addr, can_id), выгрузка раз в интервал
+    conflation_interval_ms: float = 0.0
+    # Транспорт: ограничения потоков, окна HTTP/2, keepalive, сжатие (0 - значение gRPC)
+    max_concurrent_streams: int = 256          # потоков на одно соединение
+    max_concurrent_rpcs: int | None = None     # RPC на сервер, сверх - RESOURCE_EXHAUSTED
+    http2_stream_window_bytes: int = 0         # начальное окно потока (lookahead)
+    http2_bdp_probe: bool = True               # подстройка окна по bandwidth-delay product
+    http2_max_frame_size: int = 0
+    http2_write_buffer_bytes: int = 0
+    keepalive_time_ms: int = 30_000
+    keepalive_timeout_ms: int = 10_000
+    keepalive_permit_without_calls: bool = True
+    min_ping_interval_ms: int = 10_000         # клиентские ping чаще - GOAWAY
+    max_pings_without_data: int = 0            # ping подряд без данных, 0 - без ограничения
+    max_connection_idle_ms: int = 0
+    max_connection_age_ms: int = 0
+    compression: Literal["none", "gzip", "deflate"] = "none"
+    # Несколько процессов сервера на одном порту (ядро распределяет соединения)
+    so_reuseport: bool = False
+
+
+class IngestConfig(BaseSettings):
+    """Сырые кадры по TCP (поток по 12 байт) и UDP (N × 12 байт в датаграмме)"""
+    enabled: bool = False
+    host: str = "0.0.0.0"
+    tcp_port: int | None = 50060               # None - слушатель выключен
+    udp_port: int | None = 50060
+    topic: str = "ingest"                      # топик кадров (маршрутизация DBC)
+    read_buffer_size: int = 64 * 1024          # приёмный буфер TCP соединения
+    udp_receive_buffer_bytes: int = 4 * 1024 * 1024  # SO_RCVBUF, 0 - значение ОС
+    max_batch_frames: int = 4096               # склейка мелких буферов перед декодированием
+    max_queue_frames: int = 100_000            # сверх - пауза чтения TCP, отброс UDP
+    reuse_port: bool = False
+
+
+class SocketCANConfig(BaseSettings):
+    """Чтение кадров с интерфейса SocketCAN (Linux): идентификатор CAN = dev_addr | msg_id << 5"""
+    enabled: bool = False
+    interface: str = "can0"
+    topic: str = ""                            # пусто - имя интерфейса
+    # (can_id, can_mask) - фильтры CAN_RAW_FILTER в ядре, пусто - все кадры
+    filters: list[tuple[int, int]] = Field(default_factory=list)
+    batch_frames: int = 1024                   # кадров за одно вычитывание сокета
+    receive_buffer_bytes: int = 0              # SO_RCVBUF, 0 - значение ОС
+    max_queue_frames: int = 100_000            # сверх - пакеты отбрасываются
 
 
 class ProcessingConfig(BaseSettings):
     max_batch_size: int = 1000
     worker_pool_size: int = 4
+    process_pool_enabled: bool = False
     max_queue_size: int = 100000
     batch_timeout_ms: float = 100.0
+    decode_cache_enabled: bool = True
+    decode_cache_size: int = 2000
+    # > 0 - период проверки изменения dbc_file (горячая перезагрузка), секунды
+    dbc_watch_interval_s: float = 0.0
+    # Предкомпилированный артефакт .dbcc рядом с DBC (создаётся при первой загрузке)
+    dbc_artifact_enabled: bool = True
+    # ReloadDBC с произвольным путём; иначе - только файлы из настроек
+    dbc_reload_any_path: bool = False
 
 
 class LoggingConfig(BaseSettings):
@@ -33,13 +94,35 @@ class MetricsConfig(BaseSettings):
     path: str = "/metrics"
 
 
+class SupervisorConfig(BaseSettings):
+    # Процессы сервиса на одном порту gRPC (SO_REUSEPORT); 0 - по числу ядер
+    workers: int = 1
+    shutdown_timeout_s: float = 10.0
+    restart_delay_s: float = 1.0
+    # Файлы метрик воркеров (prometheus_client multiprocess), очищается при старте
+    metrics_dir: Path = Path("/tmp/dbc_service_metrics")
+
+
+class DBCRoute(BaseModel):
+    """Дополнительная DBC: кадры топиков topics и адресов device_ranges (включительно)"""
+    name: str
+    dbc_file: Path
+    topics: list[str] = Field(default_factory=list)
+    device_ranges: list[tuple[int, int]] = Field(default_factory=list)
+
+
 class Settings(BaseSettings):
     dbc_file: Path = Field(default=Path("./dbc/charging_station.dbc"))
+    # Кадры без правила маршрутизации декодируются dbc_file
+    dbc_routes: list[DBCRoute] = Field(default_factory=list)
     
     grpc: GRPCConfig = Field(default_factory=GRPCConfig)
+    ingest: IngestConfig = Field(default_factory=IngestConfig)
+    socketcan: SocketCANConfig = Field(default_factory=SocketCANConfig)
     processing: ProcessingConfig = Field(default_factory=ProcessingConfig)
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
     metrics: MetricsConfig = Field(default_factory=MetricsConfig)
+    supervisor: SupervisorConfig = Field(default_factory=SupervisorConfig)
 
     class Config:
         env_nested_delimiter = "__"
@@ -1,5 +1,40 @@
-from .models import CommAddr, CommData, ParsedMessage
+from .artifact import CompiledDatabase, load_database
+from .models import (
+    CommAddr,
+    CommAddrRecord,
+    CommData,
+    CommDataRecord,
+    DecodedColumns,
+    FrameBatch,
+    ParsedMessage,
+    ParsedMessageRecord,
+    ParsedResult,
+)
 from .parser import FrameParser
-from .processor import DBCProcessor
+from .processor import DBCDiff, DBCProcessor
+from .router import DBCRouter
+from .schema import DBCSchema, MessageInfo, SignalInfo
+from .subscriptions import SignalRange, Subscription
 
-__all__ = ["CommAddr", "CommData", "ParsedMessage", "FrameParser", "DBCProcessor"]
+__all__ = [
+    "CompiledDatabase",
+    "load_database",
+    "CommAddr",
+    "CommAddrRecord",
+    "CommData",
+    "CommDataRecord",
+    "DecodedColumns",
+    "FrameBatch",
+    "ParsedMessage",
+    "ParsedMessageRecord",
+    "ParsedResult",
+    "FrameParser",
+    "DBCDiff",
+    "DBCProcessor",
+    "DBCRouter",
+    "DBCSchema",
+    "MessageInfo",
+    "SignalInfo",
+    "SignalRange",
+    "Subscription",
+]
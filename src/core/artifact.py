@@ -0,0 +1,320 @@
+"""
+Предкомпилированный DBC на диске (.dbcc) для быстрого старта.
+
+Рядом с DBC сохраняется бинарный артефакт: раскладки сигналов в виде
+структурированных массивов numpy и словарь сигналов (orjson). Ключ -
+sha256 содержимого DBC: изменённый файл, другой формат артефакта или
+другая версия cantools - и артефакт пересобирается. Файл читается целиком
+(таблицы - десятки килобайт), разбор DBC и компиляция декодеров не
+выполняются; объект cantools подгружается только по требованию
+(fallback-декодирование).
+
+Предварительная сборка: python -m core.artifact <file.dbc> [...]
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict
+
+import cantools
+import numpy as np
+import orjson
+import structlog
+from cantools.database.namedsignalvalue import NamedSignalValue
+
+from .decoder import CompiledMessage, CompiledSignal, compile_message
+from .schema import MessageInfo, SignalInfo, schema_messages
+
+logger = structlog.get_logger(__name__)
+
+ARTIFACT_SUFFIX = ".dbcc"
+ARTIFACT_MAGIC = b"DBCC"
+ARTIFACT_VERSION = 2
+
+# magic, версия формата, sha256 DBC, сообщений, сигналов, длина словаря
+_HEADER = struct.Struct("<4sH2x32sIII")
+
+MESSAGE_DTYPE = np.dtype([
+    ("frame_id", "<u4"),
+    ("length", "<u2"),
+    ("compiled", "u1"),
+    ("first_signal", "<u4"),
+    ("signal_count", "<u2"),
+    ("layout", "V16"),
+])
+
+SIGNAL_DTYPE = np.dtype([
+    ("big_endian", "u1"),
+    ("shift", "<i2"),
+    ("mask", "<u8"),
+    ("sign_bit", "<u8"),
+    ("conversion", "u1"),
+    ("dtype", "u1"),
+    ("scale", "<f8"),
+    ("offset", "<f8"),
+])
+
+# Преобразование значения сигнала
+_IDENTITY, _LINEAR_INT, _LINEAR = 0, 1, 2
+_DTYPES = (np.dtype(np.uint64), np.dtype(np.int64), np.dtype(np.float64))
+
+
+@dataclass(slots=True)
+class CompiledDatabase:
+    """Всё, что нужно процессору для работы без разбора DBC"""
+    digest: bytes
+    names: Dict[int, str]
+    decoders: Dict[int, CompiledMessage | None]
+    layouts: Dict[int, bytes]
+    messages: Dict[int, MessageInfo]  # словарь сигналов без версии
+    db: cantools.database.Database | None = None  # None - загружен из артефакта
+
+
+def artifact_path(dbc_file: Path) -> Path:
+    return Path(dbc_file).with_suffix(ARTIFACT_SUFFIX)
+
+
+def message_layout(message: cantools.database.Message) -> tuple[Any, ...]:
+    """Всё, что влияет на декодирование и словарь сигналов"""
+    return (
+        message.name,
+        message.length,
+        tuple(
+            (
+                signal.name, signal.start, signal.length, signal.byte_order,
+                signal.is_signed, signal.is_float, signal.scale, signal.offset,
+                signal.unit, signal.multiplexer_signal,
+                tuple(signal.multiplexer_ids or ()),
+                tuple((k, str(v)) for k, v in sorted(signal.choices.items()))
+                if signal.choices else None,
+            )
+            for signal in message.signals
+        ),
+    )
+
+
+def layout_digest(message: cantools.database.Message) -> bytes:
+    return hashlib.blake2b(repr(message_layout(message)).encode(), digest_size=16).digest()
+
+
+def compile_database(db: cantools.database.Database, digest: bytes = b"") -> CompiledDatabase:
+    """Компиляция разобранной базы cantools"""
+    messages = sorted(db.messages, key=lambda m: m.frame_id)
+    decoders = {message.frame_id: compile_message(message) for message in messages}
+    return CompiledDatabase(
+        digest=digest,
+        names={message.frame_id: message.name for message in messages},
+        decoders=decoders,
+        layouts={message.frame_id: layout_digest(message) for message in messages},
+        messages=schema_messages(db, decoders),
+        db=db,
+    )
+
+
+def _conversion(signal: CompiledSignal) -> int:
+    if signal.identity:
+        return _IDENTITY
+    return _LINEAR_INT if signal.dtype.kind == "i" else _LINEAR
+
+
+def _encode_choice(raw: int, label: Any) -> list[Any]:
+    if isinstance(label, NamedSignalValue):
+        return [raw, label.name, label.comments, True]
+    return [raw, str(label), None, False]
+
+
+def write_artifact(compiled: CompiledDatabase, path: Path) -> None:
+    """Запись через временный файл и os.replace - читатели не видят половину файла"""
+    frame_ids = sorted(compiled.names)
+    signal_count = sum(len(compiled.messages[frame_id].signals) for frame_id in frame_ids)
+    message_table = np.zeros(len(frame_ids), dtype=MESSAGE_DTYPE)
+    signal_table = np.zeros(signal_count, dtype=SIGNAL_DTYPE)
+    meta_signals: list[list[Any]] = []
+
+    position = 0
+    for index, frame_id in enumerate(frame_ids):
+        info = compiled.messages[frame_id]
+        decoder = compiled.decoders[frame_id]
+        row = message_table[index]
+        row["frame_id"] = frame_id
+        row["length"] = decoder.length if decoder is not None else 0
+        row["compiled"] = decoder is not None
+        row["first_signal"] = position
+        row["signal_count"] = len(info.signals)
+        row["layout"] = compiled.layouts[frame_id]
+
+        compiled_signals = decoder.signals if decoder is not None else (None,) * len(info.signals)
+        for signal_info, signal in zip(info.signals, compiled_signals):
+            choices = None
+            if signal is not None:
+                entry = signal_table[position]
+                entry["big_endian"] = signal.big_endian
+                entry["shift"] = signal.shift
+                entry["mask"] = signal.mask
+                entry["sign_bit"] = signal.sign_bit
+                entry["conversion"] = _conversion(signal)
+                entry["dtype"] = _DTYPES.index(signal.dtype)
+                entry["scale"] = signal.scale
+                entry["offset"] = signal.offset
+                if signal.choices is not None:
+                    choices = [_encode_choice(raw, label) for raw, label in signal.choices.items()]
+            elif signal_info.choices is not None:
+                choices = [[raw, label, None, False] for raw, label in signal_info.choices.items()]
+            meta_signals.append([
+                signal_info.name, signal_info.unit, signal_info.kind, choices,
+                signal_info.scale, signal_info.offset,
+            ])
+            position += 1
+
+    meta = orjson.dumps({
+        "cantools": cantools.__version__,
+        "messages": [compiled.names[frame_id] for frame_id in frame_ids],
+        "signals": meta_signals,
+    })
+    header = _HEADER.pack(
+        ARTIFACT_MAGIC, ARTIFACT_VERSION, compiled.digest, len(frame_ids), signal_count, len(meta)
+    )
+
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(header)
+            f.write(message_table.tobytes())
+            f.write(signal_table.tobytes())
+            f.write(meta)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _restore_choices(encoded: list[list[Any]] | None) -> dict[int, Any] | None:
+    if encoded is None:
+        return None
+    return {
+        raw: NamedSignalValue(raw, label, comments) if named else label
+        for raw, label, comments, named in encoded
+    }
+
+
+def read_artifact(path: Path, digest: bytes) -> CompiledDatabase | None:
+    """None - артефакта нет, он устарел или повреждён"""
+    try:
+        data = path.read_bytes()
+        if len(data) < _HEADER.size:
+            return None
+        magic, version, stored, n_messages, n_signals, meta_len = _HEADER.unpack_from(data)
+        if magic != ARTIFACT_MAGIC or version != ARTIFACT_VERSION or stored != digest:
+            return None
+        offset = _HEADER.size
+        signals_offset = offset + n_messages * MESSAGE_DTYPE.itemsize
+        meta_offset = signals_offset + n_signals * SIGNAL_DTYPE.itemsize
+        if len(data) != meta_offset + meta_len:
+            return None
+
+        # Строки таблиц - кортежи Python: декодерам нужны int/float, а не скаляры numpy
+        message_rows = np.frombuffer(data, MESSAGE_DTYPE, n_messages, offset).tolist()
+        signal_rows = np.frombuffer(data, SIGNAL_DTYPE, n_signals, signals_offset).tolist()
+        meta = orjson.loads(memoryview(data)[meta_offset:])
+    except (OSError, ValueError):
+        return None
+
+    if meta.get("cantools") != cantools.__version__:
+        return None
+    try:
+        return _restore_database(digest, message_rows, signal_rows, meta)
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+
+
+def _restore_database(
+    digest: bytes, message_rows: list[tuple], signal_rows: list[tuple], meta: dict[str, Any]
+) -> CompiledDatabase:
+    names: Dict[int, str] = {}
+    decoders: Dict[int, CompiledMessage | None] = {}
+    layouts: Dict[int, bytes] = {}
+    messages: Dict[int, MessageInfo] = {}
+    for index, (frame_id, length, compiled, first, count, layout) in enumerate(message_rows):
+        name = meta["messages"][index]
+        span = range(first, first + count)
+        infos = tuple(
+            SignalInfo(
+                signal_name, unit, kind,
+                {raw: label for raw, label, *_ in choices} if choices else None,
+                scale, offset,
+            )
+            for signal_name, unit, kind, choices, scale, offset in (meta["signals"][i] for i in span)
+        )
+        if compiled:
+            signals = []
+            for i in span:
+                big_endian, shift, mask, sign_bit, conversion, dtype, scale, offset_ = signal_rows[i]
+                if conversion == _IDENTITY:
+                    scale, offset_ = 1, 0
+                elif conversion == _LINEAR_INT:
+                    scale, offset_ = int(scale), int(offset_)
+                signals.append(CompiledSignal.restore(
+                    meta["signals"][i][0], bool(big_endian), shift, mask, sign_bit,
+                    conversion == _IDENTITY, scale, offset_,
+                    _restore_choices(meta["signals"][i][3]), _DTYPES[dtype],
+                ))
+            decoders[frame_id] = CompiledMessage.restore(frame_id, name, length, tuple(signals))
+        else:
+            decoders[frame_id] = None
+        names[frame_id] = name
+        layouts[frame_id] = layout
+        messages[frame_id] = MessageInfo(index, frame_id, name, infos)
+
+    return CompiledDatabase(digest, names, decoders, layouts, messages)
+
+
+def load_database(dbc_file: Path, use_artifact: bool = True) -> CompiledDatabase:
+    """
+    Скомпилированная база для dbc_file: из артефакта, если он актуален,
+    иначе разбор DBC и (при use_artifact) запись нового артефакта.
+    """
+    dbc_file = Path(dbc_file)
+    if not use_artifact:
+        return compile_database(cantools.database.load_file(str(dbc_file)))
+
+    content = dbc_file.read_bytes()
+    digest = hashlib.sha256(content).digest()
+    path = artifact_path(dbc_file)
+    compiled = read_artifact(path, digest)
+    if compiled is not None:
+        logger.debug("dbc_artifact_loaded", file=str(path))
+        return compiled
+
+    compiled = compile_database(cantools.database.load_file(str(dbc_file)), digest)
+    try:
+        write_artifact(compiled, path)
+        logger.info("dbc_artifact_written", file=str(path))
+    except OSError as e:
+        # Каталог только для чтения - работаем без артефакта
+        logger.warning("dbc_artifact_write_failed", file=str(path), error=str(e))
+    return compiled
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Предварительная сборка артефактов (при сборке образа / деплое)"""
+    files = sys.argv[1:] if argv is None else argv
+    if not files:
+        print("usage: python -m core.artifact <file.dbc> [...]", file=sys.stderr)
+        return 2
+    for dbc_file in map(Path, files):
+        compiled = compile_database(
+            cantools.database.load_file(str(dbc_file)),
+            hashlib.sha256(dbc_file.read_bytes()).digest(),
+        )
+        path = artifact_path(dbc_file)
+        write_artifact(compiled, path)
+        print(f"{dbc_file} -> {path} ({len(compiled.names)} messages)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+_STOP = object()  # маркер остановки: всё, что было в очереди до него, будет обработано
+
+
+class FrameBatcher(Generic[T]):
+    """
+    Микро-батчинг между приёмом и декодированием.
+
+    Элементы копятся в ограниченной очереди (max_queue_size) и отдаются
+    обработчику пачками до max_batch_size штук или по истечении
+    batch_timeout_ms с момента первого элемента - что наступит раньше.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[T]], Awaitable[None]],
+        max_batch_size: int = 1000,
+        batch_timeout_ms: float = 100.0,
+        max_queue_size: int = 100000,
+    ) -> None:
+        self._handler = handler
+        self.max_batch_size = max(1, max_batch_size)
+        self.batch_timeout = batch_timeout_ms / 1000
+        self._queue: asyncio.Queue[T] = asyncio.Queue(maxsize=max_queue_size)
+        self._task: asyncio.Task[None] | None = None
+        self.dropped = 0
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, item: T) -> None:
+        """Постановка в очередь; при переполнении ждёт (backpressure)"""
+        await self._queue.put(item)
+
+    def submit_nowait(self, item: T) -> bool:
+        """Постановка без ожидания; при переполнении элемент отбрасывается"""
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.batch_timeout
+
+            while len(batch) < self.max_batch_size:
+                # ✅ Сначала забираем всё, что уже лежит в очереди, без ожидания
+                if not self._queue.empty():
+                    item = self._queue.get_nowait()
+                else:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch: list[T]) -> None:
+        try:
+            await self._handler(batch)
+        except Exception as e:
+            logger.error("batch_handler_error", size=len(batch), error=str(e))
+
+    async def flush(self) -> None:
+        """Обработка всего, что осталось в очереди, в текущей задаче"""
+        while not self._queue.empty():
+            batch = []
+            while not self._queue.empty() and len(batch) < self.max_batch_size:
+                item = self._queue.get_nowait()
+                if item is not _STOP:
+                    batch.append(item)
+            if batch:
+                await self._dispatch(batch)
+
+    async def stop(self) -> None:
+        """Останавливает приём, дообрабатывая уже поставленные элементы"""
+        if self._task is not None:
+            await self._queue.put(_STOP)
+            await self._task
+            self._task = None
+        await self.flush()
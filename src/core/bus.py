@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import Literal
+
+import structlog
+
+from utils.metrics import BUS_SUBSCRIBER_DELIVERED, BUS_SUBSCRIBER_DROPPED, BUS_SUBSCRIBER_LAG
+
+from .models import ParsedResult
+from .subscriptions import Subscription
+
+logger = structlog.get_logger(__name__)
+
+# Поведение при заполненном буфере подписчика
+OverflowPolicy = Literal["block", "drop_oldest", "drop_newest", "conflate"]
+OVERFLOW_POLICIES: tuple[OverflowPolicy, ...] = ("block", "drop_oldest", "drop_newest", "conflate")
+
+
+class Subscriber:
+    """
+    Ограниченный буфер одного подписчика шины.
+
+    block - публикующий ждёт освобождения места (медленный подписчик тормозит
+    всю публикацию), drop_oldest / drop_newest - отбрасывается самое старое
+    или новое сообщение, conflate - в буфере не больше одного сообщения на
+    (dev_addr, can_id): новое заменяет ожидающее на его месте, так что каждый
+    сигнал доставляется с последним значением.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capacity: int = 1000,
+        policy: OverflowPolicy = "drop_oldest",
+        subscription: Subscription | None = None,
+    ) -> None:
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.policy = policy
+        self.subscription = subscription
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+
+        self._ring: deque[object] = deque()
+        # conflate: ключ -> последнее сообщение; в кольце - ключи в порядке поступления
+        self._latest: dict[tuple[int, int], ParsedResult] = {}
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+
+        # ✅ Отставание считается при сборе метрик, а не на каждом сообщении
+        BUS_SUBSCRIBER_LAG.labels(name).set_function(lambda: len(self._ring))
+        self._dropped_metric = BUS_SUBSCRIBER_DROPPED.labels(name, policy)
+        self._delivered_metric = BUS_SUBSCRIBER_DELIVERED.labels(name)
+
+    @property
+    def lag(self) -> int:
+        """Сообщений в буфере, ещё не забранных подписчиком"""
+        return len(self._ring)
+
+    def wants(self, message: ParsedResult) -> bool:
+        subscription = self.subscription
+        if subscription is None:
+            return True
+        return (
+            subscription.accepts(message.device_address, message.can_message_id)
+            and subscription.admit(message)
+        )
+
+    async def put(self, message: ParsedResult) -> None:
+        if self.closed:
+            return
+        if self.policy == "conflate":
+            self._put_conflated(message)
+            return
+
+        if len(self._ring) >= self.capacity:
+            if self.policy == "drop_newest":
+                self._drop()
+                return
+            if self.policy == "drop_oldest":
+                self._ring.popleft()
+                self._drop()
+            else:
+                while len(self._ring) >= self.capacity and not self.closed:
+                    self._writable.clear()
+                    await self._writable.wait()
+                if self.closed:
+                    return
+        self._ring.append(message)
+        self._readable.set()
+
+    def _put_conflated(self, message: ParsedResult) -> None:
+        key = (message.device_address, message.can_message_id)
+        if key in self._latest:
+            # Ожидающее значение ещё не забрано - заменяем на месте
+            self._latest[key] = message
+            self._drop()
+            return
+        if len(self._ring) >= self.capacity:
+            # Ключей больше ёмкости: вытесняется самый старый ключ
+            del self._latest[self._ring.popleft()]
+            self._drop()
+        self._latest[key] = message
+        self._ring.append(key)
+        self._readable.set()
+
+    def _drop(self) -> None:
+        self.dropped += 1
+        self._dropped_metric.inc()
+
+    async def get(self) -> ParsedResult | None:
+        """Следующее сообщение; None - подписчик закрыт и буфер пуст"""
+        while not self._ring:
+            if self.closed:
+                return None
+            self._readable.clear()
+            await self._readable.wait()
+
+        item = self._ring.popleft()
+        if self.policy == "conflate":
+            item = self._latest.pop(item)
+        self._writable.set()
+        self.delivered += 1
+        self._delivered_metric.inc()
+        return item
+
+    def close(self) -> None:
+        """Закрытие: буфер дочитывается, ожидающие публикации освобождаются"""
+        if self.closed:
+            return
+        self.closed = True
+        self._readable.set()
+        self._writable.set()
+        BUS_SUBSCRIBER_LAG.remove(self.name)
+        BUS_SUBSCRIBER_DROPPED.remove(self.name, self.policy)
+        BUS_SUBSCRIBER_DELIVERED.remove(self.name)
+
+    async def __aiter__(self) -> AsyncIterator[ParsedResult]:
+        while True:
+            message = await self.get()
+            if message is None:
+                return
+            yield message
+
+
+class PublishBus:
+    """Шина публикации: каждое сообщение - всем подписчикам, чей фильтр оно проходит"""
+
+    def __init__(self, capacity: int = 1000, policy: OverflowPolicy = "drop_oldest") -> None:
+        self.capacity = capacity
+        self.policy = policy
+        self._subscribers: dict[str, Subscriber] = {}
+        self._ids = itertools.count(1)
+        self.published = 0
+
+    @property
+    def subscribers(self) -> list[Subscriber]:
+        return list(self._subscribers.values())
+
+    def subscribe(
+        self,
+        name: str = "",
+        capacity: int | None = None,
+        policy: OverflowPolicy | None = None,
+        subscription: Subscription | None = None,
+    ) -> Subscriber:
+        """Новый подписчик; ёмкость и политика по умолчанию - из настроек шины"""
+        name = f"{name or 'subscriber'}-{next(self._ids)}"
+        subscriber = Subscriber(
+            name,
+            capacity or self.capacity,
+            policy or self.policy,
+            subscription,
+        )
+        self._subscribers[name] = subscriber
+        logger.info("bus_subscribed", subscriber=name, policy=subscriber.policy)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        if self._subscribers.pop(subscriber.name, None) is None:
+            return
+        subscriber.close()
+        logger.info(
+            "bus_unsubscribed",
+            subscriber=subscriber.name,
+            delivered=subscriber.delivered,
+            dropped=subscriber.dropped,
+        )
+
+    async def publish(self, message: ParsedResult) -> None:
+        self.published += 1
+        # ✅ Без подписчиков публикация ничего не стоит
+        if not self._subscribers:
+            return
+        for subscriber in tuple(self._subscribers.values()):
+            if subscriber.wants(message):
+                await subscriber.put(message)
+
+    def close(self) -> None:
+        for subscriber in tuple(self._subscribers.values()):
+            self.unsubscribe(subscriber)
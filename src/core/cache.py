@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any
+
+from utils.metrics import DECODE_CACHE_EVICTIONS, DECODE_CACHE_HITS, DECODE_CACHE_MISSES
+
+DecodeKey = tuple[int, bytes]
+
+
+class DecodeCache:
+    """
+    LRU кэш результатов декодирования, свой у каждого процессора.
+
+    Ключ - (can_id, payload), значения хранятся как неизменяемые
+    MappingProxyType, поэтому их можно безопасно отдавать нескольким потребителям.
+    Для трафика с высокой энтропией кэш отключается через enabled=False.
+    """
+
+    def __init__(self, capacity: int = 2000, enabled: bool = True) -> None:
+        if capacity <= 0:
+            enabled = False
+        self.capacity = capacity
+        self.enabled = enabled
+        self._entries: OrderedDict[DecodeKey, Mapping[str, Any]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, can_id: int, payload: bytes) -> Mapping[str, Any] | None:
+        if not self.enabled:
+            return None
+
+        key = (can_id, payload)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            DECODE_CACHE_MISSES.inc()
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        DECODE_CACHE_HITS.inc()
+        return entry
+
+    def put(self, can_id: int, payload: bytes, signals: dict[str, Any]) -> Mapping[str, Any]:
+        """Сохраняет копию результата и возвращает её неизменяемое представление"""
+        if not self.enabled:
+            # Результат никуда не сохраняется - копия не нужна
+            return MappingProxyType(signals)
+
+        frozen = MappingProxyType(dict(signals))
+        self._entries[(can_id, bytes(payload))] = frozen
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+            DECODE_CACHE_EVICTIONS.inc()
+        return frozen
+
+    def invalidate(self, can_ids: set[int] | None = None) -> None:
+        """Сброс записей для указанных CAN ID (или всех)"""
+        if can_ids is None:
+            self._entries.clear()
+            return
+
+        for key in [key for key in self._entries if key[0] in can_ids]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import structlog
+
+from .models import ParsedResult
+
+logger = structlog.get_logger(__name__)
+
+
+class Conflator:
+    """
+    Режим последних значений для медленных потребителей.
+
+    Таблица по (dev_addr, can_id) перезаписывается на месте при каждом
+    сообщении и выгружается в sink раз в interval_ms: за один интервал
+    уходит не больше одного сообщения на ключ, независимо от входного потока.
+    """
+
+    def __init__(
+        self, sink: Callable[[ParsedResult], Awaitable[None]], interval_ms: float = 100.0
+    ) -> None:
+        self._sink = sink
+        self.interval = interval_ms / 1000
+        self._latest: dict[tuple[int, int], ParsedResult] = {}
+        self._task: asyncio.Task[None] | None = None
+        self.conflated = 0   # перезаписано до выгрузки
+        self.flushed = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._latest)
+
+    def update(self, message: ParsedResult) -> None:
+        key = (message.device_address, message.can_message_id)
+        if key in self._latest:
+            self.conflated += 1
+        # ✅ Существующий ключ сохраняет место в таблице - порядок выгрузки стабилен
+        self._latest[key] = message
+
+    async def flush(self) -> int:
+        """Выгрузка таблицы; новые сообщения во время выгрузки идут в следующий интервал"""
+        table, self._latest = self._latest, {}
+        for message in table.values():
+            await self._sink(message)
+        self.flushed += len(table)
+        return len(table)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("conflation_flush_error", error=str(e))
+
+    async def stop(self) -> None:
+        """Остановка с финальной выгрузкой"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+from collections.abc import Collection
+from typing import Any
+
+import cantools
+import numpy as np
+import structlog
+from cantools.database.conversion import (
+    IdentityConversion,
+    LinearIntegerConversion,
+    NamedSignalConversion,
+)
+from cantools.database.errors import DecodeError
+
+logger = structlog.get_logger(__name__)
+
+_INT64_MAX = (1 << 63) - 1
+
+
+def _fits_int64(mask: int, sign_bit: int, scale: Any, offset: Any) -> bool:
+    """Целочисленное преобразование raw * scale + offset не переполняет int64"""
+    magnitude = sign_bit if sign_bit else mask
+    return magnitude * abs(scale) + abs(offset) <= _INT64_MAX
+
+
+class CompiledSignal:
+    """Предвычисленная раскладка сигнала: сдвиг/маска/знак/масштаб"""
+    __slots__ = (
+        "name", "big_endian", "shift", "mask", "sign_bit",
+        "identity", "scale", "offset", "choices", "dtype", "wide",
+    )
+
+    def __init__(self, signal: cantools.database.Signal, message_length: int) -> None:
+        self.name = signal.name
+        self.big_endian = signal.byte_order == "big_endian"
+        if self.big_endian:
+            # Motorola: start - старший бит в пилообразной нумерации DBC.
+            # В int.from_bytes(data, 'big') сигнал непрерывен, младший бит здесь:
+            msb = (message_length - 1 - signal.start // 8) * 8 + signal.start % 8
+            self.shift = msb - signal.length + 1
+        else:
+            self.shift = signal.start
+        self.mask = (1 << signal.length) - 1
+        self.sign_bit = 1 << (signal.length - 1) if signal.is_signed else 0
+
+        conversion = signal.conversion
+        self.choices: dict[int, Any] | None = None
+        if isinstance(conversion, NamedSignalConversion):
+            self.choices = dict(conversion.choices)
+            conversion = conversion._conversion
+        self.identity = isinstance(conversion, IdentityConversion)
+        self.scale = 1 if self.identity else conversion.scale
+        self.offset = 0 if self.identity else conversion.offset
+
+        # Тип колонки при пакетном декодировании (совпадает с типом значения cantools)
+        if self.identity:
+            self.dtype = np.dtype(np.int64 if self.sign_bit else np.uint64)
+        elif isinstance(conversion, LinearIntegerConversion):
+            self.dtype = np.dtype(np.int64)
+        else:
+            self.dtype = np.dtype(np.float64)
+        self.wide = self._is_wide()
+
+    def _is_wide(self) -> bool:
+        """Целочисленный масштаб, выходящий за int64: колонка из целых Python (object)"""
+        return self.dtype.kind == "i" and not self.identity and not _fits_int64(
+            self.mask, self.sign_bit, self.scale, self.offset
+        )
+
+    @classmethod
+    def restore(
+        cls,
+        name: str,
+        big_endian: bool,
+        shift: int,
+        mask: int,
+        sign_bit: int,
+        identity: bool,
+        scale: Any,
+        offset: Any,
+        choices: dict[int, Any] | None,
+        dtype: np.dtype,
+    ) -> CompiledSignal:
+        """Сигнал из готовой раскладки (артефакт) - без объекта cantools"""
+        self = cls.__new__(cls)
+        self.name = name
+        self.big_endian = big_endian
+        self.shift = shift
+        self.mask = mask
+        self.sign_bit = sign_bit
+        self.identity = identity
+        self.scale = scale
+        self.offset = offset
+        self.choices = choices
+        self.dtype = dtype
+        self.wide = self._is_wide()
+        return self
+
+
+class CompiledMessage:
+    """
+    Специализированный декодер сообщения: одно int.from_bytes на байт-порядок
+    и таблица сдвигов/масок вместо обхода дерева сигналов cantools.
+    Результат совпадает с Message.decode() при параметрах по умолчанию.
+    """
+    __slots__ = ("frame_id", "name", "length", "signals", "_message", "_has_little", "_has_big")
+
+    def __init__(self, message: cantools.database.Message) -> None:
+        self.frame_id = message.frame_id
+        self.name = message.name
+        self.length = message.length
+        self.signals = tuple(CompiledSignal(signal, message.length) for signal in message.signals)
+        self._message = message
+        self._has_little = any(not s.big_endian for s in self.signals)
+        self._has_big = any(s.big_endian for s in self.signals)
+
+    @classmethod
+    def restore(
+        cls, frame_id: int, name: str, length: int, signals: tuple[CompiledSignal, ...]
+    ) -> CompiledMessage:
+        """Декодер из артефакта: сообщение cantools не загружается"""
+        self = cls.__new__(cls)
+        self.frame_id = frame_id
+        self.name = name
+        self.length = length
+        self.signals = signals
+        self._message = None
+        self._has_little = any(not s.big_endian for s in signals)
+        self._has_big = any(s.big_endian for s in signals)
+        return self
+
+    def select(self, names: Collection[str] | None) -> tuple[CompiledSignal, ...]:
+        """Сигналы проекции в порядке сообщения (None - все)"""
+        if names is None:
+            return self.signals
+        return tuple(signal for signal in self.signals if signal.name in names)
+
+    def decode(self, data: bytes, names: Collection[str] | None = None) -> dict[str, Any]:
+        """names - проекция: декодируются только перечисленные сигналы"""
+        length = self.length
+        if len(data) != length:
+            if len(data) < length:
+                # Укороченный кадр - пусть cantools сформирует свою ошибку
+                if self._message is None:
+                    raise DecodeError(f"Wrong data size: {len(data)} instead of {length} bytes")
+                return self._message.decode(data)
+            data = data[:length]
+
+        signals = self.signals if names is None else self.select(names)
+        little = int.from_bytes(data, "little") if self._has_little else 0
+        big = int.from_bytes(data, "big") if self._has_big else 0
+
+        decoded: dict[str, Any] = {}
+        for signal in signals:
+            raw = ((big if signal.big_endian else little) >> signal.shift) & signal.mask
+            if raw & signal.sign_bit:
+                raw -= signal.sign_bit << 1
+
+            if signal.choices is not None:
+                choice = signal.choices.get(raw)
+                if choice is not None:
+                    decoded[signal.name] = choice
+                    continue
+
+            decoded[signal.name] = raw if signal.identity else raw * signal.scale + signal.offset
+
+        return decoded
+
+    def decode_columns(self, payloads: np.ndarray) -> dict[str, np.ndarray]:
+        """
+        Колоночное декодирование группы кадров одного сообщения:
+        физические значения, см. raw_columns и scale_columns.
+        Таблицы значений (VAL_) не применяются, см. rows_from_columns.
+        """
+        return self.scale_columns(self.raw_columns(payloads))
+
+    def raw_columns(self, payloads: np.ndarray) -> dict[str, np.ndarray]:
+        """
+        Сырые целые значения сигналов для всех строк сразу.
+
+        payloads - матрица uint8 формы (N, 8): uint64 view, сдвиг, маска,
+        расширение знака. Знаковые сигналы - int64, беззнаковые - uint64.
+        """
+        if self.length > 8:
+            raise ValueError(f"Columnar decode supports up to 8 bytes, got {self.length}")
+
+        payloads = np.ascontiguousarray(payloads, dtype=np.uint8)
+        little = payloads.view("<u8").ravel() if self._has_little else None
+        big = payloads.view(">u8").ravel() if self._has_big else None
+        # Big-endian число из первых length байт = 8-байтное число >> лишние байты
+        big_padding = (8 - self.length) * 8
+
+        columns: dict[str, np.ndarray] = {}
+        for signal in self.signals:
+            if signal.big_endian:
+                raw = big >> np.uint64(signal.shift + big_padding)
+            else:
+                raw = little >> np.uint64(signal.shift)
+            raw = raw & np.uint64(signal.mask)
+
+            if signal.sign_bit:
+                spare = 64 - signal.mask.bit_length()
+                raw = (raw << np.uint64(spare)).view(np.int64) >> np.int64(spare)
+            columns[signal.name] = raw
+
+        return columns
+
+    def scale_columns(self, raw: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+        """
+        Физические значения из сырых колонок. Тип колонки - CompiledSignal.dtype:
+        целочисленные сигналы не теряют точность, масштабированные - float64.
+        Целый масштаб, выходящий за int64, считается в целых Python (как cantools).
+        """
+        columns: dict[str, np.ndarray] = {}
+        for signal in self.signals:
+            column = raw[signal.name]
+            if signal.identity:
+                columns[signal.name] = column
+            elif signal.wide:
+                columns[signal.name] = column.astype(object) * signal.scale + signal.offset
+            elif signal.dtype.kind == "i":
+                columns[signal.name] = column.astype(np.int64) * signal.scale + signal.offset
+            else:
+                columns[signal.name] = column.astype(np.float64) * signal.scale + signal.offset
+        return columns
+
+    def choice_columns(self, raw: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+        """Сырые колонки сигналов с таблицами значений - ключи для поиска меток"""
+        return {
+            signal.name: raw[signal.name] for signal in self.signals if signal.choices is not None
+        }
+
+    def rows_from_columns(
+        self, columns: dict[str, np.ndarray], raw: dict[str, np.ndarray]
+    ) -> list[dict[str, Any]]:
+        """Обратное преобразование колонок в словари сигналов (как у decode)"""
+        names = [signal.name for signal in self.signals]
+        values = [columns[name].tolist() for name in names]
+
+        for signal, column in zip(self.signals, values):
+            if signal.choices is not None:
+                # ✅ Метка ищется по сырому целому, а не по обращению масштаба
+                choices = signal.choices
+                for i, raw_value in enumerate(raw[signal.name].tolist()):
+                    choice = choices.get(raw_value)
+                    if choice is not None:
+                        column[i] = choice
+
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+    def row_from_columns(
+        self,
+        columns: dict[str, np.ndarray],
+        raw: dict[str, np.ndarray],
+        row: int,
+        names: Collection[str] | None = None,
+    ) -> dict[str, Any]:
+        """Словарь сигналов одной строки колонок (как у decode), с проекцией names"""
+        decoded: dict[str, Any] = {}
+        for signal in self.signals if names is None else self.select(names):
+            if signal.choices is not None:
+                choice = signal.choices.get(raw[signal.name][row].item())
+                if choice is not None:
+                    decoded[signal.name] = choice
+                    continue
+            value = columns[signal.name][row]
+            decoded[signal.name] = value.item() if isinstance(value, np.generic) else value
+        return decoded
+
+
+def compile_message(message: cantools.database.Message) -> CompiledMessage | None:
+    """Компиляция сообщения; None - если нужен универсальный декодер cantools"""
+    if message.is_multiplexed() or message.is_container:
+        reason = "multiplexed"
+    elif not message.signals:
+        reason = "no_signals"
+    elif any(signal.is_float for signal in message.signals):
+        reason = "float_signal"
+    elif any(signal.length <= 0 for signal in message.signals):
+        reason = "empty_signal"
+    else:
+        return CompiledMessage(message)
+
+    logger.debug("decoder_fallback", message=message.name, reason=reason)
+    return None
@@ -1,11 +1,21 @@
 # src/core/models.py
 from __future__ import annotations
 
+import time
+from collections.abc import Collection
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
+import numpy as np
 from pydantic import BaseModel, Field
 
+if TYPE_CHECKING:
+    from .decoder import CompiledMessage
+
+# 12-байтный кадр: адрес (<u2), 8 байт данных, CRC (<u2)
+FRAME_DTYPE = np.dtype([("addr", "<u2"), ("data", "u1", (8,)), ("crc", "<u2")])
+
 
 class CommAddr(BaseModel):
     dev_addr: int = Field(ge=0, le=31)      # 5 бит (0-31)
@@ -24,6 +34,44 @@ class CommData(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now)
 
 
+class CommAddrRecord:
+    """Быстрый аналог CommAddr без валидации (значения уже замаскированы парсером)"""
+    __slots__ = ("dev_addr", "msg_id", "reserved")
+
+    def __init__(self, dev_addr: int, msg_id: int, reserved: int) -> None:
+        self.dev_addr = dev_addr
+        self.msg_id = msg_id
+        self.reserved = reserved
+
+    @property
+    def is_broadcast(self) -> bool:
+        return self.dev_addr == 0
+
+    def to_model(self) -> CommAddr:
+        return CommAddr(dev_addr=self.dev_addr, msg_id=self.msg_id, reserved=self.reserved)
+
+
+class CommDataRecord:
+    """Быстрый аналог CommData для горячего пути; timestamp - время epoch в секундах"""
+    __slots__ = ("frame_id", "data", "crc16", "timestamp")
+
+    def __init__(
+        self, frame_id: CommAddrRecord, data: bytes, crc16: int, timestamp: float | None = None
+    ) -> None:
+        self.frame_id = frame_id
+        self.data = data
+        self.crc16 = crc16
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    def to_model(self) -> CommData:
+        return CommData(
+            frame_id=self.frame_id.to_model(),
+            data=self.data,
+            crc16=self.crc16,
+            timestamp=datetime.fromtimestamp(self.timestamp),
+        )
+
+
 class ParsedMessage(BaseModel):
     device_address: int
     packet_type: str
@@ -36,4 +84,152 @@ class ParsedMessage(BaseModel):
     timestamp: str
     parsed: bool
     source_topic: str | None = None
-    error: str | None = None
\ No newline at end of file
+    error: str | None = None
+
+
+class ParsedMessageRecord:
+    """
+    Быстрый аналог ParsedMessage: хранит сырые байты и CRC, строковые поля
+    (raw_payload, crc16, packet_type) формируются только при обращении.
+
+    Сигналы могут быть отложенными: вместо словаря передаётся скомпилированный
+    декодер (и колонки пакета со строкой row) - декодирование выполняется
+    при первом обращении к signals, а project() декодирует только нужные сигналы.
+    """
+    __slots__ = (
+        "device_address", "can_message_id", "message_name", "data", "crc",
+        "crc_valid", "parsed", "source_topic", "error", "timestamp",
+        "_signals", "_decoder", "_columns", "_raw", "_row", "_raw_payload",
+    )
+
+    def __init__(
+        self,
+        device_address: int,
+        can_message_id: int,
+        message_name: str | None,
+        signals: dict[str, Any] | None,
+        data: bytes | memoryview,
+        crc: int,
+        crc_valid: bool = True,
+        parsed: bool = True,
+        source_topic: str | None = None,
+        error: str | None = None,
+        timestamp: str = "",
+        *,
+        decoder: CompiledMessage | None = None,
+        columns: dict[str, np.ndarray] | None = None,
+        raw: dict[str, np.ndarray] | None = None,
+        row: int = 0,
+    ) -> None:
+        self.device_address = device_address
+        self.can_message_id = can_message_id
+        self.message_name = message_name
+        self.data = data
+        self.crc = crc
+        self.crc_valid = crc_valid
+        self.parsed = parsed
+        self.source_topic = source_topic
+        self.error = error
+        self.timestamp = timestamp
+        self._signals = signals
+        self._decoder = decoder
+        self._columns = columns
+        self._raw = raw
+        self._row = row
+        self._raw_payload: str | None = None
+
+    @property
+    def signals(self) -> dict[str, Any]:
+        if self._signals is None:
+            self._signals = self._decode(None)
+            self._decoder = self._columns = self._raw = None
+        return self._signals
+
+    @property
+    def is_decoded(self) -> bool:
+        return self._signals is not None
+
+    def project(self, names: Collection[str] | None) -> dict[str, Any]:
+        """Только перечисленные сигналы; отложенные декодируются лишь для них"""
+        if names is None:
+            return self.signals
+        if self._signals is not None:
+            return {name: value for name, value in self._signals.items() if name in names}
+        return self._decode(names)
+
+    def _decode(self, names: Collection[str] | None) -> dict[str, Any]:
+        if self._columns is not None:
+            return self._decoder.row_from_columns(self._columns, self._raw, self._row, names)
+        return self._decoder.decode(self.data, names)
+
+    @property
+    def packet_type(self) -> str:
+        return "broadcast" if self.device_address == 0 else "unicast"
+
+    @property
+    def raw_payload(self) -> str:
+        # ✅ hex формируется один раз и только по запросу
+        if self._raw_payload is None:
+            self._raw_payload = self.data.hex().upper()
+        return self._raw_payload
+
+    @property
+    def crc16(self) -> str:
+        return f"0x{self.crc:04X}"
+
+    def model_dump(self, exclude: set[str] | None = None) -> dict[str, Any]:
+        """Те же ключи и значения, что ParsedMessage.model_dump(); поля формируются только нужные"""
+        fields = (
+            "device_address", "packet_type", "can_message_id", "message_name", "signals",
+            "raw_payload", "crc16", "crc_valid", "timestamp", "parsed", "source_topic", "error",
+        )
+        return {name: getattr(self, name) for name in fields if not exclude or name not in exclude}
+
+    def to_model(self) -> ParsedMessage:
+        return ParsedMessage.model_construct(**self.model_dump())
+
+
+# Результат обработки кадра: валидированная модель или быстрая запись
+ParsedResult = ParsedMessage | ParsedMessageRecord
+
+
+def project_signals(message: ParsedResult, names: Collection[str] | None) -> dict[str, Any]:
+    """Проекция сигналов результата любого типа (None - все сигналы)"""
+    if isinstance(message, ParsedMessageRecord):
+        return message.project(names)
+    if names is None:
+        return message.signals
+    return {name: value for name, value in message.signals.items() if name in names}
+
+
+@dataclass(slots=True)
+class FrameBatch:
+    """Колоночный результат пакетного парсинга: по элементу массива на кадр"""
+    dev_addr: np.ndarray    # uint16
+    msg_id: np.ndarray      # uint16
+    reserved: np.ndarray    # uint16
+    data: np.ndarray        # uint8, форма (N, 8)
+    crc16: np.ndarray       # uint16
+    rejected: np.ndarray    # bool, True - кадр отброшен
+
+    def __len__(self) -> int:
+        return len(self.rejected)
+
+    @property
+    def accepted(self) -> np.ndarray:
+        return ~self.rejected
+
+
+@dataclass(slots=True)
+class DecodedColumns:
+    """Колоночный результат декодирования всех кадров одного CAN ID"""
+    can_id: int
+    message_name: str
+    rows: np.ndarray                 # индексы кадров во входном пакете
+    signals: dict[str, np.ndarray]   # имя сигнала -> значения по строкам
+    # Сырые целые сигналов с таблицами значений (VAL_) - ключи меток
+    raw: dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
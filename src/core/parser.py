@@ -2,43 +2,100 @@ from __future__ import annotations
 
 import struct
 from typing import Optional
+
+import numpy as np
 import structlog
 
-from .models import CommAddr, CommData
+from .models import FRAME_DTYPE, CommAddrRecord, CommDataRecord, FrameBatch
 from utils.crc import CRC16ARC
 
 logger = structlog.get_logger(__name__)
 
 
+# ✅ Предкомпилированные форматы для unpack_from по смещению
+_ADDR = struct.Struct('<H')
+_CRC = struct.Struct('<H')
+
+
 class FrameParser:
     def __init__(self) -> None:
-        self._addr_format = '<H'
-        self._crc_format = '<H'
         self._min_frame_size = 12
         
-    async def parse(self, frame: bytes) -> Optional[CommData]:
-        """ОПТИМИЗИРОВАНО: убираем async overhead"""
-        if len(frame) != self._min_frame_size:
+    async def parse(
+        self, frame: bytes | memoryview, offset: int | None = None
+    ) -> Optional[CommDataRecord]:
+        """
+        Разбор одного кадра (ровно 12 байт) или кадра по смещению offset в пакете.
+        ✅ Адрес и CRC читаются unpack_from прямо из исходного буфера, без срезов.
+        """
+        return self._parse_sync(frame, offset)
+    
+    def _parse_sync(
+        self, frame: bytes | memoryview, offset: int | None = None
+    ) -> Optional[CommDataRecord]:
+        if offset is None:
+            if len(frame) != self._min_frame_size:
+                return None
+            offset = 0
+        elif offset < 0 or len(frame) - offset < self._min_frame_size:
             return None
         
-        try:
-            addr_value = struct.unpack(self._addr_format, frame[:2])[0]
-            data = frame[2:10]
-            received_crc = struct.unpack(self._crc_format, frame[10:12])[0]
-            
-            dev_addr = addr_value & 0x1F
-            msg_id = (addr_value >> 5) & 0x7FF
-            reserved = (addr_value >> 16) & 0xFFFF
-            
-            expected_crc = CRC16ARC.calculate(frame[:10])
-            if received_crc != expected_crc:
-                return None
-            
-            comm_addr = CommAddr(dev_addr=dev_addr, msg_id=msg_id, reserved=reserved)
-            return CommData(frame_id=comm_addr, data=data, crc16=received_crc)
-            
-        except (struct.error, IndexError):
+        addr_value = _ADDR.unpack_from(frame, offset)[0]
+        received_crc = _CRC.unpack_from(frame, offset + 10)[0]
+        
+        dev_addr = addr_value & 0x1F
+        msg_id = (addr_value >> 5) & 0x7FF
+        reserved = (addr_value >> 16) & 0xFFFF
+        
+        # Диапазон CommAddr.msg_id (0-1023), как в parse_batch
+        if msg_id > 1023:
+            return None
+        
+        expected_crc = CRC16ARC.calculate(frame[offset:offset + 10])
+        if received_crc != expected_crc:
             return None
+        
+        # ✅ Единственная копия - 8 байт данных: они же ключ кэша декодирования.
+        # memoryview здесь невыгоден: сам объект (~184 байта) больше копии (~41 байт)
+        data = bytes(frame[offset + 2:offset + 10])
+        
+        # ✅ Без pydantic-валидации: значения уже в допустимых диапазонах
+        comm_addr = CommAddrRecord(dev_addr, msg_id, reserved)
+        return CommDataRecord(comm_addr, data, received_crc)
     
+    async def parse_batch(self, buf: bytes | memoryview) -> FrameBatch:
+        """Пакетный парсинг N кадров по 12 байт из одного буфера"""
+        return self._parse_batch_sync(buf)
+
+    def _parse_batch_sync(self, buf: bytes | memoryview) -> FrameBatch:
+        """
+        Векторизованный разбор: буфер читается как структурированный массив,
+        поля адреса извлекаются битовыми операциями, CRC проверяется пакетно.
+        Неполный хвост буфера (< 12 байт) отбрасывается.
+        """
+        count = len(buf) // self._min_frame_size
+        if count * self._min_frame_size != len(buf):
+            logger.debug("batch_partial_tail", size=len(buf) % self._min_frame_size)
+
+        frames = np.frombuffer(buf, dtype=FRAME_DTYPE, count=count)
+        addr = frames["addr"]
+
+        dev_addr = addr & 0x1F
+        msg_id = (addr >> 5) & 0x7FF
+        reserved = (addr.astype(np.uint32) >> 16).astype(np.uint16)
+
+        crc_ok = CRC16ARC.calculate_many(buf, stride=self._min_frame_size)
+        # msg_id вне диапазона CommAddr (0-1023) тоже отбрасываем
+        rejected = ~crc_ok | (msg_id > 1023)
+
+        return FrameBatch(
+            dev_addr=dev_addr,
+            msg_id=msg_id,
+            reserved=reserved,
+            data=frames["data"],
+            crc16=frames["crc"],
+            rejected=rejected,
+        )
+
     async def close(self) -> None:
         pass
\ No newline at end of file
@@ -1,24 +1,73 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict
-from functools import lru_cache
+from typing import Any, Dict
 
 import cantools
+import numpy as np
 import structlog
 
-from .models import CommData, ParsedMessage
+from .artifact import CompiledDatabase, load_database
+from .cache import DecodeCache
+from .decoder import CompiledMessage
+from .models import (
+    CommAddrRecord,
+    CommData,
+    CommDataRecord,
+    DecodedColumns,
+    FrameBatch,
+    ParsedMessageRecord,
+)
+from .schema import DBCSchema
 
 logger = structlog.get_logger(__name__)
 
 
+def _load_compiled(dbc_file: Path, use_artifact: bool) -> CompiledDatabase:
+    """
+    load_database; база cantools из артефакта не восстанавливается - если есть
+    сообщения для fallback-декодирования (мультиплексоры, float), DBC разбирается
+    здесь же, а не на первом таком кадре в event loop.
+    """
+    compiled = load_database(dbc_file, use_artifact)
+    if compiled.db is None and any(decoder is None for decoder in compiled.decoders.values()):
+        compiled.db = cantools.database.load_file(str(dbc_file))
+        logger.info("dbc_parsed_for_fallback", file=str(dbc_file))
+    return compiled
+
+
+@dataclass(slots=True, frozen=True)
+class DBCDiff:
+    """Изменения сообщений при перезагрузке DBC (CAN ID)"""
+    added: frozenset[int]
+    removed: frozenset[int]
+    changed: frozenset[int]
+    version: int  # версия словаря после перезагрузки
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
 class DBCProcessor:
     """ОПТИМИЗИРОВАННЫЙ DBC процессор - сохраняет все существующие интерфейсы!"""
     
-    def __init__(self, dbc_file: Path, max_workers: int = 4) -> None:
+    def __init__(
+        self,
+        dbc_file: Path,
+        max_workers: int = 4,
+        cache_size: int = 2000,
+        cache_enabled: bool = True,
+        use_artifact: bool = False,
+        schema_versions: Iterator[int] | None = None,
+    ) -> None:
         self.dbc_file = dbc_file
-        self.db: cantools.database.Database | None = None
+        # ✅ Предкомпилированный артефакт рядом с DBC (core.artifact): старт без разбора DBC
+        self.use_artifact = use_artifact
+        self._db: cantools.database.Database | None = None
         
         # ❌ УБИРАЕМ ThreadPoolExecutor - главный источник overhead!
         # self._executor = ThreadPoolExecutor(max_workers=max_workers, ...)
@@ -26,43 +75,122 @@ class DBCProcessor:
         # ✅ Предварительное кэширование ВСЕХ сообщений для мгновенного доступа
         self._message_cache: Dict[int, cantools.database.Message] = {}
         self._message_names: Dict[int, str] = {}
+        # ✅ Скомпилированные декодеры (None - fallback на cantools)
+        self._decoders: Dict[int, CompiledMessage | None] = {}
+        # Отпечатки раскладок сообщений - для сравнения при перезагрузке
+        self._layouts: Dict[int, bytes] = {}
+        # ✅ Собственный кэш декодирования (вместо lru_cache на методе)
+        self._decode_cache = DecodeCache(capacity=cache_size, enabled=cache_enabled)
+        # ✅ Словарь сигналов для компактного формата (версия растёт при загрузке)
+        self._schema: DBCSchema | None = None
+        self._schema_version = 0
+        # Общий счётчик версий у нескольких баз (DBCRouter): версии словарей не повторяются
+        self._schema_versions = schema_versions if schema_versions is not None else itertools.count(1)
 
     async def initialize(self) -> None:
         """Инициализация с предварительным кэшированием"""
         try:
-            # ✅ Синхронная загрузка (один раз при старте)
-            self.db = cantools.database.load_file(str(self.dbc_file))
+            # ✅ Разбор DBC в фоновом потоке: event loop не блокируется
+            compiled = await asyncio.to_thread(_load_compiled, self.dbc_file, self.use_artifact)
             
             # ✅ Кэшируем ВСЕ сообщения заранее
-            self._preload_all_messages()
+            self._preload_all_messages(compiled)
             
             logger.info(
                 "dbc_loaded", 
                 file=str(self.dbc_file), 
-                messages=len(self.db.messages),
-                cached=len(self._message_cache)
+                messages=len(self._message_names),
+                cached=len(self._message_cache),
+                compiled=sum(1 for d in self._decoders.values() if d is not None),
+                artifact=compiled.db is None,
             )
         except Exception as e:
             logger.error("dbc_load_failed", file=str(self.dbc_file), error=str(e))
             raise
 
-    def _preload_all_messages(self) -> None:
+    def _preload_all_messages(self, compiled: CompiledDatabase) -> None:
         """Загружаем все сообщения в кэш заранее"""
-        if not self.db:
-            return
-            
-        for message in self.db.messages:
-            self._message_cache[message.frame_id] = message
-            self._message_names[message.frame_id] = message.name
+        self._db = compiled.db
+        if compiled.db is not None:
+            self._message_cache.update((m.frame_id, m) for m in compiled.db.messages)
+        self._message_names.update(compiled.names)
+        self._decoders.update(compiled.decoders)
+        self._layouts = compiled.layouts
+
+        self._schema_version = next(self._schema_versions)
+        self._schema = DBCSchema(self._schema_version, compiled.messages)
+
+    @property
+    def db(self) -> cantools.database.Database | None:
+        """База cantools; None - загружено из артефакта и fallback-сообщений нет"""
+        return self._db
+
+    def _message(self, can_id: int) -> cantools.database.Message:
+        message = self._message_cache.get(can_id)
+        if message is None:
+            message = self.db.get_message_by_frame_id(can_id)
+            self._message_cache[can_id] = message
+        return message
+
+    async def reload(self, dbc_file: Path | None = None) -> DBCDiff:
+        """
+        Горячая перезагрузка DBC (по умолчанию - того же файла).
+        ✅ Разбор и компиляция идут в фоновом потоке, приём кадров не останавливается;
+        новые таблицы подменяются разом, без await между присваиваниями.
+        Кэш декодирования сбрасывается только для изменённых и удалённых CAN ID.
+        При ошибке загрузки остаётся прежняя база.
+        """
+        if self._schema is None:
+            raise RuntimeError("DBC processor not initialized")
+
+        dbc_file = Path(dbc_file) if dbc_file else self.dbc_file
+        compiled = await asyncio.to_thread(_load_compiled, dbc_file, self.use_artifact)
+
+        old, layouts = self._layouts, compiled.layouts
+        added = layouts.keys() - old.keys()
+        removed = old.keys() - layouts.keys()
+        changed = {can_id for can_id in layouts.keys() & old.keys() if layouts[can_id] != old[can_id]}
+        version = next(self._schema_versions) if added or removed or changed else self._schema_version
+        schema = DBCSchema(version, compiled.messages) if version != self._schema_version else self._schema
+
+        # ✅ Атомарная подмена: кадры, уже взятые в работу, доделываются старыми декодерами
+        self.dbc_file = dbc_file
+        self._db = compiled.db
+        self._message_cache = (
+            {m.frame_id: m for m in compiled.db.messages} if compiled.db is not None else {}
+        )
+        self._message_names = compiled.names
+        self._decoders = compiled.decoders
+        self._layouts = layouts
+        self._schema_version = version
+        self._schema = schema
+        self._decode_cache.invalidate(changed | removed)
+
+        diff = DBCDiff(frozenset(added), frozenset(removed), frozenset(changed), version)
+        logger.info(
+            "dbc_reloaded",
+            file=str(dbc_file),
+            added=len(diff.added),
+            removed=len(diff.removed),
+            changed=len(diff.changed),
+            version=version,
+        )
+        return diff
+
+    @property
+    def schema(self) -> DBCSchema:
+        if self._schema is None:
+            raise RuntimeError("DBC processor not initialized")
+        return self._schema
 
     async def process_message(
-        self, comm_data: CommData, source_topic: str = ""
-    ) -> ParsedMessage | None:
+        self, comm_data: CommData | CommDataRecord, source_topic: str = ""
+    ) -> ParsedMessageRecord | None:
         """
         КЛЮЧЕВАЯ ОПТИМИЗАЦИЯ: убираем run_in_executor!
         Сохраняем async интерфейс для совместимости, но обработка синхронная
         """
-        if not self.db:
+        if self._schema is None:
             raise RuntimeError("DBC processor not initialized")
 
         # ❌ Старый код с overhead:
@@ -73,55 +201,217 @@ class DBCProcessor:
         # ✅ Новый код - прямой вызов:
         return self._process_sync(comm_data, source_topic)
 
-    def _process_sync(self, comm_data: CommData, source_topic: str) -> ParsedMessage:
+    def _process_sync(
+        self, comm_data: CommData | CommDataRecord, source_topic: str
+    ) -> ParsedMessageRecord:
         """Оптимизированная синхронная обработка"""
         can_id = comm_data.frame_id.msg_id
         dev_addr = comm_data.frame_id.dev_addr
-        packet_type = "broadcast" if comm_data.frame_id.is_broadcast else "unicast"
 
         try:
             # ✅ Мгновенный доступ из предварительного кэша
-            message = self._message_cache.get(can_id)
-            if message is None:
-                message = self.db.get_message_by_frame_id(can_id)
-                self._message_cache[can_id] = message
-
-            # ✅ Кэшированное декодирование
-            decoded_signals = self._decode_message_fast(message, comm_data.data)
-
-            return ParsedMessage(
-                device_address=dev_addr,
-                packet_type=packet_type,
-                can_message_id=can_id,
-                message_name=self._message_names.get(can_id, message.name),
-                signals=decoded_signals,
-                raw_payload=comm_data.data.hex().upper(),
-                crc16=f"0x{comm_data.crc16:04X}",
-                crc_valid=True,
-                timestamp="",
-                parsed=True
+            message_name = self._message_names[can_id]
+
+            decoder = self._decoders.get(can_id)
+            if (
+                decoder is not None
+                and not self._decode_cache.enabled
+                and len(comm_data.data) >= decoder.length
+            ):
+                # ✅ Без кэша декодирование откладывается до обращения к сигналам:
+                # скомпилированный декодер на полном кадре не может завершиться ошибкой
+                return ParsedMessageRecord(
+                    dev_addr,
+                    can_id,
+                    message_name,
+                    None,
+                    comm_data.data,
+                    comm_data.crc16,
+                    source_topic=source_topic,
+                    decoder=decoder,
+                )
+
+            decoded_signals = dict(self._decode_message_fast(can_id, comm_data.data))
+
+            # ✅ Сырые данные и CRC - строки (hex, 0x...) формируются только по запросу
+            return ParsedMessageRecord(
+                dev_addr,
+                can_id,
+                message_name,
+                decoded_signals,
+                comm_data.data,
+                comm_data.crc16,
+                source_topic=source_topic,
             )
 
         except Exception as e:
             logger.debug("decode_error", can_id=can_id, error=str(e))
-            return ParsedMessage(
-                device_address=dev_addr,
-                packet_type=packet_type,
-                can_message_id=can_id,
-                message_name="Unknown",
-                signals={},
-                raw_payload=comm_data.data.hex().upper(),
-                crc16=f"0x{comm_data.crc16:04X}",
+            return ParsedMessageRecord(
+                dev_addr,
+                can_id,
+                "Unknown",
+                {},
+                comm_data.data,
+                comm_data.crc16,
                 crc_valid=False,
-                timestamp="",
                 parsed=False,
-                error=f"Unknown CAN ID: {can_id}"
+                source_topic=source_topic,
+                error=f"Unknown CAN ID: {can_id}",
             )
 
-    @lru_cache(maxsize=2000)  # ✅ Кэшируем результаты декодирования
-    def _decode_message_fast(self, message: cantools.database.Message, data: bytes) -> dict:
-        """Быстрое декодирование с кэшированием"""
-        return message.decode(data)
+    async def decode_batch(
+        self, msg_ids: np.ndarray, payloads: np.ndarray
+    ) -> Dict[int, DecodedColumns]:
+        """Колоночное декодирование пакета кадров, сгруппированного по CAN ID"""
+        if self._schema is None:
+            raise RuntimeError("DBC processor not initialized")
+
+        return self._decode_batch_sync(msg_ids, payloads)
+
+    def _decode_batch_sync(
+        self, msg_ids: np.ndarray, payloads: np.ndarray, fallback: bool = True
+    ) -> Dict[int, DecodedColumns]:
+        """
+        msg_ids - массив CAN ID (N,), payloads - uint8 (N, 8).
+        Неизвестные CAN ID в результат не попадают; при fallback=False
+        не попадают и сообщения без скомпилированного декодера.
+        """
+        msg_ids = np.asarray(msg_ids)
+        result: Dict[int, DecodedColumns] = {}
+        if len(msg_ids) == 0:
+            return result
+
+        # ✅ Стабильная сортировка: строки внутри группы сохраняют исходный порядок
+        order = np.argsort(msg_ids, kind="stable")
+        sorted_ids = msg_ids[order]
+        bounds = np.flatnonzero(np.diff(sorted_ids)) + 1
+
+        for rows in np.split(order, bounds):
+            can_id = int(msg_ids[rows[0]])
+            message_name = self._message_names.get(can_id)
+            if message_name is None:
+                logger.debug("batch_unknown_can_id", can_id=can_id, frames=len(rows))
+                continue
+
+            decoder = self._decoders.get(can_id)
+            group = payloads[rows]
+            raw: Dict[str, np.ndarray] = {}
+            if decoder is not None and decoder.length <= 8:
+                columns = decoder.raw_columns(group)
+                signals = decoder.scale_columns(columns)
+                raw = decoder.choice_columns(columns)
+            elif fallback:
+                signals = self._decode_rows(can_id, group)
+            else:
+                continue
+
+            result[can_id] = DecodedColumns(
+                can_id=can_id,
+                message_name=message_name,
+                rows=rows,
+                signals=signals,
+                raw=raw,
+            )
+
+        return result
+
+    def decode_frames(self, batch: FrameBatch) -> Dict[int, DecodedColumns]:
+        """
+        Колоночное декодирование принятых кадров FrameBatch скомпилированными
+        декодерами; rows - индексы в исходном пакете. Остальные кадры
+        (неизвестные CAN ID, fallback на cantools) обрабатывает build_messages.
+        """
+        accepted = batch.accepted.nonzero()[0]
+        decoded = self._decode_batch_sync(
+            batch.msg_id[accepted], batch.data[accepted], fallback=False
+        )
+        for columns in decoded.values():
+            columns.rows = accepted[columns.rows]
+        return decoded
+
+    def build_messages(
+        self, batch: FrameBatch, decoded: Dict[int, DecodedColumns], topics: list[str]
+    ) -> list[ParsedMessageRecord | None]:
+        """
+        ParsedMessageRecord для каждого кадра пакета (None - кадр отброшен парсером).
+        ✅ Сигналы из колонок decoded не разворачиваются в словари заранее:
+        запись ссылается на колонки и строку, словарь строится при обращении.
+        Остальные кадры декодируются по одному.
+        """
+        source_by_row: Dict[
+            int, tuple[CompiledMessage, dict[str, np.ndarray], dict[str, np.ndarray], int]
+        ] = {}
+        for can_id, columns in decoded.items():
+            decoder = self._decoders.get(can_id)
+            if decoder is None or [s.name for s in decoder.signals] != list(columns.signals):
+                # DBC перезагружен, пока пакет декодировался в пуле: такие кадры - по одному
+                continue
+            source = (decoder, columns.signals, columns.raw)
+            for local_row, row in enumerate(columns.rows.tolist()):
+                source_by_row[row] = (*source, local_row)
+
+        dev_addr = batch.dev_addr.tolist()
+        msg_id = batch.msg_id.tolist()
+        reserved = batch.reserved.tolist()
+        crc16 = batch.crc16.tolist()
+        payload = batch.data.tobytes()
+
+        messages: list[ParsedMessageRecord | None] = []
+        for i, rejected in enumerate(batch.rejected.tolist()):
+            if rejected:
+                messages.append(None)
+                continue
+
+            data = payload[i * 8:(i + 1) * 8]
+            source = source_by_row.get(i)
+            if source is None:
+                comm_data = CommDataRecord(
+                    CommAddrRecord(dev_addr[i], msg_id[i], reserved[i]), data, crc16[i]
+                )
+                messages.append(self._process_sync(comm_data, topics[i]))
+                continue
+
+            can_id = msg_id[i]
+            decoder, columns, raw, row = source
+            messages.append(ParsedMessageRecord(
+                dev_addr[i],
+                can_id,
+                self._message_names.get(can_id),
+                None,
+                data,
+                crc16[i],
+                source_topic=topics[i],
+                decoder=decoder,
+                columns=columns,
+                raw=raw,
+                row=row,
+            ))
+
+        return messages
+
+    def _decode_rows(self, can_id: int, payloads: np.ndarray) -> Dict[str, np.ndarray]:
+        """Построчный fallback через cantools (мультиплексоры, float сигналы)"""
+        decoded = [self._decode_message_fast(can_id, row.tobytes()) for row in payloads]
+        names = dict.fromkeys(name for row in decoded for name in row)
+        return {
+            # Сигналы мультиплексоров есть не во всех строках - заполняем None
+            name: np.array([row.get(name) for row in decoded])
+            for name in names
+        }
+
+    def _decode_message_fast(self, can_id: int, data: bytes) -> Mapping[str, Any]:
+        """Декодирование через кэш: скомпилированный декодер или cantools"""
+        cached = self._decode_cache.get(can_id, data)
+        if cached is not None:
+            return cached
+
+        decoder = self._decoders.get(can_id)
+        decoded = decoder.decode(data) if decoder is not None else self._message(can_id).decode(data)
+        return self._decode_cache.put(can_id, data, decoded)
+
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        return self._decode_cache.stats
 
     async def close(self) -> None:
         """Очистка ресурсов"""
@@ -132,6 +422,8 @@ class DBCProcessor:
         # ✅ Новый код:
         self._message_cache.clear()
         self._message_names.clear()
-        self._decode_message_fast.cache_clear()
+        self._decoders.clear()
+        self._layouts.clear()
+        self._decode_cache.clear()
         
         logger.info("dbc_processor_closed")
\ No newline at end of file
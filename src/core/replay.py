@@ -0,0 +1,333 @@
+"""
+Воспроизведение записанных кадров: нагрузочное тестирование и пакетное
+декодирование исторических данных.
+
+Форматы записи:
+    raw     - кадры по 12 байт подряд (отображается в память через mmap, без копий)
+    candump - журналы candump / PCAN trace (cantools.logreader)
+    blf/asc - журналы Vector (python-can, extra replay)
+
+Кадры журналов CAN переводятся в 12-байтный формат: идентификатор несёт
+слово адреса dev_addr | msg_id << 5, CRC16-ARC вычисляется пакетно.
+
+Запуск: python -m core.replay capture.log --dbc dbc/charging_station.dbc [--speed 1.0]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import mmap
+import os
+import sys
+import time
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import IO
+
+import numpy as np
+import orjson
+
+from core.models import FRAME_DTYPE, ParsedResult
+from core.parser import FrameParser
+from core.processor import DBCProcessor
+from utils.crc import CRC16ARC
+
+FRAME_SIZE = FRAME_DTYPE.itemsize
+
+CAPTURE_FORMATS = ("raw", "candump", "blf", "asc")
+_SUFFIX_FORMATS = {
+    ".log": "candump", ".trc": "candump", ".blf": "blf", ".asc": "asc",
+}
+
+# (топик, N × 12 байт) -> результаты кадров; DBCService.process_frame_batch или decode_handler
+ReplayHandler = Callable[[str, bytes | memoryview], Awaitable[list[ParsedResult | None]]]
+# Получатель результатов каждого пакета (выгрузка при backfill)
+ReplaySink = Callable[[list[ParsedResult | None]], None]
+
+
+def detect_format(path: Path) -> str:
+    """Формат по расширению; неизвестное расширение - сырые 12-байтные кадры"""
+    return _SUFFIX_FORMATS.get(path.suffix.lower(), "raw")
+
+
+@dataclass(slots=True)
+class CaptureChunk:
+    frames: bytes | memoryview        # N × 12 байт
+    timestamps: np.ndarray | None     # float64, секунды; None - в записи нет времени
+
+
+class Capture:
+    """Записанные кадры, читаемые пакетами по chunk_frames"""
+
+    def __init__(self, path: Path, format: str | None = None) -> None:
+        self.path = Path(path)
+        self.format = format or detect_format(self.path)
+        if self.format not in CAPTURE_FORMATS:
+            raise ValueError(f"Unknown capture format: {self.format}")
+        self.skipped = 0  # кадры журнала, непредставимые в 12-байтном формате
+
+    @property
+    def has_timestamps(self) -> bool:
+        return self.format != "raw"
+
+    def chunks(self, chunk_frames: int = 4096) -> Iterator[CaptureChunk]:
+        if self.format == "raw":
+            return self._read_raw(chunk_frames)
+        if self.format == "candump":
+            return self._read_candump(chunk_frames)
+        return self._read_vector(chunk_frames)
+
+    def _read_raw(self, chunk_frames: int) -> Iterator[CaptureChunk]:
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            usable = size - size % FRAME_SIZE
+            if not usable:
+                return
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        step = chunk_frames * FRAME_SIZE
+        try:
+            # ✅ Срезы отображения передаются парсеру без копирования
+            for start in range(0, usable, step):
+                yield CaptureChunk(view[start:min(start + step, usable)], None)
+        finally:
+            view.release()
+            try:
+                mapped.close()
+            except BufferError:
+                pass  # на страницы ещё ссылаются результаты - закроет сборщик мусора
+
+    def _read_candump(self, chunk_frames: int) -> Iterator[CaptureChunk]:
+        from cantools.logreader import Parser
+
+        def entries(stream: IO[str]) -> Iterator[tuple[float, int, bytes, bool]]:
+            for entry in Parser(stream):
+                timestamp = entry.timestamp
+                if isinstance(timestamp, datetime):
+                    seconds = timestamp.timestamp()
+                elif isinstance(timestamp, timedelta):
+                    seconds = timestamp.total_seconds()
+                else:
+                    seconds = float("nan")
+                # is_remote_frame есть не во всех версиях cantools
+                remote = getattr(entry, "is_remote_frame", False)
+                yield seconds, entry.frame_id, entry.data, not remote
+
+        with open(self.path, encoding="utf-8", errors="replace") as stream:
+            yield from self._pack(entries(stream), chunk_frames)
+
+    def _read_vector(self, chunk_frames: int) -> Iterator[CaptureChunk]:
+        try:
+            import can
+        except ImportError as e:
+            raise ImportError("BLF/ASC captures require python-can: pip install dbc-service[replay]") from e
+
+        reader = can.BLFReader(str(self.path)) if self.format == "blf" else can.ASCReader(str(self.path))
+        entries = (
+            (msg.timestamp, msg.arbitration_id, bytes(msg.data),
+             not (msg.is_remote_frame or msg.is_error_frame))
+            for msg in reader
+        )
+        try:
+            yield from self._pack(entries, chunk_frames)
+        finally:
+            stop = getattr(reader, "stop", None)
+            if stop:
+                stop()
+
+    def _pack(
+        self, entries: Iterable[tuple[float, int, bytes, bool]], chunk_frames: int
+    ) -> Iterator[CaptureChunk]:
+        """Кадры журнала -> 12-байтные кадры пакетами; CRC по колонкам"""
+        frames = np.zeros(chunk_frames, dtype=FRAME_DTYPE)
+        timestamps = np.empty(chunk_frames, dtype=np.float64)
+        count = 0
+        for timestamp, can_id, data, is_data in entries:
+            if not is_data or can_id > 0xFFFF or len(data) > 8:
+                self.skipped += 1
+                continue
+            frames["addr"][count] = can_id
+            frames["data"][count] = np.frombuffer(data.ljust(8, b"\x00"), dtype=np.uint8)
+            timestamps[count] = timestamp
+            count += 1
+            if count == chunk_frames:
+                yield self._chunk(frames, timestamps, count)
+                count = 0
+        if count:
+            yield self._chunk(frames, timestamps, count)
+
+    @staticmethod
+    def _chunk(frames: np.ndarray, timestamps: np.ndarray, count: int) -> CaptureChunk:
+        rows = frames[:count].view(np.uint8).reshape(count, FRAME_SIZE)
+        frames["crc"][:count] = CRC16ARC.calculate_columns(rows[:, :FRAME_SIZE - 2])
+        ts = timestamps[:count].copy()
+        return CaptureChunk(frames[:count].tobytes(), None if np.isnan(ts).any() else ts)
+
+
+@dataclass(slots=True)
+class ReplayReport:
+    frames: int
+    decoded: int
+    errors: int
+    skipped: int
+    duration_s: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_p99_ms: float
+
+    @property
+    def frames_per_second(self) -> float:
+        return self.frames / self.duration_s if self.duration_s > 0 else 0.0
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            "frames": self.frames,
+            "decoded": self.decoded,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "duration_s": round(self.duration_s, 3),
+            "frames_per_second": round(self.frames_per_second, 1),
+            "latency_p50_ms": round(self.latency_p50_ms, 3),
+            "latency_p95_ms": round(self.latency_p95_ms, 3),
+            "latency_p99_ms": round(self.latency_p99_ms, 3),
+        }
+
+
+def decode_handler(processor: DBCProcessor, parser: FrameParser | None = None) -> ReplayHandler:
+    """Пакетный парсинг и декодирование без сервиса (backfill)"""
+    parser = parser or FrameParser()
+
+    async def handle(topic: str, frames: bytes | memoryview) -> list[ParsedResult | None]:
+        batch = await parser.parse_batch(frames)
+        decoded = processor.decode_frames(batch)
+        return processor.build_messages(batch, decoded, [topic] * len(batch))
+
+    return handle
+
+
+async def replay(
+    capture: Capture,
+    handler: ReplayHandler,
+    topic: str = "replay",
+    speed: float | None = None,
+    chunk_frames: int = 4096,
+    sink: ReplaySink | None = None,
+) -> ReplayReport:
+    """
+    Прогон записи через handler. speed=None - с максимальной скоростью,
+    иначе по записанному времени, ускоренному в speed раз.
+    Задержка - от запланированного времени первого кадра отправленной
+    части (при максимальной скорости - от начала её обработки) до получения результатов.
+    """
+    if speed is not None and speed <= 0:
+        raise ValueError("speed must be positive")
+    if speed is not None and not capture.has_timestamps:
+        raise ValueError(f"{capture.format} capture has no timestamps, replay it at max speed")
+
+    latencies: list[float] = []
+    frames_total = decoded = 0
+    origin: float | None = None
+    start = time.perf_counter()
+
+    async def dispatch(frames: bytes | memoryview, scheduled: float) -> None:
+        nonlocal frames_total, decoded
+        results = await handler(topic, frames)
+        latencies.append(time.perf_counter() - scheduled)
+        frames_total += len(frames) // FRAME_SIZE
+        decoded += sum(1 for message in results if message is not None and message.parsed)
+        if sink:
+            sink(results)
+
+    for chunk in capture.chunks(chunk_frames):
+        if speed is None:
+            await dispatch(chunk.frames, time.perf_counter())
+            continue
+        if chunk.timestamps is None:
+            raise ValueError("capture has frames without timestamps, replay it at max speed")
+
+        ts = chunk.timestamps
+        if origin is None:
+            origin = float(ts[0])
+        pos = 0
+        while pos < len(ts):
+            # ✅ Отправляются сразу все кадры, время которых наступило
+            due = origin + (time.perf_counter() - start) * speed
+            end = int(np.searchsorted(ts, due, side="right"))
+            if end <= pos:
+                await asyncio.sleep((ts[pos] - due) / speed)
+                continue
+            scheduled = start + (ts[pos] - origin) / speed
+            await dispatch(chunk.frames[pos * FRAME_SIZE:end * FRAME_SIZE], scheduled)
+            pos = end
+
+    duration = time.perf_counter() - start
+    p50, p95, p99 = (
+        np.percentile(np.array(latencies) * 1000, [50, 95, 99]) if latencies else (0.0, 0.0, 0.0)
+    )
+    return ReplayReport(
+        frames=frames_total,
+        decoded=decoded,
+        errors=frames_total - decoded,
+        skipped=capture.skipped,
+        duration_s=duration,
+        latency_p50_ms=float(p50),
+        latency_p95_ms=float(p95),
+        latency_p99_ms=float(p99),
+    )
+
+
+def jsonl_sink(output: IO[bytes]) -> ReplaySink:
+    """Декодированные кадры - строками JSON (backfill в файл); метки VAL_ - строкой, как в gRPC JSON"""
+    def write(results: list[ParsedResult | None]) -> None:
+        output.write(b"".join(
+            orjson.dumps(
+                message.model_dump(),
+                default=str,
+                option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY,
+            )
+            for message in results
+            if message is not None
+        ))
+    return write
+
+
+async def _run(args: argparse.Namespace) -> ReplayReport:
+    processor = DBCProcessor(args.dbc, use_artifact=True)
+    await processor.initialize()
+    output = open(args.output, "wb") if args.output else None
+    try:
+        return await replay(
+            Capture(args.capture, args.format),
+            decode_handler(processor),
+            topic=args.topic,
+            speed=args.speed,
+            chunk_frames=args.chunk,
+            sink=jsonl_sink(output) if output else None,
+        )
+    finally:
+        if output:
+            output.close()
+        await processor.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Воспроизведение записи с отчётом: кадров/с и перцентили задержки"""
+    parser = argparse.ArgumentParser(prog="python -m core.replay", description=main.__doc__)
+    parser.add_argument("capture", type=Path)
+    parser.add_argument("--dbc", type=Path, required=True)
+    parser.add_argument("--format", choices=CAPTURE_FORMATS)
+    parser.add_argument("--speed", type=float, help="по записанному времени, ускорение в N раз")
+    parser.add_argument("--chunk", type=int, default=4096, help="кадров в пакете")
+    parser.add_argument("--topic", default="replay")
+    parser.add_argument("--output", type=Path, help="декодированные кадры в JSON Lines")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(_run(args))
+    sys.stdout.buffer.write(orjson.dumps(report.to_dict(), option=orjson.OPT_APPEND_NEWLINE))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import dataclasses
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import structlog
+
+from .models import CommData, CommDataRecord, DecodedColumns, FrameBatch, ParsedMessageRecord
+from .processor import DBCDiff, DBCProcessor
+from .schema import DBCSchema
+
+logger = structlog.get_logger(__name__)
+
+DEVICE_ADDRESSES = 32  # dev_addr - 5 бит COMM_ADDR
+DEFAULT_DATABASE = "default"
+
+_NO_ROUTE = 0xFF
+
+
+class DBCRouter:
+    """
+    Несколько DBC в одном сервисе: кадр декодируется базой, выбранной по
+    топику запроса или по диапазону адресов устройств.
+
+    Правило топика сильнее правила адреса; кадры без правила - в базу
+    по умолчанию. Таблицы маршрутизации строятся при добавлении правил:
+    выбор базы - один dict lookup по топику или индекс в таблице на 32
+    адреса. У каждой базы свои декодеры и кэши, перезагружается каждая
+    отдельно.
+    """
+
+    def __init__(self, default: DBCProcessor) -> None:
+        self._names: list[str] = [DEFAULT_DATABASE]
+        self._processors: list[DBCProcessor] = [default]
+        self._by_topic: Dict[str, int] = {}
+        # ✅ dev_addr -> номер базы (0xFF - правила нет)
+        self._by_device = np.full(DEVICE_ADDRESSES, _NO_ROUTE, dtype=np.uint8)
+
+    @property
+    def default(self) -> DBCProcessor:
+        return self._processors[0]
+
+    @property
+    def databases(self) -> Dict[str, DBCProcessor]:
+        return dict(zip(self._names, self._processors))
+
+    def add_database(
+        self,
+        name: str,
+        processor: DBCProcessor,
+        topics: Iterable[str] = (),
+        device_ranges: Iterable[tuple[int, int]] = (),
+    ) -> None:
+        """device_ranges - включительные диапазоны адресов (first, last)"""
+        if name in self._names:
+            raise ValueError(f"Duplicate DBC database: {name}")
+        index = len(self._processors)
+        if index >= _NO_ROUTE:
+            raise ValueError("Too many DBC databases")
+
+        topics = list(topics)
+        for topic in topics:
+            if topic in self._by_topic:
+                owner = self._names[self._by_topic[topic]]
+                raise ValueError(f"Topic {topic!r} is already routed to {owner}")
+        devices = np.zeros(DEVICE_ADDRESSES, dtype=bool)
+        for first, last in device_ranges:
+            if not 0 <= first <= last < DEVICE_ADDRESSES:
+                raise ValueError(f"Invalid device address range: {first}-{last}")
+            devices[first:last + 1] = True
+        conflicts = devices & (self._by_device != _NO_ROUTE)
+        if conflicts.any():
+            raise ValueError(
+                f"Device addresses {np.flatnonzero(conflicts).tolist()} are already routed"
+            )
+
+        self._names.append(name)
+        self._processors.append(processor)
+        self._by_topic.update(dict.fromkeys(topics, index))
+        self._by_device[devices] = index
+        logger.info(
+            "dbc_route_added",
+            database=name,
+            file=str(processor.dbc_file),
+            topics=topics,
+            devices=np.flatnonzero(devices).tolist(),
+        )
+
+    def get(self, name: str | None) -> DBCProcessor:
+        if not name:
+            return self.default
+        try:
+            return self._processors[self._names.index(name)]
+        except ValueError:
+            raise KeyError(f"Unknown DBC database: {name}") from None
+
+    def route(self, topic: str, dev_addr: int) -> DBCProcessor:
+        index = self._by_topic.get(topic)
+        if index is None:
+            index = self._by_device[dev_addr]
+            if index == _NO_ROUTE:
+                return self._processors[0]
+        return self._processors[index]
+
+    def schema_for(self, topic: str = "", dev_addr: int | None = None) -> DBCSchema:
+        """
+        Словарь базы топика (база по умолчанию, если правила топика нет);
+        с dev_addr - базы, которой декодируются кадры этого адреса.
+        """
+        if dev_addr is not None:
+            return self.route(topic, dev_addr).schema
+        return self._processors[self._by_topic.get(topic, 0)].schema
+
+    def route_batch(self, batch: FrameBatch, topics: list[str]) -> np.ndarray:
+        """Номер базы для каждого кадра пакета"""
+        routes = self._by_device[batch.dev_addr & (DEVICE_ADDRESSES - 1)]
+        routes = np.where(routes == _NO_ROUTE, 0, routes)
+        if not self._by_topic:
+            return routes
+
+        if len(set(topics)) == 1:
+            # Пакетный запрос: один топик на все кадры
+            index = self._by_topic.get(topics[0])
+            return routes if index is None else np.full(len(routes), index, dtype=np.uint8)
+        by_topic = np.fromiter(
+            (self._by_topic.get(topic, _NO_ROUTE) for topic in topics),
+            dtype=np.uint8, count=len(topics),
+        )
+        return np.where(by_topic == _NO_ROUTE, routes, by_topic)
+
+    async def initialize(self) -> None:
+        for processor in self._processors:
+            await processor.initialize()
+
+    async def reload(self, name: str | None = None, dbc_file: Path | None = None) -> DBCDiff:
+        """Перезагрузка одной базы; остальные продолжают работу без изменений"""
+        return await self.get(name).reload(dbc_file)
+
+    async def process_message(
+        self, comm_data: CommData | CommDataRecord, source_topic: str = ""
+    ) -> ParsedMessageRecord | None:
+        processor = self.route(source_topic, comm_data.frame_id.dev_addr)
+        return await processor.process_message(comm_data, source_topic)
+
+    def decode_frames(
+        self, batch: FrameBatch, topics: list[str]
+    ) -> list[tuple[DBCProcessor, FrameBatch, Dict[int, DecodedColumns]]]:
+        """
+        Колоночное декодирование: пакет делится по базам, каждая часть -
+        тот же FrameBatch, где кадры других баз помечены отброшенными.
+        """
+        routes = self.route_batch(batch, topics)
+        used = np.unique(routes[batch.accepted]).tolist()
+        if len(used) <= 1:
+            processor = self._processors[used[0] if used else 0]
+            return [(processor, batch, processor.decode_frames(batch))]
+
+        parts = []
+        for index in used:
+            part = dataclasses.replace(batch, rejected=batch.rejected | (routes != index))
+            processor = self._processors[index]
+            parts.append((processor, part, processor.decode_frames(part)))
+        return parts
+
+    def build_messages(
+        self,
+        parts: list[tuple[DBCProcessor, FrameBatch, Dict[int, DecodedColumns]]],
+        topics: list[str],
+    ) -> list[ParsedMessageRecord | None]:
+        """Сборка результатов частей decode_frames в исходном порядке кадров"""
+        processor, batch, decoded = parts[0]
+        messages = processor.build_messages(batch, decoded, topics)
+        for processor, batch, decoded in parts[1:]:
+            rows = batch.accepted.nonzero()[0].tolist()
+            part = processor.build_messages(batch, decoded, topics)
+            for row in rows:
+                messages[row] = part[row]
+        return messages
+
+    async def close(self) -> None:
+        for processor in self._processors:
+            await processor.close()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import cantools
+
+from .decoder import CompiledMessage
+
+# Тип значения сигнала в компактном формате
+KIND_INTEGER = "integer"    # int64
+KIND_UNSIGNED = "unsigned"  # uint64 (передаётся побитово в int64)
+KIND_FLOAT = "float"        # float64, отсутствующий сигнал - NaN
+
+
+@dataclass(slots=True, frozen=True)
+class SignalInfo:
+    name: str
+    unit: str
+    kind: str
+    choices: dict[int, str] | None = None  # ключи - сырые значения
+    # Физическое значение = raw * scale + offset (ключ метки VAL_ по значению)
+    scale: float = 1
+    offset: float = 0
+
+
+@dataclass(slots=True, frozen=True)
+class MessageInfo:
+    """Описание сообщения для словаря: index - номер в компактных записях"""
+    index: int
+    can_id: int
+    name: str
+    signals: tuple[SignalInfo, ...]
+
+
+@dataclass(slots=True, frozen=True)
+class DBCSchema:
+    """Словарь сообщений и сигналов; version меняется при каждой загрузке DBC"""
+    version: int
+    messages: dict[int, MessageInfo]  # can_id -> MessageInfo
+
+
+def _signal_kind(signal: cantools.database.Signal, decoder: CompiledMessage | None) -> str:
+    if decoder is None:
+        # Универсальный декодер cantools: мультиплексоры, float - всегда float64
+        return KIND_FLOAT
+    compiled = next(s for s in decoder.signals if s.name == signal.name)
+    if compiled.dtype.kind == "u":
+        return KIND_UNSIGNED
+    if compiled.dtype.kind == "i":
+        return KIND_INTEGER
+    return KIND_FLOAT
+
+
+def schema_messages(
+    db: cantools.database.Database,
+    decoders: dict[int, CompiledMessage | None],
+) -> dict[int, MessageInfo]:
+    """Описания сообщений по загруженной базе; порядок сигналов совпадает с декодером"""
+    messages: dict[int, MessageInfo] = {}
+    for index, message in enumerate(sorted(db.messages, key=lambda m: m.frame_id)):
+        decoder = decoders.get(message.frame_id)
+        signals = tuple(
+            SignalInfo(
+                name=signal.name,
+                unit=signal.unit or "",
+                kind=_signal_kind(signal, decoder),
+                choices={int(k): str(v) for k, v in signal.choices.items()} if signal.choices else None,
+                scale=signal.scale,
+                offset=signal.offset,
+            )
+            for signal in message.signals
+        )
+        messages[message.frame_id] = MessageInfo(index, message.frame_id, message.name, signals)
+    return messages
+
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Collection, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from cantools.database.namedsignalvalue import NamedSignalValue
+
+from .models import FRAME_DTYPE, ParsedResult, project_signals
+from .schema import DBCSchema
+
+_ADDR_SLOTS = 1 << 5   # dev_addr: 5 бит
+_ID_SLOTS = 1 << 11    # msg_id: 11 бит
+
+# Словарь базы, декодировавшей результат (масштаб сигналов VAL_)
+SchemaLookup = Callable[[ParsedResult], DBCSchema]
+
+
+@dataclass(slots=True, frozen=True)
+class SignalRange:
+    """Предикат значения: кадр проходит, если сигнал в [min, max]"""
+    signal: str
+    min: float | None = None
+    max: float | None = None
+
+    def contains(self, value: Any) -> bool:
+        # NamedSignalValue (VAL_) без словаря базы - по сырому значению
+        value = getattr(value, "value", value)
+        if self.min is not None and value < self.min:
+            return False
+        if self.max is not None and value > self.max:
+            return False
+        return True
+
+
+def _lookup_table(values: Iterable[int] | None, size: int) -> bytes | None:
+    """Таблица принадлежности: table[x] == 1, если x выбран (None - все)"""
+    if not values:
+        return None
+    table = bytearray(size)
+    for value in values:
+        if 0 <= value < size:
+            table[value] = 1
+    return bytes(table)
+
+
+class Subscription:
+    """
+    Фильтр подписки одного вызова или потока.
+
+    Адреса устройств и CAN ID проверяются по кадру до декодирования
+    (таблицы на все 32 адреса и 2048 ID - O(1) на кадр, векторно для пакета).
+    Сигналы задают проекцию, ranges и deadband проверяются по декодированным
+    значениям. deadband - режим "только изменения": кадр выдаётся, если
+    хотя бы один сигнал изменился больше чем на deadband с последней выдачи
+    (0 - любое изменение); состояние хранится по (dev_addr, can_id).
+    Значения VAL_ сравниваются в физических единицах (raw * scale + offset),
+    как в компактном потоке; масштаб берётся из словаря schema.
+    """
+
+    def __init__(
+        self,
+        dev_addrs: Collection[int] | None = None,
+        can_ids: Collection[int] | None = None,
+        signals: Collection[str] | None = None,
+        ranges: Collection[SignalRange] = (),
+        deadband: float | None = None,
+        schema: SchemaLookup | None = None,
+    ) -> None:
+        self.signals = frozenset(signals) if signals else None
+        self.ranges = tuple(ranges)
+        self.deadband = deadband
+        self._schema = schema
+        self._dev_table = _lookup_table(dev_addrs, _ADDR_SLOTS)
+        self._id_table = _lookup_table(can_ids, _ID_SLOTS)
+        # Для предикатов нужны и сигналы вне проекции
+        self._needed = (
+            self.signals | {r.signal for r in self.ranges} if self.signals is not None else None
+        )
+        self._last: dict[tuple[int, int], dict[str, Any]] = {}
+
+    @property
+    def filters_frames(self) -> bool:
+        """Есть ли фильтр по адресу или CAN ID (отбор до декодирования)"""
+        return self._dev_table is not None or self._id_table is not None
+
+    @property
+    def filters_values(self) -> bool:
+        return bool(self.ranges) or self.deadband is not None
+
+    def accepts(self, dev_addr: int, can_id: int) -> bool:
+        if self._dev_table is not None and not self._dev_table[dev_addr & 0x1F]:
+            return False
+        if self._id_table is not None and not self._id_table[can_id & 0x7FF]:
+            return False
+        return True
+
+    def accepts_frame(self, frame: bytes) -> bool:
+        """Проверка сырого кадра по полю адреса - без разбора и проверки CRC"""
+        if len(frame) < 2:
+            return True  # отбросит парсер
+        addr = frame[0] | frame[1] << 8
+        return self.accepts(addr & 0x1F, (addr >> 5) & 0x7FF)
+
+    def frame_mask(self, dev_addr: np.ndarray, msg_id: np.ndarray) -> np.ndarray | None:
+        """Маска интересующих кадров пакета (None - подходят все)"""
+        mask = None
+        if self._dev_table is not None:
+            mask = np.frombuffer(self._dev_table, dtype=np.bool_)[dev_addr & 0x1F]
+        if self._id_table is not None:
+            ids = np.frombuffer(self._id_table, dtype=np.bool_)[msg_id & 0x7FF]
+            mask = ids if mask is None else mask & ids
+        return mask
+
+    def buffer_mask(self, frames: bytes) -> np.ndarray | None:
+        """frame_mask по буферу N × 12 байт (читается только поле адреса)"""
+        if not self.filters_frames:
+            return None
+        count = len(frames) // FRAME_DTYPE.itemsize
+        addr = np.frombuffer(frames, dtype=FRAME_DTYPE, count=count)["addr"]
+        return self.frame_mask(addr & 0x1F, (addr >> 5) & 0x7FF)
+
+    def admit(self, message: ParsedResult) -> bool:
+        """Проверка декодированного кадра предикатами и deadband"""
+        if not self.filters_values:
+            return True
+        # ✅ У отложенных записей декодируются только нужные сигналы
+        signals = project_signals(message, self._needed)
+        if self._schema is not None:
+            signals = self._physical(message, signals)
+        for signal_range in self.ranges:
+            value = signals.get(signal_range.signal)
+            if value is not None and not signal_range.contains(value):
+                return False
+        if self.deadband is None:
+            return True
+
+        key = (message.device_address, message.can_message_id)
+        last = self._last.get(key)
+        if last is not None and not self._changed(last, signals):
+            return False
+        self._last[key] = signals
+        return True
+
+    def _physical(self, message: ParsedResult, signals: dict[str, Any]) -> dict[str, Any]:
+        """Метки VAL_ -> физические значения (словарь копируется, только если они есть)"""
+        named = [name for name, value in signals.items() if isinstance(value, NamedSignalValue)]
+        if not named:
+            return signals
+        info = self._schema(message).messages.get(message.can_message_id)
+        if info is None:
+            return signals
+        conversions = {signal.name: signal for signal in info.signals}
+        physical = dict(signals)
+        for name in named:
+            signal = conversions.get(name)
+            if signal is not None:
+                physical[name] = signals[name].value * signal.scale + signal.offset
+        return physical
+
+    def _changed(self, last: dict[str, Any], signals: dict[str, Any]) -> bool:
+        projection = self.signals
+        for name, value in signals.items():
+            if projection is not None and name not in projection:
+                continue
+            previous = last.get(name)
+            if previous is None:
+                return True
+            value = getattr(value, "value", value)
+            previous = getattr(previous, "value", previous)
+            if isinstance(value, (int, float)) and isinstance(previous, (int, float)):
+                if abs(value - previous) > self.deadband:
+                    return True
+            elif value != previous:
+                return True
+        return False
+
+    def apply(self, frames: bytes, messages: list[ParsedResult | None]) -> list[bool]:
+        """
+        Отбор результатов пакета: True - кадр не прошёл фильтр
+        (его результат заменяется на None).
+        """
+        filtered = [False] * len(messages)
+        mask = self.buffer_mask(frames)
+        keep = mask.tolist() if mask is not None else None
+        for i, message in enumerate(messages):
+            if keep is not None and not keep[i]:
+                filtered[i] = True
+                messages[i] = None
+            elif message is not None and not self.admit(message):
+                filtered[i] = True
+                messages[i] = None
+        return filtered
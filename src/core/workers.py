@@ -0,0 +1,419 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+import structlog
+
+from .models import FRAME_DTYPE, DecodedColumns, FrameBatch
+
+logger = structlog.get_logger(__name__)
+
+FRAME_SIZE = FRAME_DTYPE.itemsize
+
+# Статус кадра в выходном кольце
+STATUS_REJECTED = 0   # отброшен парсером (CRC, диапазон msg_id)
+STATUS_DECODED = 1    # сигналы записаны воркером
+STATUS_DEFERRED = 2   # принят, но декодируется в основном процессе
+
+
+class _SharedRing:
+    """
+    Кольцо из `slots` слотов в shared memory для одного воркера.
+
+    Вход: slots × slot_frames × 12 байт кадров.
+    Выход: статус (uint8) и значения сигналов (8 байт на сигнал) на каждый кадр.
+    """
+
+    def __init__(
+        self, slots: int, slot_frames: int, max_signals: int, names: tuple[str, str] | None = None
+    ) -> None:
+        self.slots = slots
+        self.slot_frames = slot_frames
+        self.max_signals = max_signals
+
+        input_size = slots * slot_frames * FRAME_SIZE
+        output_size = slots * slot_frames * (1 + 8 * max_signals)
+        if names is None:
+            self.input = shared_memory.SharedMemory(create=True, size=input_size)
+            self.output = shared_memory.SharedMemory(create=True, size=output_size)
+        else:
+            self.input = shared_memory.SharedMemory(name=names[0])
+            self.output = shared_memory.SharedMemory(name=names[1])
+
+        self.frames = np.ndarray(
+            (slots, slot_frames * FRAME_SIZE), dtype=np.uint8, buffer=self.input.buf
+        )
+        values_offset = slots * slot_frames
+        self.status = np.ndarray(
+            (slots, slot_frames), dtype=np.uint8, buffer=self.output.buf
+        )
+        self.values = np.ndarray(
+            (slots, slot_frames, max_signals), dtype="<u8",
+            buffer=self.output.buf, offset=values_offset,
+        )
+
+    @property
+    def names(self) -> tuple[str, str]:
+        return self.input.name, self.output.name
+
+    def close(self, unlink: bool = False) -> None:
+        # numpy представления держат экспортированные буферы - освобождаем их до close()
+        del self.frames, self.status, self.values
+        self.input.close()
+        self.output.close()
+        if unlink:
+            self.input.unlink()
+            self.output.unlink()
+
+
+class DecodeWorkerError(RuntimeError):
+    """Воркер не обработал слот: ошибка декодирования или процесс завершился"""
+
+
+def _decode_slot(
+    decoders: Dict[int, Any], parser: Any, frames: memoryview | bytes,
+    status: np.ndarray, values: np.ndarray,
+) -> None:
+    """Парсинг и сырые значения сигналов слота; общий для воркера и резервного пути"""
+    batch = parser._parse_batch_sync(frames)
+    status[:] = np.where(batch.rejected, STATUS_REJECTED, STATUS_DEFERRED)
+
+    accepted = batch.accepted.nonzero()[0]
+    msg_ids = batch.msg_id[accepted]
+    for can_id in np.unique(msg_ids).tolist():
+        decoder = decoders.get(can_id)
+        if decoder is None or decoder.length > 8:
+            continue
+        rows = accepted[msg_ids == can_id]
+        status[rows] = STATUS_DECODED
+        # ✅ Передаются сырые целые (8 байт): масштаб и метки VAL_ -
+        # в основном процессе, без потерь точности
+        for j, column in enumerate(decoder.raw_columns(batch.data[rows]).values()):
+            values[rows, j] = column.view("<u8")
+
+
+def _worker_main(
+    dbc_file: str,
+    ring_names: tuple[str, str],
+    slots: int,
+    slot_frames: int,
+    max_signals: int,
+    conn: Connection,
+    use_artifact: bool = False,
+) -> None:
+    """Цикл воркера: свой DBCProcessor, кадры и результаты - через shared memory"""
+    from .parser import FrameParser
+    from .processor import DBCProcessor
+
+    processor = DBCProcessor(Path(dbc_file), cache_enabled=False, use_artifact=use_artifact)
+    asyncio.run(processor.initialize())
+    parser = FrameParser()
+    ring = _SharedRing(slots, slot_frames, max_signals, ring_names)
+    conn.send("ready")
+
+    try:
+        while True:
+            request = conn.recv()
+            if request is None:
+                break
+            slot, count = request
+            # Ошибка пакета не завершает воркер: слот возвращается с текстом ошибки
+            try:
+                _decode_slot(
+                    processor._decoders,
+                    parser,
+                    ring.frames[slot, :count * FRAME_SIZE].data,
+                    ring.status[slot, :count],
+                    ring.values[slot, :count],
+                )
+                conn.send((slot, None))
+            except Exception as e:
+                conn.send((slot, f"{type(e).__name__}: {e}"))
+    except (EOFError, BrokenPipeError, KeyboardInterrupt):
+        pass
+    finally:
+        ring.close()
+
+
+class DecodeWorkerPool:
+    """
+    Пул процессов для parse + decode.
+
+    Каждый воркер загружает собственный DBCProcessor. Кадры шардируются
+    по dev_addr (один адрес - всегда один воркер), результаты собираются
+    обратно в исходном порядке, так что порядок по адресу сохраняется.
+    Через pipe ходят только номера слотов и количества кадров.
+    """
+
+    def __init__(
+        self,
+        dbc_file: Path,
+        workers: int = 4,
+        slot_frames: int = 1000,
+        slots: int = 2,
+        use_artifact: bool = False,
+    ) -> None:
+        self.dbc_file = dbc_file
+        # ✅ Воркеры стартуют из артефакта, собранного основным процессом
+        self.use_artifact = use_artifact
+        self.workers = max(1, workers)
+        self.slot_frames = slot_frames
+        self.slots = slots
+
+        self._processes: list[mp.process.BaseProcess] = []
+        self._conns: list[Connection] = []
+        self._rings: list[_SharedRing] = []
+        self._free_slots: list[asyncio.Queue[int]] = []
+        self._pending: Dict[tuple[int, int], asyncio.Future[Any]] = {}
+        # Воркер жив и принимает слоты; иначе его слоты декодируются в основном процессе
+        self._alive: list[bool] = []
+        self._restarts: set[asyncio.Task[None]] = set()
+        self._closing = False
+        self.restarts = 0
+        # Декодеры на момент запуска: ими же загружены воркеры
+        self._decoders: Dict[int, Any] = {}
+        self._parser: Any = None
+        self._active = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def start(self, processor: Any) -> None:
+        """processor - инициализированный DBCProcessor основного процесса (схема сигналов)"""
+        from .parser import FrameParser
+
+        self._decoders = dict(processor._decoders)
+        self._parser = FrameParser()
+        max_signals = max(
+            (len(d.signals) for d in self._decoders.values() if d is not None), default=1
+        )
+
+        for index in range(self.workers):
+            self._rings.append(_SharedRing(self.slots, self.slot_frames, max_signals))
+            self._conns.append(self._spawn(index))
+            self._alive.append(False)
+            free: asyncio.Queue[int] = asyncio.Queue()
+            for slot in range(self.slots):
+                free.put_nowait(slot)
+            self._free_slots.append(free)
+
+        for index in range(self.workers):
+            if not await self._wait_ready(index):
+                raise RuntimeError(f"Decode worker {index} failed to start")
+
+        logger.info("decode_workers_started", workers=self.workers, max_signals=max_signals)
+
+    def _spawn(self, index: int) -> Connection:
+        """Процесс воркера над уже созданным кольцом index"""
+        ring = self._rings[index]
+        parent_conn, child_conn = mp.get_context("spawn").Pipe()
+        process = mp.get_context("spawn").Process(
+            target=_worker_main,
+            args=(str(self.dbc_file), ring.names, self.slots, self.slot_frames,
+                  ring.max_signals, child_conn, self.use_artifact),
+            name=f"dbc-decode-{index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        if index < len(self._processes):
+            self._processes[index] = process
+        else:
+            self._processes.append(process)
+        return parent_conn
+
+    async def _wait_ready(self, index: int) -> bool:
+        conn = self._conns[index]
+        loop = asyncio.get_running_loop()
+        try:
+            ready = await loop.run_in_executor(None, conn.recv)
+        except (EOFError, OSError):
+            return False
+        if ready != "ready":
+            return False
+        self._alive[index] = True
+        loop.add_reader(conn.fileno(), self._on_reply, index)
+        return True
+
+    def _on_reply(self, index: int) -> None:
+        conn = self._conns[index]
+        try:
+            while conn.poll():
+                slot, error = conn.recv()
+                future = self._pending.pop((index, slot), None)
+                if future is None or future.done():
+                    continue
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(DecodeWorkerError(error))
+        except (EOFError, OSError):
+            self._worker_lost(index)
+
+    def _worker_lost(self, index: int) -> None:
+        """Воркер завершился: ожидающие слоты - в основной процесс, воркер перезапускается"""
+        if not self._alive[index]:
+            return
+        self._alive[index] = False
+        asyncio.get_running_loop().remove_reader(self._conns[index].fileno())
+        for key in [key for key in self._pending if key[0] == index]:
+            future = self._pending.pop(key)
+            if not future.done():
+                future.set_exception(DecodeWorkerError("decode worker exited"))
+
+        logger.error(
+            "decode_worker_exited", worker=index, exitcode=self._processes[index].exitcode
+        )
+        if not self._closing:
+            task = asyncio.create_task(self._restart(index))
+            self._restarts.add(task)
+            task.add_done_callback(self._restarts.discard)
+
+    async def _restart(self, index: int) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._processes[index].join, 5)
+        self._conns[index].close()
+        self._conns[index] = self._spawn(index)
+        if await self._wait_ready(index):
+            self.restarts += 1
+            logger.info("decode_worker_restarted", worker=index)
+        else:
+            # Воркер не поднимается: слоты остаются в основном процессе
+            logger.error("decode_worker_restart_failed", worker=index)
+
+    async def _run_slot(self, index: int, rows: np.ndarray, frames: np.ndarray,
+                        status: np.ndarray, values: np.ndarray) -> None:
+        slot = await self._free_slots[index].get()
+        ring = self._rings[index]
+        try:
+            count = len(rows)
+            if self._alive[index]:
+                ring.frames[slot, :count * FRAME_SIZE] = frames[rows].view(np.uint8).ravel()
+                future = asyncio.get_running_loop().create_future()
+                self._pending[(index, slot)] = future
+                try:
+                    self._conns[index].send((slot, count))
+                    await future
+                except (DecodeWorkerError, BrokenPipeError, OSError) as e:
+                    self._pending.pop((index, slot), None)
+                    logger.warning("decode_slot_failed", worker=index, frames=count, error=str(e))
+                else:
+                    status[rows] = ring.status[slot, :count]
+                    values[rows] = ring.values[slot, :count]
+                    return
+
+            # ✅ Резервный путь: тот же разбор в основном процессе
+            slot_status = np.empty(count, dtype=np.uint8)
+            slot_values = np.zeros((count, values.shape[1]), dtype="<u8")
+            _decode_slot(self._decoders, self._parser, frames[rows].tobytes(),
+                         slot_status, slot_values)
+            status[rows] = slot_status
+            values[rows] = slot_values
+        finally:
+            self._free_slots[index].put_nowait(slot)
+
+    async def process(self, buffer: bytes | memoryview) -> tuple[FrameBatch, Dict[int, DecodedColumns]]:
+        """Тот же результат, что parse_batch + decode_frames, но в воркерах"""
+        self._active += 1
+        self._idle.clear()
+        try:
+            return await self._process(buffer)
+        finally:
+            self._active -= 1
+            if not self._active:
+                self._idle.set()
+
+    async def drain(self) -> None:
+        """Ожидание пакетов, уже отданных воркерам (перед заменой пула)"""
+        await self._idle.wait()
+
+    async def _process(self, buffer: bytes | memoryview) -> tuple[FrameBatch, Dict[int, DecodedColumns]]:
+        count = len(buffer) // FRAME_SIZE
+        frames = np.frombuffer(buffer, dtype=FRAME_DTYPE, count=count)
+        addr = frames["addr"]
+        dev_addr = addr & 0x1F
+
+        status = np.zeros(count, dtype=np.uint8)
+        values = np.zeros((count, self._rings[0].max_signals), dtype="<u8")
+
+        tasks = []
+        shard = dev_addr % self.workers
+        for index in range(self.workers):
+            rows = np.flatnonzero(shard == index)
+            for start in range(0, len(rows), self.slot_frames):
+                chunk = rows[start:start + self.slot_frames]
+                tasks.append(self._run_slot(index, chunk, frames, status, values))
+        await asyncio.gather(*tasks)
+
+        batch = FrameBatch(
+            dev_addr=dev_addr,
+            msg_id=(addr >> 5) & 0x7FF,
+            reserved=(addr.astype(np.uint32) >> 16).astype(np.uint16),
+            data=frames["data"],
+            crc16=frames["crc"],
+            rejected=status == STATUS_REJECTED,
+        )
+        return batch, self._collect(batch, status, values)
+
+    def _collect(
+        self, batch: FrameBatch, status: np.ndarray, values: np.ndarray
+    ) -> Dict[int, DecodedColumns]:
+        """Восстановление колонок по CAN ID из сырых значений воркеров"""
+        rows = np.flatnonzero(status == STATUS_DECODED)
+        msg_ids = batch.msg_id[rows]
+        result: Dict[int, DecodedColumns] = {}
+
+        for can_id in np.unique(msg_ids).tolist():
+            group = rows[msg_ids == can_id]
+            decoder = self._decoders[can_id]
+            raw = {
+                signal.name: values[group, j].view(np.int64 if signal.sign_bit else np.uint64)
+                for j, signal in enumerate(decoder.signals)
+            }
+            result[can_id] = DecodedColumns(
+                can_id=can_id,
+                message_name=decoder.name,
+                rows=group,
+                signals=decoder.scale_columns(raw),
+                raw=decoder.choice_columns(raw),
+            )
+        return result
+
+    async def close(self) -> None:
+        self._closing = True
+        for task in list(self._restarts):
+            task.cancel()
+        loop = asyncio.get_running_loop()
+        for index, conn in enumerate(self._conns):
+            if self._alive[index]:
+                loop.remove_reader(conn.fileno())
+                self._alive[index] = False
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+
+        for process in self._processes:
+            await loop.run_in_executor(None, process.join, 5)
+            if process.is_alive():
+                process.terminate()
+
+        for conn in self._conns:
+            conn.close()
+        for ring in self._rings:
+            ring.close(unlink=True)
+
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        self._conns.clear()
+        self._rings.clear()
+        self._processes.clear()
+        self._free_slots.clear()
+        self._alive.clear()
+        logger.info("decode_workers_stopped")
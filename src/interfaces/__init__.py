@@ -1,3 +1,5 @@
 from .grpc.server import GRPCServer
+from .ingest import IngestServer
+from .socketcan import SocketCANSource
 
-__all__ = ["GRPCServer", "RedisPubSub"]
+__all__ = ["GRPCServer", "IngestServer", "SocketCANSource", "RedisPubSub"]
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Callable
+from typing import Any
+
+from cantools.database.namedsignalvalue import NamedSignalValue
+
+from core.models import ParsedResult, project_signals
+from core.schema import KIND_FLOAT, KIND_UNSIGNED, DBCSchema, SignalInfo
+
+from .protocol import pb2
+
+_SIGNAL_KINDS = {
+    "integer": pb2.SIGNAL_INTEGER,
+    "unsigned": pb2.SIGNAL_UNSIGNED,
+    "float": pb2.SIGNAL_FLOAT,
+}
+
+
+def schema_to_proto(schema: DBCSchema, projection: frozenset[str] | None = None) -> Any:
+    """Словарь DBCSchema -> protobuf Schema (с проекцией - только выбранные сигналы)"""
+    return pb2.Schema(
+        version=schema.version,
+        messages=[
+            pb2.MessageSchema(
+                index=info.index,
+                can_message_id=info.can_id,
+                name=info.name,
+                signals=[
+                    pb2.SignalSchema(
+                        name=signal.name,
+                        unit=signal.unit,
+                        kind=_SIGNAL_KINDS[signal.kind],
+                        choices=signal.choices or {},
+                        scale=signal.scale,
+                        offset=signal.offset,
+                    )
+                    for signal in info.signals
+                    if projection is None or signal.name in projection
+                ],
+            )
+            for info in schema.messages.values()
+        ],
+    )
+
+
+class CompactEncoder:
+    """
+    Кодировщик одного компактного потока.
+
+    Словарь отправляется в первом ответе и повторно только при смене
+    его версии (перезагрузка DBC); дальше каждый кадр - индекс сообщения,
+    адрес устройства и физические значения сигналов в упакованных массивах.
+    С проекцией в словаре и записях только выбранные сигналы.
+    """
+
+    def __init__(self, projection: frozenset[str] | None = None) -> None:
+        self.projection = projection
+        self.sent_version = 0
+        self._selected: dict[int, tuple[SignalInfo, ...]] = {}
+
+    def encode(
+        self,
+        schema: DBCSchema,
+        messages: list[ParsedResult | None],
+        filtered: list[bool] | None = None,
+        device_schema: Callable[[int], DBCSchema] | None = None,
+    ) -> Any:
+        """
+        filtered[i] - кадр не прошёл фильтр подписки (статус FRAME_FILTERED).
+        device_schema(dev_addr) - словарь базы, декодировавшей кадры адреса:
+        кадры другой базы (маршрут по адресу) не описаны словарём потока -
+        статус FRAME_UNKNOWN.
+        """
+        status = bytearray(len(messages))
+        message_index: list[int] = []
+        device_address: list[int] = []
+        integers: list[int] = []
+        values: list[float] = []
+
+        known = schema.messages
+        if schema.version != self.sent_version:
+            self._selected.clear()
+        projection = self.projection
+        # dev_addr -> кадры адреса декодированы базой словаря потока
+        own_device: dict[int, bool] = {}
+        for i, message in enumerate(messages):
+            if message is None:
+                if filtered is not None and filtered[i]:
+                    status[i] = pb2.FRAME_FILTERED
+                continue  # FRAME_REJECTED = 0
+            info = known.get(message.can_message_id)
+            if info is None or not message.parsed:
+                status[i] = pb2.FRAME_UNKNOWN
+                continue
+            if device_schema is not None:
+                own = own_device.get(message.device_address)
+                if own is None:
+                    own = own_device[message.device_address] = (
+                        device_schema(message.device_address) is schema
+                    )
+                if not own:
+                    status[i] = pb2.FRAME_UNKNOWN
+                    continue
+
+            status[i] = pb2.FRAME_DECODED
+            message_index.append(info.index)
+            device_address.append(message.device_address)
+            selected = self._selected.get(info.can_id)
+            if selected is None:
+                selected = self._selected[info.can_id] = tuple(
+                    s for s in info.signals if projection is None or s.name in projection
+                )
+            # ✅ Декодируются только сигналы проекции
+            signals = project_signals(message, projection)
+            for signal in selected:
+                value = signals.get(signal.name)
+                if isinstance(value, NamedSignalValue):
+                    # Метка VAL_ хранит сырое значение: в слот - физическое, как у остальных кадров
+                    value = value.value * signal.scale + signal.offset
+                if signal.kind == KIND_FLOAT:
+                    values.append(math.nan if value is None else value)
+                elif signal.kind == KIND_UNSIGNED and value >= 1 << 63:
+                    integers.append(value - (1 << 64))
+                else:
+                    integers.append(value)
+
+        batch = pb2.CompactBatch(
+            count=len(messages),
+            status=bytes(status),
+            message_index=message_index,
+            device_address=device_address,
+            integers=integers,
+            values=values,
+        )
+        if schema.version != self.sent_version:
+            batch.schema.CopyFrom(schema_to_proto(schema, projection))
+            self.sent_version = schema.version
+        return batch
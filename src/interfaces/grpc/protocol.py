@@ -0,0 +1,17 @@
+"""
+Сгенерированные protobuf/gRPC модули для dbc_service.proto.
+
+Модули генерируются grpc_tools.protoc на шаге сборки (make proto / python setup.py,
+при сборке пакета - скрипт сборки poetry) и не хранятся в репозитории.
+"""
+from __future__ import annotations
+
+try:
+    from . import dbc_service_pb2 as pb2
+    from . import dbc_service_pb2_grpc as pb2_grpc
+except ImportError as e:
+    raise ImportError(
+        "gRPC stubs for dbc_service.proto are not generated: run `make proto`"
+    ) from e
+
+__all__ = ["pb2", "pb2_grpc"]
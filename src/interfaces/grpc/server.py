@@ -1,93 +1,564 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import AsyncIterator, Callable
+from collections.abc import AsyncIterator, Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 
+import grpc
 import orjson
 import structlog
 from grpc import aio
 
 from config import GRPCConfig  # Абсолютный импорт
-from core.models import ParsedMessage  # Абсолютный импорт
+from core.bus import OverflowPolicy, PublishBus
+from core.conflation import Conflator
+from core.models import (  # Абсолютный импорт
+    FRAME_DTYPE,
+    ParsedMessageRecord,
+    ParsedResult,
+    project_signals,
+)
+from core.processor import DBCDiff
+from core.schema import DBCSchema
+from core.subscriptions import SchemaLookup, SignalRange, Subscription
+
+from .compact import CompactEncoder, schema_to_proto
+from .protocol import pb2, pb2_grpc
 
 logger = structlog.get_logger(__name__)
 
 
-class DBCServicer:
-    def __init__(self) -> None:
-        self._message_handler: Callable[[str, bytes], None] | None = None
-        self._output_queue: asyncio.Queue[ParsedMessage] = asyncio.Queue()
+ReplyCallback = Callable[[ParsedResult | None], None]
+MessageHandler = Callable[[str, bytes, ReplyCallback | None], Awaitable[None]]
+BatchHandler = Callable[[str, bytes, Subscription | None], Awaitable[list[ParsedResult | None]]]
+# Словарь сигналов базы, в которую маршрутизируется топик
+SchemaProvider = Callable[[str, int | None], DBCSchema]
+# (dbc_file, имя базы) -> изменения
+ReloadHandler = Callable[[Path | None, str | None], Awaitable[DBCDiff]]
+
+_END = object()  # маркер конца потока ответов
+
+_INT64_MAX = (1 << 63) - 1
+
+# Метаданные клиента для режима совместимости: x-response-format: json
+RESPONSE_FORMAT_KEY = "x-response-format"
+
+_OVERFLOW_POLICIES: dict[int, OverflowPolicy | None] = {
+    pb2.OVERFLOW_DEFAULT: None,
+    pb2.OVERFLOW_BLOCK: "block",
+    pb2.OVERFLOW_DROP_OLDEST: "drop_oldest",
+    pb2.OVERFLOW_DROP_NEWEST: "drop_newest",
+    pb2.OVERFLOW_CONFLATE: "conflate",
+}
+
+
+def subscription_from_request(
+    request: Any, schema: SchemaLookup | None = None
+) -> Subscription | None:
+    """Subscription из FrameRequest/FrameBatchRequest (None - фильтр не задан)"""
+    if not request.HasField("subscription") and not request.signals:
+        return None
+    # Поле signals запроса - краткая форма проекции
+    return subscription_from_proto(request.subscription, request.signals, schema)
+
+
+def subscription_from_proto(
+    spec: Any, signals: Any = (), schema: SchemaLookup | None = None
+) -> Subscription:
+    return Subscription(
+        dev_addrs=spec.device_addresses,
+        can_ids=spec.can_message_ids,
+        signals=spec.signals or signals,
+        ranges=[
+            SignalRange(
+                r.signal,
+                r.min if r.HasField("min") else None,
+                r.max if r.HasField("max") else None,
+            )
+            for r in spec.ranges
+        ],
+        deadband=spec.deadband if spec.HasField("deadband") else None,
+        schema=schema,
+    )
+
+
+@dataclass(slots=True, frozen=True)
+class _Filtered:
+    """Кадр не прошёл фильтр подписки (адрес - для сопоставления с запросом)"""
+    device_address: int
+    can_message_id: int
+
+
+class FrameStream:
+    """
+    Выходной канал одного вызова ProcessFrames.
+
+    Результаты кладутся сюда сразу после декодирования (reply), поток
+    закрывается, когда клиент закончил отправку и ответы на все кадры выданы.
+    Не более max_pending кадров могут ждать ответа: дальше чтение запросов
+    приостанавливается (backpressure через HTTP/2 flow control к клиенту).
+    """
+
+    def __init__(self, max_pending: int) -> None:
+        self._queue: asyncio.Queue[Any] = asyncio.Queue()
+        # Подписка потока (из первого запроса, где она задана)
+        self.subscription: Subscription | None = None
+        self._credits = asyncio.Semaphore(max(1, max_pending))
+        self.outstanding = 0
+        self.input_done = False
+
+    async def expect(self) -> None:
+        await self._credits.acquire()
+        self.outstanding += 1
+
+    async def skip(self, dev_addr: int, can_id: int) -> None:
+        """Кадр не прошёл фильтр подписки: ответ без передачи обработчику"""
+        await self.expect()
+        self.reply(_Filtered(dev_addr, can_id))
+
+    def reply(self, message: ParsedResult | _Filtered | None) -> None:
+        """Результат кадра этого потока (None - кадр отброшен, _Filtered - вне подписки)"""
+        self.outstanding -= 1
+        self._queue.put_nowait(message)
+        self._maybe_finish()
+
+    def finish_input(self) -> None:
+        self.input_done = True
+        self._maybe_finish()
+
+    def _maybe_finish(self) -> None:
+        if self.input_done and self.outstanding <= 0:
+            self._queue.put_nowait(_END)
+
+    async def __aiter__(self) -> AsyncIterator[ParsedResult | _Filtered | None]:
+        while True:
+            item = await self._queue.get()
+            if item is _END:
+                return
+            yield item
+            self._credits.release()
+
+
+class DBCServicer(pb2_grpc.DBCServiceServicer):
+    def __init__(
+        self,
+        stream_queue_size: int = 10000,
+        response_format: str = "typed",
+        bus: PublishBus | None = None,
+    ) -> None:
+        self.bus = bus or PublishBus()
+        self._message_handler: MessageHandler | None = None
+        self._batch_handler: BatchHandler | None = None
+        self._schema_provider: SchemaProvider | None = None
+        self._reload_handler: ReloadHandler | None = None
+        # События смены словаря для потоков WatchSchema
+        self._schema_watchers: set[asyncio.Event] = set()
+        self._stream_queue_size = stream_queue_size
+        self._response_format = response_format
+        self._streams: set[FrameStream] = set()
     
-    def set_message_handler(self, handler: Callable[[str, bytes], None]) -> None:
+    def set_message_handler(self, handler: MessageHandler) -> None:
         self._message_handler = handler
     
+    def set_batch_handler(self, handler: BatchHandler) -> None:
+        self._batch_handler = handler
+    
+    def set_schema_provider(self, provider: SchemaProvider) -> None:
+        self._schema_provider = provider
+    
+    def set_reload_handler(self, handler: ReloadHandler) -> None:
+        self._reload_handler = handler
+    
+    def notify_schema_changed(self) -> None:
+        """Словарь сменился (перезагрузка DBC): будим потоки WatchSchema.
+        Компактные потоки отправят новый словарь со следующим ответом."""
+        for event in self._schema_watchers:
+            event.set()
+    
+    @property
+    def active_streams(self) -> int:
+        return len(self._streams)
+    
+    def _schema_lookup(self) -> SchemaLookup | None:
+        """Словарь базы результата - для фильтров значений сигналов VAL_"""
+        provider = self._schema_provider
+        if provider is None:
+            return None
+        return lambda message: provider(message.source_topic or "", message.device_address)
+    
     async def ProcessFrames(self, request_iterator: AsyncIterator[Any], context: Any) -> AsyncIterator[Any]:
+        """
+        Full-duplex поток: чтение запросов и выдача ответов идут независимо,
+        каждый поток получает результаты только своих кадров.
+        """
+        as_json = self._wants_json(context)
+        stream = FrameStream(self._stream_queue_size)
+        self._streams.add(stream)
+        reader = asyncio.create_task(self._read_requests(request_iterator, stream))
+        try:
+            async for message in stream:
+                subscription = stream.subscription
+                # Ответ на каждый кадр, как статусы в пакетных вызовах
+                if isinstance(message, _Filtered):
+                    yield self._create_filtered_response(message)
+                elif message is None:
+                    yield self._create_error_response("Invalid frame")
+                elif subscription is None:
+                    yield self._create_response(message, as_json)
+                elif subscription.admit(message):
+                    yield self._create_response(message, as_json, subscription.signals)
+                else:
+                    yield self._create_filtered_response(message)
+        finally:
+            reader.cancel()
+            self._streams.discard(stream)
+    
+    async def _read_requests(self, request_iterator: AsyncIterator[Any], stream: FrameStream) -> None:
+        try:
+            async for request in request_iterator:
+                if not self._message_handler:
+                    continue
+                if stream.subscription is None:
+                    stream.subscription = subscription_from_request(request, self._schema_lookup())
+                subscription = stream.subscription
+                # ✅ Кадр вне подписки не доходит даже до парсера
+                if subscription is not None and not subscription.accepts_frame(request.payload):
+                    addr = int.from_bytes(request.payload[:2], "little")
+                    await stream.skip(addr & 0x1F, addr >> 5)
+                    continue
+                await stream.expect()
+                try:
+                    await self._message_handler(request.topic, request.payload, stream.reply)
+                except Exception as e:
+                    logger.error("grpc_frame_error", topic=request.topic, error=str(e))
+                    stream.reply(None)
+        finally:
+            stream.finish_input()
+    
+    async def ProcessFrameBatch(self, request: Any, context: Any) -> Any:
+        """Один запрос - пакет кадров (N × 12 байт) через пакетный парсинг и декодирование"""
+        subscription = subscription_from_request(request, self._schema_lookup())
+        return await self._process_batch(request, subscription, self._wants_json(context))
+    
+    async def StreamFrameBatches(self, request_iterator: AsyncIterator[Any], context: Any) -> AsyncIterator[Any]:
+        """
+        Поток пакетов: ответ на каждый пакет в порядке поступления.
+        Подписка задаётся первым запросом, где она есть, и действует до конца потока.
+        """
+        as_json = self._wants_json(context)
+        subscription: Subscription | None = None
+        async for request in request_iterator:
+            if subscription is None:
+                subscription = subscription_from_request(request, self._schema_lookup())
+            yield await self._process_batch(request, subscription, as_json)
+    
+    async def _process_batch(
+        self, request: Any, subscription: Subscription | None, as_json: bool
+    ) -> Any:
+        if not self._batch_handler:
+            return pb2.FrameBatchResponse()
+        
+        messages = await self._run_batch(request, subscription)
+        if subscription is None:
+            return self._create_batch_response(messages, as_json)
+        filtered = subscription.apply(request.frames, messages)
+        return self._create_batch_response(messages, as_json, subscription.signals, filtered)
+    
+    async def StreamCompactFrames(self, request_iterator: AsyncIterator[Any], context: Any) -> AsyncIterator[Any]:
+        """Поток пакетов в компактном формате: словарь сигналов + упакованные значения"""
+        encoder: CompactEncoder | None = None
+        subscription: Subscription | None = None
         async for request in request_iterator:
-            if self._message_handler:
-                asyncio.create_task(
-                    self._handle_frame(request.topic, request.payload)
-                )
-            
-            try:
-                response = await asyncio.wait_for(self._output_queue.get(), timeout=1.0)
-                yield self._create_response(response)
-            except asyncio.TimeoutError:
+            if not self._batch_handler or not self._schema_provider:
+                yield pb2.CompactBatch()
                 continue
+            if encoder is None:
+                # Подписка задаётся первым запросом потока, её проекция определяет словарь
+                subscription = subscription_from_request(request, self._schema_lookup())
+                encoder = CompactEncoder(subscription.signals if subscription else None)
+            messages = await self._run_batch(request, subscription)
+            filtered = subscription.apply(request.frames, messages) if subscription else None
+            topic = request.topic
+            yield encoder.encode(
+                self._schema_provider(topic, None),
+                messages,
+                filtered,
+                lambda dev_addr: self._schema_provider(topic, dev_addr),
+            )
+    
+    async def _run_batch(
+        self, request: Any, subscription: Subscription | None = None
+    ) -> list[ParsedResult | None]:
+        try:
+            return await self._batch_handler(request.topic, request.frames, subscription)
+        except Exception as e:
+            logger.error("grpc_batch_error", topic=request.topic, error=str(e))
+            return [None] * (len(request.frames) // FRAME_DTYPE.itemsize)
+    
+    def _wants_json(self, context: Any) -> bool:
+        """JSON в FrameResponse.data - по настройке сервера или по метаданным вызова"""
+        response_format = self._response_format
+        if context is not None:
+            for key, value in context.invocation_metadata() or ():
+                if key == RESPONSE_FORMAT_KEY:
+                    response_format = value
+        return response_format == "json"
     
-    async def _handle_frame(self, topic: str, payload: bytes) -> None:
+    def _create_batch_response(
+        self,
+        messages: list[ParsedResult | None],
+        as_json: bool = False,
+        projection: frozenset[str] | None = None,
+        filtered: list[bool] | None = None,
+    ) -> Any:
+        status = bytearray(len(messages))
+        results = []
+        for i, message in enumerate(messages):
+            if message is None:
+                if filtered is not None and filtered[i]:
+                    status[i] = pb2.FRAME_FILTERED
+                continue  # FRAME_REJECTED = 0
+            status[i] = pb2.FRAME_DECODED if message.parsed else pb2.FRAME_UNKNOWN
+            results.append(self._create_response(message, as_json, projection))
+        return pb2.FrameBatchResponse(count=len(messages), status=bytes(status), results=results)
+    
+    def _create_response(
+        self, message: ParsedResult, as_json: bool = False, projection: frozenset[str] | None = None
+    ) -> Any:
+        if as_json:
+            # Режим совместимости: результат как JSON строка
+            if projection is None:
+                dump = message.model_dump()
+            else:
+                dump = message.model_dump(exclude={"signals"})
+                dump["signals"] = project_signals(message, projection)
+            return pb2.FrameResponse(
+                success=True,
+                data=orjson.dumps(dump, default=str).decode(),
+                device_address=message.device_address,
+                can_message_id=message.can_message_id,
+            )
+        return pb2.FrameResponse(
+            success=True,
+            device_address=message.device_address,
+            can_message_id=message.can_message_id,
+            frame=self._create_frame(message, projection),
+        )
+    
+    def _create_frame(self, message: ParsedResult, projection: frozenset[str] | None = None) -> Any:
+        """DecodedFrame напрямую из результата декодирования, без промежуточного JSON"""
+        if isinstance(message, ParsedMessageRecord):
+            # ✅ Сырые байты и CRC как есть - hex строка не формируется
+            raw_payload, crc16 = bytes(message.data), message.crc
+        else:
+            raw_payload, crc16 = bytes.fromhex(message.raw_payload), int(message.crc16, 16)
+        frame = pb2.DecodedFrame(
+            device_address=message.device_address,
+            broadcast=message.device_address == 0,
+            can_message_id=message.can_message_id,
+            message_name=message.message_name or "",
+            raw_payload=raw_payload,
+            crc16=crc16,
+            parsed=message.parsed,
+            error=message.error or "",
+            source_topic=message.source_topic or "",
+        )
+        add = frame.signals.add
+        # ✅ С проекцией отложенные сигналы декодируются только нужные
+        for name, value in project_signals(message, projection).items():
+            if isinstance(value, float):
+                add(name=name, number=value)
+            elif isinstance(value, int):
+                if value > _INT64_MAX:
+                    add(name=name, unsigned=value)
+                else:
+                    add(name=name, integer=value)
+            else:
+                # NamedSignalValue из таблицы VAL_
+                add(name=name, label=str(value))
+        return frame
+    
+    def _create_error_response(self, error: str) -> Any:
+        return pb2.FrameResponse(success=False, error=error)
+    
+    def _create_filtered_response(self, message: ParsedResult | _Filtered) -> Any:
+        return pb2.FrameResponse(
+            success=False,
+            device_address=message.device_address,
+            can_message_id=message.can_message_id,
+            error="Filtered by subscription",
+        )
+    
+    async def ReloadDBC(self, request: Any, context: Any) -> Any:
+        """Горячая перезагрузка DBC (пустой dbc_file - текущий файл)"""
+        if not self._reload_handler:
+            return pb2.ReloadResponse(success=False, error="Reload is not available")
         try:
-            if self._message_handler:
-                self._message_handler(topic, payload)
+            diff = await self._reload_handler(
+                Path(request.dbc_file) if request.dbc_file else None, request.database or None
+            )
         except Exception as e:
-            logger.error("grpc_frame_error", topic=topic, error=str(e))
+            logger.error("grpc_reload_error", error=str(e))
+            return pb2.ReloadResponse(success=False, error=str(e))
+        return pb2.ReloadResponse(
+            success=True,
+            version=diff.version,
+            added=sorted(diff.added),
+            removed=sorted(diff.removed),
+            changed=sorted(diff.changed),
+        )
     
-    def _create_response(self, message: ParsedMessage) -> Any:
-        return type('Response', (), {
-            'success': True,
-            'data': orjson.dumps(message.model_dump()).decode(),
-            'device_address': message.device_address,
-            'can_message_id': message.can_message_id
-        })()
+    async def WatchSchema(self, request: Any, context: Any) -> AsyncIterator[Any]:
+        """Текущий словарь сигналов, затем новый после каждой перезагрузки DBC"""
+        if not self._schema_provider:
+            return
+        projection = frozenset(request.signals) if request.signals else None
+        changed = asyncio.Event()
+        self._schema_watchers.add(changed)
+        try:
+            version = None
+            while True:
+                schema = self._schema_provider(request.topic, None)
+                if schema.version != version:
+                    version = schema.version
+                    yield schema_to_proto(schema, projection)
+                await changed.wait()
+                changed.clear()
+        finally:
+            self._schema_watchers.discard(changed)
     
-    async def queue_response(self, message: ParsedMessage) -> None:
+    async def Subscribe(self, request: Any, context: Any) -> AsyncIterator[Any]:
+        """
+        Подписка на все публикуемые результаты (кадры любых клиентов).
+        Буфер подписчика ограничен, при переполнении - политика из запроса.
+        """
+        as_json = self._wants_json(context)
+        subscription = (
+            subscription_from_proto(request.subscription, schema=self._schema_lookup())
+            if request.HasField("subscription") else None
+        )
+        subscriber = self.bus.subscribe(
+            request.name,
+            capacity=request.buffer_size or None,
+            policy=_OVERFLOW_POLICIES.get(request.overflow),
+            subscription=subscription,
+        )
+        projection = subscription.signals if subscription else None
         try:
-            await self._output_queue.put(message)
-        except asyncio.QueueFull:
-            logger.warning("grpc_queue_full")
+            async for message in subscriber:
+                yield self._create_response(message, as_json, projection)
+        finally:
+            self.bus.unsubscribe(subscriber)
+
+
+_COMPRESSION = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
+
+def server_options(config: GRPCConfig) -> list[tuple[str, int]]:
+    """Channel args сервера из GRPCConfig; нулевые значения - умолчания gRPC"""
+    options = [
+        ("grpc.max_send_message_length", config.max_message_size),
+        ("grpc.max_receive_message_length", config.max_message_size),
+        ("grpc.max_concurrent_streams", config.max_concurrent_streams),
+        ("grpc.http2.bdp_probe", int(config.http2_bdp_probe)),
+        ("grpc.keepalive_time_ms", config.keepalive_time_ms),
+        ("grpc.keepalive_timeout_ms", config.keepalive_timeout_ms),
+        ("grpc.keepalive_permit_without_calls", int(config.keepalive_permit_without_calls)),
+        ("grpc.http2.min_recv_ping_interval_without_data_ms", config.min_ping_interval_ms),
+        ("grpc.http2.max_pings_without_data", config.max_pings_without_data),
+        # gRPC по умолчанию включает SO_REUSEPORT - второй сервер молча делил бы порт
+        ("grpc.so_reuseport", int(config.so_reuseport)),
+    ]
+    optional = [
+        ("grpc.http2.lookahead_bytes", config.http2_stream_window_bytes),
+        ("grpc.http2.max_frame_size", config.http2_max_frame_size),
+        ("grpc.http2.write_buffer_size", config.http2_write_buffer_bytes),
+        ("grpc.max_connection_idle_ms", config.max_connection_idle_ms),
+        ("grpc.max_connection_age_ms", config.max_connection_age_ms),
+    ]
+    options.extend((name, value) for name, value in optional if value > 0)
+    return options
 
 
 class GRPCServer:
     def __init__(self, config: GRPCConfig) -> None:
         self.config = config
         self._server: aio.Server | None = None
-        self._servicer = DBCServicer()
+        self.port = config.port  # фактический порт (при port=0 - выбранный системой)
+        self.bus = PublishBus(config.subscriber_buffer_size, config.subscriber_overflow)
+        self._servicer = DBCServicer(config.stream_queue_size, config.response_format, self.bus)
+        # ✅ Режим последних значений: подписчики получают не больше одного
+        # сообщения на (dev_addr, can_id) за интервал выгрузки
+        self.conflator: Conflator | None = None
+        if config.conflation_interval_ms > 0:
+            self.conflator = Conflator(self.bus.publish, config.conflation_interval_ms)
     
-    def set_message_handler(self, handler: Callable[[str, bytes], None]) -> None:
+    def set_message_handler(self, handler: MessageHandler) -> None:
         self._servicer.set_message_handler(handler)
     
+    def set_batch_handler(self, handler: BatchHandler) -> None:
+        self._servicer.set_batch_handler(handler)
+    
+    def set_schema_provider(self, provider: SchemaProvider) -> None:
+        self._servicer.set_schema_provider(provider)
+    
+    def set_reload_handler(self, handler: ReloadHandler) -> None:
+        self._servicer.set_reload_handler(handler)
+    
+    def notify_schema_changed(self) -> None:
+        self._servicer.notify_schema_changed()
+    
     async def start(self) -> None:
-        self._server = aio.server()
+        config = self.config
+        self._server = aio.server(
+            # Пул только для синхронных обработчиков; методы сервиса - корутины
+            migration_thread_pool=ThreadPoolExecutor(max_workers=config.max_workers),
+            options=server_options(config),
+            maximum_concurrent_rpcs=config.max_concurrent_rpcs,
+            compression=_COMPRESSION[config.compression],
+        )
+        pb2_grpc.add_DBCServiceServicer_to_server(self._servicer, self._server)
         
-        listen_addr = f"{self.config.host}:{self.config.port}"
-        self._server.add_insecure_port(listen_addr)
+        listen_addr = f"{config.host}:{config.port}"
+        self.port = self._server.add_insecure_port(listen_addr)
         
         await self._server.start()
-        logger.info("grpc_server_started", address=listen_addr)
+        if self.conflator:
+            await self.conflator.start()
+        logger.info(
+            "grpc_server_started",
+            address=f"{config.host}:{self.port}",
+            compression=config.compression,
+            so_reuseport=config.so_reuseport,
+        )
     
     async def serve(self) -> None:
         if self._server:
             await self._server.wait_for_termination()
     
-    async def publish_message(self, message: ParsedMessage) -> bool:
+    async def publish_message(self, message: ParsedResult) -> bool:
         try:
-            await self._servicer.queue_response(message)
+            if self.conflator:
+                self.conflator.update(message)
+            else:
+                await self.bus.publish(message)
             return True
         except Exception as e:
             logger.error("grpc_publish_error", error=str(e))
             return False
     
     async def stop(self) -> None:
+        if self.conflator:
+            await self.conflator.stop()
+        # Потоки Subscribe дочитывают буферы и завершаются
+        self.bus.close()
         if self._server:
             await self._server.stop(grace=5)
             logger.info("grpc_server_stopped")
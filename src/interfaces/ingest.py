@@ -0,0 +1,213 @@
+"""
+Приём сырых кадров по TCP и UDP в обход protobuf.
+
+TCP - поток без разметки: кадры по 12 байт подряд, граница кадра
+восстанавливается по смещению от начала соединения. UDP - датаграммы
+из N × 12 байт. Приёмный буфер целиком (выровненный по кадру) уходит
+в пакетный обработчик - без Python-объекта на кадр.
+"""
+from __future__ import annotations
+
+import asyncio
+import socket
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import structlog
+
+from config import IngestConfig  # Абсолютный импорт
+from core.models import FRAME_DTYPE
+
+logger = structlog.get_logger(__name__)
+
+# (топик, N × 12 байт) - DBCService.process_frame_batch
+IngestHandler = Callable[[str, bytes], Awaitable[Any]]
+
+FRAME_SIZE = FRAME_DTYPE.itemsize
+
+_STOP = None  # маркер остановки обработчика очереди
+
+
+class _StreamProtocol(asyncio.BufferedProtocol):
+    """TCP соединение: чтение прямо в предвыделенный буфер, хвост < 12 байт переносится"""
+
+    def __init__(self, server: IngestServer) -> None:
+        self._server = server
+        self._buffer = bytearray(max(server.config.read_buffer_size, FRAME_SIZE))
+        self._view = memoryview(self._buffer)
+        self._filled = 0
+        self.transport: asyncio.Transport | None = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore[assignment]
+        self._server._connections.add(self)
+        self._server.stats["connections"] += 1
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._view[self._filled:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self._filled += nbytes
+        aligned = self._filled - self._filled % FRAME_SIZE
+        if not aligned:
+            return
+        # ✅ Одна копия на приёмный буфер, не на кадр
+        self._server._submit(bytes(self._view[:aligned]), self)
+        tail = self._filled - aligned
+        if tail:
+            self._buffer[:tail] = self._buffer[aligned:self._filled]
+        self._filled = tail
+
+    def eof_received(self) -> bool | None:
+        return None  # закрыть соединение
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        if self._filled:
+            # Соединение оборвалось посреди кадра
+            self._server.stats["malformed"] += 1
+        self._server._connections.discard(self)
+        self._server._paused.discard(self)
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    """UDP: датаграмма - пачка кадров, неполный хвост отбрасывается"""
+
+    def __init__(self, server: IngestServer) -> None:
+        self._server = server
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        remainder = len(data) % FRAME_SIZE
+        if remainder:
+            self._server.stats["malformed"] += 1
+            data = data[:-remainder]
+        if data:
+            self._server._submit(data, None)
+
+    def error_received(self, exc: Exception) -> None:
+        logger.warning("ingest_udp_error", error=str(exc))
+
+
+class IngestServer:
+    """
+    TCP/UDP слушатели рядом с GRPCServer. Буферы проходят через одну очередь
+    и обработчик: порядок кадров соединения сохраняется. При переполнении
+    очереди TCP соединения приостанавливают чтение (backpressure),
+    датаграммы UDP отбрасываются.
+    """
+
+    def __init__(self, config: IngestConfig) -> None:
+        self.config = config
+        self.tcp_port = config.tcp_port  # фактические порты (при 0 - выбранные системой)
+        self.udp_port = config.udp_port
+        self._handler: IngestHandler | None = None
+        self._queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+        self._queued_frames = 0
+        self._connections: set[_StreamProtocol] = set()
+        self._paused: set[_StreamProtocol] = set()
+        self._tcp_server: asyncio.Server | None = None
+        self._udp_transport: asyncio.DatagramTransport | None = None
+        self._consumer: asyncio.Task[None] | None = None
+        self.stats: dict[str, int] = {
+            "connections": 0, "buffers": 0, "frames": 0, "dropped": 0, "malformed": 0
+        }
+
+    def set_handler(self, handler: IngestHandler) -> None:
+        self._handler = handler
+
+    async def start(self) -> None:
+        config = self.config
+        loop = asyncio.get_running_loop()
+        self._consumer = asyncio.create_task(self._consume())
+
+        if config.tcp_port is not None:
+            self._tcp_server = await loop.create_server(
+                lambda: _StreamProtocol(self),
+                config.host,
+                config.tcp_port,
+                reuse_port=config.reuse_port or None,
+            )
+            self.tcp_port = self._tcp_server.sockets[0].getsockname()[1]
+
+        if config.udp_port is not None:
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: _DatagramProtocol(self),
+                local_addr=(config.host, config.udp_port),
+                reuse_port=config.reuse_port or None,
+            )
+            sock = transport.get_extra_info("socket")
+            if config.udp_receive_buffer_bytes:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, config.udp_receive_buffer_bytes)
+            self.udp_port = sock.getsockname()[1]
+            self._udp_transport = transport
+
+        logger.info(
+            "ingest_server_started",
+            host=config.host,
+            tcp_port=self.tcp_port,
+            udp_port=self.udp_port,
+            topic=config.topic,
+        )
+
+    def _submit(self, frames: bytes, connection: _StreamProtocol | None) -> None:
+        count = len(frames) // FRAME_SIZE
+        if self._queued_frames >= self.config.max_queue_frames:
+            if connection is None:
+                self.stats["dropped"] += count
+                return
+            # ✅ TCP: буфер принимается, чтение соединения приостанавливается
+            connection.transport.pause_reading()
+            self._paused.add(connection)
+        self._queued_frames += count
+        self.stats["buffers"] += 1
+        self._queue.put_nowait(frames)
+
+    async def _consume(self) -> None:
+        """Обработчик очереди: мелкие буферы склеиваются до max_batch_frames"""
+        max_bytes = self.config.max_batch_frames * FRAME_SIZE
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            chunks = [item]
+            size = len(item)
+            while size < max_bytes and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is _STOP:
+                    stopping = True
+                    break
+                chunks.append(item)
+                size += len(item)
+
+            count = size // FRAME_SIZE
+            self._queued_frames -= count
+            self.stats["frames"] += count
+            if self._paused and self._queued_frames <= self.config.max_queue_frames // 2:
+                for connection in self._paused:
+                    connection.transport.resume_reading()
+                self._paused.clear()
+
+            if self._handler is None:
+                continue
+            frames = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+            try:
+                await self._handler(self.config.topic, frames)
+            except Exception as e:
+                logger.error("ingest_handler_error", frames=count, error=str(e))
+
+    async def stop(self) -> None:
+        """Закрытие слушателей и соединений; принятые буферы дообрабатываются"""
+        if self._udp_transport:
+            self._udp_transport.close()
+            self._udp_transport = None
+        if self._tcp_server:
+            self._tcp_server.close()
+            for connection in list(self._connections):
+                connection.transport.close()
+            await self._tcp_server.wait_closed()
+            self._tcp_server = None
+        if self._consumer:
+            self._queue.put_nowait(_STOP)
+            await self._consumer
+            self._consumer = None
+        logger.info("ingest_server_stopped", stats=self.stats)
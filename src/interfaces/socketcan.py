@@ -0,0 +1,176 @@
+"""
+Приём кадров прямо с шины через SocketCAN (Linux, AF_CAN / CAN_RAW).
+
+Идентификатор кадра CAN несёт то же 16-битное слово адреса, что и
+12-байтный кадр: dev_addr | msg_id << 5 (msg_id > 63 - только в 29-битных
+идентификаторах). Данные и CRC16-ARC адреса с данными дают FrameBatch в
+том же виде, что FrameParser.parse_batch - дальше обычный путь декодирования.
+
+Проверка без оборудования:
+    sudo ip link add dev vcan0 type vcan && sudo ip link set up vcan0
+    cangen vcan0 -e -I 0C81 -L 8 -g 1
+"""
+from __future__ import annotations
+
+import asyncio
+import socket
+import struct
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import numpy as np
+import structlog
+
+from config import SocketCANConfig  # Абсолютный импорт
+from core.models import FrameBatch
+from utils.crc import CRC16ARC
+
+logger = structlog.get_logger(__name__)
+
+# (топик, разобранные кадры) - DBCService.process_can_batch
+CANBatchHandler = Callable[[str, FrameBatch], Awaitable[Any]]
+
+# struct can_frame: can_id (порядок байт хоста), len, __pad, __res0, len8_dlc, data[8]
+CAN_FRAME_DTYPE = np.dtype([
+    ("can_id", "=u4"), ("len", "u1"), ("pad", "u1"), ("res0", "u1"), ("len8_dlc", "u1"),
+    ("data", "u1", (8,)),
+])
+CAN_FRAME_SIZE = CAN_FRAME_DTYPE.itemsize
+
+CAN_EFF_FLAG = 0x80000000
+CAN_RTR_FLAG = 0x40000000
+CAN_ERR_FLAG = 0x20000000
+CAN_EFF_MASK = 0x1FFFFFFF
+
+_CAN_FILTER = struct.Struct("=II")
+
+
+def can_frames_to_batch(buf: bytes | memoryview) -> FrameBatch:
+    """
+    Пакет struct can_frame -> FrameBatch. Отбрасываются RTR и кадры ошибок,
+    идентификаторы шире 16 бит и msg_id вне диапазона CommAddr (0-1023).
+    Результат не ссылается на buf: приёмный буфер можно переиспользовать.
+    """
+    frames = np.frombuffer(buf, dtype=CAN_FRAME_DTYPE, count=len(buf) // CAN_FRAME_SIZE)
+    can_id = frames["can_id"]
+    ident = can_id & CAN_EFF_MASK
+    addr = (ident & 0xFFFF).astype(np.uint16)
+
+    # ✅ CRC считается по колонкам - как у кадра, пришедшего 12-байтным
+    rows = np.empty((len(frames), 10), dtype=np.uint8)
+    rows[:, 0] = addr & 0xFF
+    rows[:, 1] = addr >> 8
+    rows[:, 2:] = frames["data"]
+    msg_id = addr >> 5
+
+    rejected = (
+        ((can_id & (CAN_RTR_FLAG | CAN_ERR_FLAG)) != 0)
+        | (ident > 0xFFFF)
+        | (msg_id > 1023)
+        | (frames["len"] > 8)
+    )
+    return FrameBatch(
+        dev_addr=addr & 0x1F,
+        msg_id=msg_id,
+        reserved=np.zeros(len(frames), dtype=np.uint16),
+        data=rows[:, 2:],
+        crc16=CRC16ARC.calculate_columns(rows),
+        rejected=rejected,
+    )
+
+
+class SocketCANSource:
+    """
+    Чтение сокета CAN_RAW в event loop. По готовности сокет вычитывается
+    в предвыделенный буфер до batch_frames кадров (recvmmsg в модуле socket
+    нет - пакет собирается серией recv_into без объекта на кадр), пакет
+    уходит обработчику через очередь. При переполнении очереди пакеты
+    отбрасываются - как и ядром при переполнении буфера сокета.
+    """
+
+    def __init__(self, config: SocketCANConfig) -> None:
+        self.config = config
+        self.topic = config.topic or config.interface
+        self._handler: CANBatchHandler | None = None
+        self._socket: socket.socket | None = None
+        self._buffer = bytearray(max(config.batch_frames, 1) * CAN_FRAME_SIZE)
+        self._view = memoryview(self._buffer)
+        self._queue: asyncio.Queue[FrameBatch | None] = asyncio.Queue()
+        self._queued_frames = 0
+        self._consumer: asyncio.Task[None] | None = None
+        self.stats: dict[str, int] = {"reads": 0, "frames": 0, "dropped": 0}
+
+    def set_handler(self, handler: CANBatchHandler) -> None:
+        self._handler = handler
+
+    def _open(self) -> socket.socket:
+        config = self.config
+        sock = socket.socket(socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW)
+        if config.filters:
+            # Фильтрация в ядре: лишние идентификаторы не доходят до процесса
+            filters = b"".join(_CAN_FILTER.pack(can_id, mask) for can_id, mask in config.filters)
+            sock.setsockopt(socket.SOL_CAN_RAW, socket.CAN_RAW_FILTER, filters)
+        if config.receive_buffer_bytes:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, config.receive_buffer_bytes)
+        sock.bind((config.interface,))
+        sock.setblocking(False)
+        return sock
+
+    async def start(self) -> None:
+        self._socket = self._open()
+        self._consumer = asyncio.create_task(self._consume())
+        asyncio.get_running_loop().add_reader(self._socket.fileno(), self._on_readable)
+        logger.info("socketcan_started", interface=self.config.interface, topic=self.topic)
+
+    def _on_readable(self) -> None:
+        sock = self._socket
+        view = self._view
+        size = len(view)
+        offset = 0
+        while offset < size:
+            try:
+                received = sock.recv_into(view[offset:offset + CAN_FRAME_SIZE])
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as e:
+                # Интерфейс опущен (ENETDOWN) - ждём следующей готовности
+                logger.warning("socketcan_read_error", error=str(e))
+                break
+            if received == CAN_FRAME_SIZE:
+                offset += received
+        if not offset:
+            return
+
+        count = offset // CAN_FRAME_SIZE
+        self.stats["reads"] += 1
+        if self._queued_frames >= self.config.max_queue_frames:
+            self.stats["dropped"] += count
+            return
+        self._queued_frames += count
+        self._queue.put_nowait(can_frames_to_batch(view[:offset]))
+
+    async def _consume(self) -> None:
+        while True:
+            batch = await self._queue.get()
+            if batch is None:
+                break
+            self._queued_frames -= len(batch)
+            self.stats["frames"] += len(batch)
+            if self._handler is None:
+                continue
+            try:
+                await self._handler(self.topic, batch)
+            except Exception as e:
+                logger.error("socketcan_handler_error", frames=len(batch), error=str(e))
+
+    async def stop(self) -> None:
+        """Закрытие сокета; прочитанные кадры дообрабатываются"""
+        if self._socket:
+            asyncio.get_running_loop().remove_reader(self._socket.fileno())
+            self._socket.close()
+            self._socket = None
+        if self._consumer:
+            self._queue.put_nowait(None)
+            await self._consumer
+            self._consumer = None
+        logger.info("socketcan_stopped", interface=self.config.interface, stats=self.stats)
@@ -1,11 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import itertools
+from pathlib import Path
+
 import structlog
 
 from config import Settings  # Абсолютный импорт
+from core.batcher import FrameBatcher
+from core.models import FRAME_DTYPE, FrameBatch, ParsedResult
 from core.parser import FrameParser
-from core.processor import DBCProcessor
-from interfaces.grpc.server import GRPCServer
+from core.processor import DBCDiff, DBCProcessor
+from core.router import DBCRouter
+from core.schema import DBCSchema
+from core.subscriptions import Subscription
+from core.workers import DecodeWorkerPool
+from interfaces.grpc.server import GRPCServer, ReplyCallback
+from interfaces.ingest import IngestServer
+from interfaces.socketcan import SocketCANSource
 from utils.metrics import MetricsServer
 
 logger = structlog.get_logger(__name__)
@@ -15,32 +27,310 @@ class DBCService:
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
         self.frame_parser = FrameParser()
-        self.dbc_processor = DBCProcessor(settings.dbc_file)
+        # Версии словарей всех баз из одного счётчика
+        self._schema_versions = itertools.count(1)
+        self.dbc_processor = self._create_processor(settings.dbc_file)
+        
+        # ✅ Маршрутизация по нескольким DBC - только если они настроены
+        self.dbc_router: DBCRouter | None = None
+        if settings.dbc_routes:
+            self.dbc_router = DBCRouter(self.dbc_processor)
+            for route in settings.dbc_routes:
+                self.dbc_router.add_database(
+                    route.name,
+                    self._create_processor(route.dbc_file),
+                    topics=route.topics,
+                    device_ranges=route.device_ranges,
+                )
+        
+        # Опционально: parse + decode в пуле процессов
+        self.worker_pool: DecodeWorkerPool | None = None
+        if settings.processing.process_pool_enabled and self.dbc_router:
+            # Воркеры загружают одну DBC - с маршрутизацией декодирование в основном процессе
+            logger.warning("worker_pool_disabled", reason="dbc_routes")
+        elif settings.processing.process_pool_enabled:
+            self.worker_pool = DecodeWorkerPool(
+                settings.dbc_file,
+                workers=settings.processing.worker_pool_size,
+                slot_frames=settings.processing.max_batch_size,
+                use_artifact=settings.processing.dbc_artifact_enabled,
+            )
+        
+        # ✅ Микро-батчинг между приёмом и декодированием
+        self.batcher: FrameBatcher[tuple[str, bytes, ReplyCallback | None]] = FrameBatcher(
+            self.handle_batch,
+            max_batch_size=settings.processing.max_batch_size,
+            batch_timeout_ms=settings.processing.batch_timeout_ms,
+            max_queue_size=settings.processing.max_queue_size,
+        )
         
         self.grpc_server = GRPCServer(settings.grpc)
+        # Сырые кадры по TCP/UDP в обход protobuf
+        self.ingest_server: IngestServer | None = None
+        if settings.ingest.enabled:
+            self.ingest_server = IngestServer(settings.ingest)
+        # Кадры прямо с шины CAN
+        self.can_source: SocketCANSource | None = None
+        if settings.socketcan.enabled:
+            self.can_source = SocketCANSource(settings.socketcan)
         self.metrics_server: MetricsServer | None = None
         
+        self._watch_task: asyncio.Task[None] | None = None
+        
         self.running = False
-        self.stats: dict[str, int] = {"total": 0, "valid": 0, "errors": 0, "published": 0}
+        self.stats: dict[str, int] = {
+            "total": 0, "valid": 0, "errors": 0, "published": 0, "filtered": 0
+        }
+    
+    def _create_processor(self, dbc_file: Path) -> DBCProcessor:
+        return DBCProcessor(
+            dbc_file,
+            cache_size=self.settings.processing.decode_cache_size,
+            cache_enabled=self.settings.processing.decode_cache_enabled,
+            use_artifact=self.settings.processing.dbc_artifact_enabled,
+            schema_versions=self._schema_versions,
+        )
     
     async def start(self) -> None:
         logger.info("service_starting")
         
-        await self.dbc_processor.initialize()
+        await (self.dbc_router or self.dbc_processor).initialize()
+        if self.worker_pool:
+            await self.worker_pool.start(self.dbc_processor)
         
         if self.settings.metrics.enabled:
             self.metrics_server = MetricsServer(self.settings.metrics)
             await self.metrics_server.start()
         
-        self.grpc_server.set_message_handler(self.handle_message)
+        await self.batcher.start()
+        
+        self.grpc_server.set_message_handler(self.submit_message)
+        self.grpc_server.set_batch_handler(self.process_frame_batch)
+        self.grpc_server.set_schema_provider(self.schema_for)
+        self.grpc_server.set_reload_handler(self.reload_dbc)
         await self.grpc_server.start()
+        if self.ingest_server:
+            self.ingest_server.set_handler(self.process_frame_batch)
+            await self.ingest_server.start()
+        if self.can_source:
+            self.can_source.set_handler(self.process_can_batch)
+            await self.can_source.start()
+        
+        if self.settings.processing.dbc_watch_interval_s > 0:
+            self._watch_task = asyncio.create_task(
+                self._watch_dbc(self.settings.processing.dbc_watch_interval_s)
+            )
         
         logger.info("service_started")
         self.running = True
         
         await self.grpc_server.serve()
     
-    async def handle_message(self, topic: str, payload: bytes) -> None:
+    async def submit_message(
+        self, topic: str, payload: bytes, reply: ReplyCallback | None = None
+    ) -> None:
+        """
+        Постановка кадра в очередь батчинга (ждёт при переполнении очереди).
+        reply вызывается с результатом именно этого кадра (None - кадр отброшен).
+        """
+        await self.batcher.submit((topic, payload, reply))
+    
+    async def handle_batch(self, items: list[tuple[str, bytes, ReplyCallback | None]]) -> None:
+        """Обработка пачки: пакетный парсинг, декодирование и публикация"""
+        self.stats["total"] += len(items)
+        
+        frame_size = FRAME_DTYPE.itemsize
+        topics: list[str] = []
+        frames: list[bytes] = []
+        replies: list[ReplyCallback | None] = []
+        for topic, payload, reply in items:
+            if len(payload) != frame_size:
+                self.stats["errors"] += 1
+                if reply:
+                    reply(None)
+                continue
+            topics.append(topic)
+            frames.append(payload)
+            replies.append(reply)
+        if not frames:
+            return
+        
+        try:
+            messages = await self._decode_buffer(b"".join(frames), topics)
+        except Exception as e:
+            # Ответ нужен каждому кадру: иначе поток ProcessFrames ждёт его вечно
+            logger.error("batch_decode_error", size=len(frames), error=str(e))
+            self.stats["errors"] += len(frames)
+            for reply in replies:
+                if reply:
+                    reply(None)
+            return
+        for parsed_message, reply in zip(messages, replies):
+            if reply:
+                reply(parsed_message)
+        await self._publish_all(messages)
+    
+    async def process_frame_batch(
+        self, topic: str, frames: bytes, subscription: Subscription | None = None
+    ) -> list[ParsedResult | None]:
+        """
+        Пакет кадров из одного запроса (N × 12 байт) - сразу в пакетный путь,
+        минуя очередь батчинга. Неполный хвост отбрасывается парсером.
+        Кадры вне фильтра подписки (адрес, CAN ID) не декодируются: None.
+        """
+        count = len(frames) // FRAME_DTYPE.itemsize
+        self.stats["total"] += count
+        if not count:
+            return []
+        
+        messages = await self._decode_buffer(frames, [topic] * count, subscription)
+        await self._publish_all(messages)
+        return messages
+    
+    async def process_can_batch(
+        self, topic: str, batch: FrameBatch
+    ) -> list[ParsedResult | None]:
+        """
+        Кадры, уже разобранные источником (SocketCAN): без 12-байтного формата
+        и повторного парсинга. Декодирование всегда в основном процессе.
+        """
+        count = len(batch)
+        self.stats["total"] += count
+        if not count:
+            return []
+        
+        self._count_rejected(batch, None)
+        messages = self._decode_batch(batch, [topic] * count)
+        await self._publish_all(messages)
+        return messages
+    
+    async def _decode_buffer(
+        self, buffer: bytes, topics: list[str], subscription: Subscription | None = None
+    ) -> list[ParsedResult | None]:
+        """Пакетный парсинг и декодирование склеенных кадров"""
+        if self.worker_pool:
+            # Пул декодирует весь буфер: фильтр применяется к результату
+            batch, decoded = await self.worker_pool.process(buffer)
+            self._count_rejected(batch, subscription)
+        else:
+            batch = await self.frame_parser.parse_batch(buffer)
+            # ✅ Кадры вне подписки отбрасываются сразу после парсинга, до декодирования
+            self._count_rejected(batch, subscription)
+            return self._decode_batch(batch, topics)
+        
+        # ✅ Сигналы скомпилированных сообщений - из колонок, остальные по одному
+        return self.dbc_processor.build_messages(batch, decoded, topics)
+    
+    def _decode_batch(self, batch: FrameBatch, topics: list[str]) -> list[ParsedResult | None]:
+        """Декодирование разобранного пакета в основном процессе"""
+        if self.dbc_router:
+            parts = self.dbc_router.decode_frames(batch, topics)
+            return self.dbc_router.build_messages(parts, topics)
+        decoded = self.dbc_processor.decode_frames(batch)
+        return self.dbc_processor.build_messages(batch, decoded, topics)
+    
+    def _count_rejected(self, batch: FrameBatch, subscription: Subscription | None) -> None:
+        """Учёт отброшенных парсером кадров; кадры вне подписки помечаются отброшенными"""
+        self.stats["errors"] += int(batch.rejected.sum())
+        mask = subscription.frame_mask(batch.dev_addr, batch.msg_id) if subscription else None
+        if mask is not None:
+            self.stats["filtered"] += int((batch.accepted & ~mask).sum())
+            batch.rejected = batch.rejected | ~mask
+    
+    async def _publish_all(self, messages: list[ParsedResult | None]) -> None:
+        """Публикация результатов пакета (None - ошибки уже учтены при парсинге)"""
+        for parsed_message in messages:
+            if not parsed_message:
+                continue
+            
+            self.stats["valid"] += 1
+            await self.grpc_server.publish_message(parsed_message)
+            self.stats["published"] += 1
+    
+    def schema_for(self, topic: str = "", dev_addr: int | None = None) -> DBCSchema:
+        """Словарь сигналов базы, которой декодируются кадры топика (адреса)"""
+        if self.dbc_router:
+            return self.dbc_router.schema_for(topic, dev_addr)
+        return self.dbc_processor.schema
+    
+    async def reload_dbc(self, dbc_file: Path | None = None, database: str | None = None) -> DBCDiff:
+        """
+        Горячая перезагрузка DBC без остановки приёма. Пул декодирования
+        перезапускается: новый пул стартует до остановки старого.
+        Клиенты потоков получают новый словарь сигналов.
+        database - имя базы из dbc_routes (None - база по умолчанию).
+        dbc_file - только файл этой базы из настроек, если не включён
+        processing.dbc_reload_any_path.
+        """
+        if dbc_file is not None:
+            self._check_reload_path(Path(dbc_file), database)
+        if self.dbc_router:
+            diff = await self.dbc_router.reload(database, dbc_file)
+        elif database:
+            raise KeyError(f"Unknown DBC database: {database}")
+        else:
+            diff = await self.dbc_processor.reload(dbc_file)
+        if not diff:
+            return diff
+        
+        if self.worker_pool:
+            pool = DecodeWorkerPool(
+                self.dbc_processor.dbc_file,
+                workers=self.worker_pool.workers,
+                slot_frames=self.worker_pool.slot_frames,
+                use_artifact=self.worker_pool.use_artifact,
+            )
+            await pool.start(self.dbc_processor)
+            old_pool, self.worker_pool = self.worker_pool, pool
+            await old_pool.drain()
+            await old_pool.close()
+        
+        self.grpc_server.notify_schema_changed()
+        return diff
+    
+    def _check_reload_path(self, dbc_file: Path, database: str | None) -> None:
+        """Путь клиента не должен открывать чужие файлы (и писать .dbcc рядом с ними)"""
+        if self.settings.processing.dbc_reload_any_path:
+            return
+        configured = self.settings.dbc_file
+        if database:
+            routes = {route.name: route.dbc_file for route in self.settings.dbc_routes}
+            if database not in routes:
+                raise KeyError(f"Unknown DBC database: {database}")
+            configured = routes[database]
+        if dbc_file.resolve() != Path(configured).resolve():
+            raise PermissionError(
+                f"Reload from {dbc_file} is not allowed: only the configured DBC file can be reloaded"
+            )
+    
+    async def _watch_dbc(self, interval: float) -> None:
+        """Перезагрузка при изменении файла (по mtime и размеру), каждая база - отдельно"""
+        databases = self.dbc_router.databases if self.dbc_router else {None: self.dbc_processor}
+        
+        def signature(processor: DBCProcessor) -> tuple[int, int] | None:
+            try:
+                stat = Path(processor.dbc_file).stat()
+            except OSError:
+                return None
+            return stat.st_mtime_ns, stat.st_size
+        
+        last = {name: signature(processor) for name, processor in databases.items()}
+        while True:
+            await asyncio.sleep(interval)
+            for name, processor in databases.items():
+                current = signature(processor)
+                if current is None or current == last[name]:
+                    continue
+                last[name] = current
+                try:
+                    await self.reload_dbc(database=name)
+                except Exception as e:
+                    # Битый файл: остаётся прежняя база, ждём следующего изменения
+                    logger.error("dbc_reload_failed", file=str(processor.dbc_file), error=str(e))
+    
+    async def handle_message(
+        self, topic: str, payload: bytes, reply: ReplyCallback | None = None
+    ) -> None:
         """ФИНАЛЬНАЯ ОПТИМИЗАЦИЯ - минимум вызовов"""
         self.stats["total"] += 1
         
@@ -48,9 +338,13 @@ class DBCService:
         comm_data = await self.frame_parser.parse(payload)
         if not comm_data:
             self.stats["errors"] += 1
+            if reply:
+                reply(None)
             return
         
-        parsed_message = await self.dbc_processor.process_message(comm_data, topic)
+        parsed_message = await (self.dbc_router or self.dbc_processor).process_message(comm_data, topic)
+        if reply:
+            reply(parsed_message)
         if not parsed_message:
             self.stats["errors"] += 1
             return
@@ -66,12 +360,23 @@ class DBCService:
         logger.info("service_shutting_down")
         self.running = False
         
+        if self._watch_task:
+            self._watch_task.cancel()
+            self._watch_task = None
+        # Принятые сырые кадры публикуются до закрытия потоков подписчиков
+        if self.can_source:
+            await self.can_source.stop()
+        if self.ingest_server:
+            await self.ingest_server.stop()
         await self.grpc_server.stop()
+        await self.batcher.stop()
+        if self.worker_pool:
+            await self.worker_pool.close()
         
         if self.metrics_server:
             await self.metrics_server.stop()
         
         await self.frame_parser.close()
-        await self.dbc_processor.close()
+        await (self.dbc_router or self.dbc_processor).close()
         
         logger.info("service_stopped", final_stats=self.stats)
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""
+Супервизор: N процессов DBCService на одном порту gRPC.
+
+Каждый воркер - отдельный интерпретатор со своим event loop, парсером и
+декодерами; порт открывается с SO_REUSEPORT, ядро распределяет входящие
+соединения между процессами. Метрики воркеров пишутся в общий каталог
+(prometheus_client multiprocess) и отдаются одним HTTP сервером
+супервизора. SIGINT/SIGTERM супервизора - остановка всех воркеров
+с таймаутом; упавший воркер перезапускается.
+
+Запуск: python src/supervisor.py
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing as mp
+import os
+import shutil
+import signal
+import time
+from multiprocessing.connection import wait
+from multiprocessing.synchronize import Event
+
+import structlog
+
+from config import Settings, get_settings  # Абсолютный импорт
+from core.artifact import load_database
+from utils.metrics import MetricsServer, mark_process_dead
+
+logger = structlog.get_logger(__name__)
+
+MULTIPROC_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+
+def worker_settings(settings: Settings, index: int = 0) -> Settings:
+    """
+    Настройки воркера: общий порт через SO_REUSEPORT, метрики отдаёт супервизор.
+    Шину CAN читает только воркер 0: сокет CAN_RAW получает каждый кадр.
+    """
+    grpc = settings.grpc.model_copy(update={"so_reuseport": True})
+    ingest = settings.ingest.model_copy(update={"reuse_port": True})
+    metrics = settings.metrics.model_copy(update={"enabled": False})
+    update = {"grpc": grpc, "ingest": ingest, "metrics": metrics}
+    if index:
+        update["socketcan"] = settings.socketcan.model_copy(update={"enabled": False})
+    return settings.model_copy(update=update)
+
+
+async def _serve_worker(settings: Settings, ready: Event, parent_pid: int) -> None:
+    from service import DBCService
+
+    service = DBCService(settings)
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    serving = asyncio.create_task(service.start())
+    while not service.running and not serving.done():
+        await asyncio.sleep(0.01)
+    if serving.done():
+        serving.result()  # ошибка старта - воркер завершается с ней
+    ready.set()
+
+    # Супервизор завершился аварийно - воркер не остаётся сиротой
+    while not stopping.is_set() and os.getppid() == parent_pid:
+        try:
+            await asyncio.wait_for(stopping.wait(), timeout=1.0)
+        except asyncio.TimeoutError:
+            pass
+    await service.shutdown()
+    await serving
+
+
+def _worker_main(index: int, settings: Settings, ready: Event, parent_pid: int) -> None:
+    """Точка входа процесса-воркера (spawn)"""
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    asyncio.run(_serve_worker(settings, ready, parent_pid))
+
+
+class Supervisor:
+    """Запуск, перезапуск и согласованная остановка процессов сервиса"""
+
+    def __init__(self, settings: Settings, workers: int | None = None) -> None:
+        self.settings = settings
+        config = settings.supervisor
+        count = workers if workers is not None else config.workers
+        self.workers = count if count > 0 else os.cpu_count() or 1
+        self.metrics_dir = config.metrics_dir
+        self._context = mp.get_context("spawn")
+        self._processes: list[mp.process.BaseProcess | None] = [None] * self.workers
+        self._ready: list[Event] = []
+        self._stopping = False
+        self.restarts = 0
+
+    @property
+    def pids(self) -> list[int]:
+        return [p.pid for p in self._processes if p is not None and p.pid is not None]
+
+    def start(self) -> None:
+        # ✅ Каталог метрик задаётся до запуска воркеров: он наследуется через окружение
+        shutil.rmtree(self.metrics_dir, ignore_errors=True)
+        self.metrics_dir.mkdir(parents=True)
+        os.environ[MULTIPROC_ENV] = str(self.metrics_dir)
+
+        # Артефакт DBC собирается один раз здесь, воркеры только читают его
+        if self.settings.processing.dbc_artifact_enabled:
+            for dbc_file in [self.settings.dbc_file, *(r.dbc_file for r in self.settings.dbc_routes)]:
+                load_database(dbc_file)
+
+        for index in range(self.workers):
+            self._ready.append(self._context.Event())
+            self._spawn(index)
+        MetricsServer(self.settings.metrics, self.metrics_dir).start_sync()
+        logger.info(
+            "supervisor_started",
+            workers=self.workers,
+            port=self.settings.grpc.port,
+            pids=self.pids,
+        )
+
+    def _spawn(self, index: int) -> None:
+        self._ready[index].clear()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, worker_settings(self.settings, index), self._ready[index], os.getpid()),
+            name=f"dbc-service-{index}",
+        )
+        process.start()
+        self._processes[index] = process
+
+    def wait_ready(self, timeout: float = 30.0) -> bool:
+        """Все воркеры открыли порт"""
+        deadline = time.monotonic() + timeout
+        for ready in self._ready:
+            if not ready.wait(max(0.0, deadline - time.monotonic())):
+                return False
+        return True
+
+    def run(self) -> None:
+        """Основной цикл: ожидание завершения воркеров, перезапуск упавших"""
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self.request_stop())
+        try:
+            while not self._stopping:
+                self.poll(timeout=0.5)
+        finally:
+            self.stop()
+
+    def poll(self, timeout: float = 0.0) -> None:
+        sentinels = {p.sentinel: i for i, p in enumerate(self._processes) if p is not None}
+        for sentinel in wait(list(sentinels), timeout):
+            index = sentinels[sentinel]
+            process = self._processes[index]
+            process.join()
+            mark_process_dead(process.pid)
+            if self._stopping:
+                continue
+            logger.error("worker_exited", worker=index, pid=process.pid, exitcode=process.exitcode)
+            time.sleep(self.settings.supervisor.restart_delay_s)
+            self.restarts += 1
+            self._spawn(index)
+
+    def request_stop(self) -> None:
+        self._stopping = True
+
+    def stop(self) -> None:
+        """SIGTERM всем воркерам, ожидание shutdown_timeout_s, затем SIGKILL"""
+        self._stopping = True
+        processes = [p for p in self._processes if p is not None]
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+        deadline = time.monotonic() + self.settings.supervisor.shutdown_timeout_s
+        for process in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning("worker_killed", pid=process.pid)
+                process.kill()
+                process.join()
+            mark_process_dead(process.pid)
+        self._processes = [None] * self.workers
+        logger.info("supervisor_stopped", exitcodes=[p.exitcode for p in processes])
+
+
+def main() -> None:
+    from utils.logging import setup_logging
+
+    settings = get_settings()
+    setup_logging(settings.logging.level, settings.logging.format)
+    supervisor = Supervisor(settings)
+    supervisor.start()
+    supervisor.run()
+
+
+if __name__ == "__main__":
+    main()
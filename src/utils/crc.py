@@ -1,18 +1,101 @@
 from __future__ import annotations
 
+import numpy as np
+
+_POLY = 0xA001  # CRC-16/ARC, отражённый полином 0x8005
+
+
+def _build_table() -> tuple[int, ...]:
+    """Таблица на 256 значений для побайтового расчёта"""
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ _POLY if crc & 1 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+
+_TABLE = _build_table()
+_TABLE_NP = np.array(_TABLE, dtype=np.uint16)
+
+# ✅ Ускоренный backend выбирается один раз при импорте (C-расширение crcmod)
+try:
+    import crcmod._crcfunext  # noqa: F401  # без C-расширения crcmod медленнее таблицы
+    import crcmod.predefined
+
+    _native = crcmod.predefined.mkPredefinedCrcFun("crc-16")
+    BACKEND = "crcmod"
+except ImportError:
+    _native = None
+    BACKEND = "table"
+
+
+def _calculate_table(data: bytes) -> int:
+    crc = 0x0000
+    table = _TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
 class CRC16ARC:
+    BACKEND = BACKEND
+
     @staticmethod
     def calculate(data: bytes) -> int:
+        return _native(data) if _native is not None else _calculate_table(data)
+
+    @staticmethod
+    def calculate_table(data: bytes) -> int:
+        """Табличный расчёт на чистом Python"""
+        return _calculate_table(data)
+
+    @staticmethod
+    def calculate_bitwise(data: bytes) -> int:
+        """Эталонный побитовый расчёт (для тестов и бенчмарков)"""
         crc = 0x0000
         for byte in data:
             crc ^= byte
             for _ in range(8):
                 if crc & 1:
-                    crc = (crc >> 1) ^ 0xA001
+                    crc = (crc >> 1) ^ _POLY
                 else:
                     crc >>= 1
         return crc & 0xFFFF
 
+    @staticmethod
+    def calculate_many(
+        buffer: bytes | memoryview | np.ndarray, stride: int = 12, length: int = 10
+    ) -> np.ndarray:
+        """
+        Пакетная проверка CRC для кадров в одном непрерывном буфере.
+
+        Каждый кадр занимает `stride` байт: CRC считается по первым `length`
+        байтам и сравнивается с little-endian CRC сразу за ними.
+        Возвращает булеву маску валидных кадров.
+        """
+        if stride < length + 2:
+            raise ValueError("stride must fit payload and 2-byte CRC")
+
+        raw = np.frombuffer(buffer, dtype=np.uint8)
+        count = len(raw) // stride
+        frames = raw[: count * stride].reshape(count, stride)
+
+        expected = frames[:, length].astype(np.uint16) | (
+            frames[:, length + 1].astype(np.uint16) << 8
+        )
+        return CRC16ARC.calculate_columns(frames[:, :length]) == expected
+
+    @staticmethod
+    def calculate_columns(rows: np.ndarray) -> np.ndarray:
+        """CRC для каждой строки матрицы uint8 формы (N, length)"""
+        crc = np.zeros(rows.shape[0], dtype=np.uint16)
+        for column in range(rows.shape[1]):
+            index = (crc ^ rows[:, column]) & 0xFF
+            crc = (crc >> 8) ^ _TABLE_NP[index]
+        return crc
+
     @staticmethod
     def verify(data: bytes, expected_crc: int) -> bool:
-        return CRC16ARC.calculate(data) == expected_crc
\ No newline at end of file
+        return CRC16ARC.calculate(data) == expected_crc
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import os
+from pathlib import Path
+
 import structlog
 from config import MetricsConfig  # Абсолютный импорт
 
@@ -10,34 +12,69 @@ logger = structlog.get_logger(__name__)
 METRICS_DISABLED = os.getenv('DISABLE_METRICS', '0') == '1'
 
 if not METRICS_DISABLED:
-    from prometheus_client import Counter, Histogram, start_http_server
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, start_http_server
+    from prometheus_client.multiprocess import MultiProcessCollector, mark_process_dead
     
     PROCESSED_FRAMES = Counter("dbc_frames_processed_total", "Total processed frames", ["status"])
     PROCESSING_TIME = Histogram("dbc_processing_duration_seconds", "Frame processing time") 
     PUBLISHED_MESSAGES = Counter("dbc_messages_published_total", "Published messages", ["output_type"])
+    DECODE_CACHE_HITS = Counter("dbc_decode_cache_hits_total", "Decode cache hits")
+    DECODE_CACHE_MISSES = Counter("dbc_decode_cache_misses_total", "Decode cache misses")
+    DECODE_CACHE_EVICTIONS = Counter("dbc_decode_cache_evictions_total", "Decode cache evictions")
+    # livesum: в multiprocess режиме - сумма по живым воркерам
+    BUS_SUBSCRIBER_LAG = Gauge(
+        "dbc_bus_subscriber_lag", "Messages waiting in subscriber buffer", ["subscriber"],
+        multiprocess_mode="livesum",
+    )
+    BUS_SUBSCRIBER_DROPPED = Counter("dbc_bus_dropped_total", "Messages dropped on subscriber overflow", ["subscriber", "policy"])
+    BUS_SUBSCRIBER_DELIVERED = Counter("dbc_bus_delivered_total", "Messages delivered to subscriber", ["subscriber"])
 else:
     # Заглушки для тестов
     class MockMetric:
         def inc(self, *args, **kwargs): pass
         def observe(self, *args, **kwargs): pass
         def labels(self, *args, **kwargs): return self
+        def set_function(self, *args, **kwargs): pass
+        def remove(self, *args, **kwargs): pass
     
     PROCESSED_FRAMES = MockMetric()
     PROCESSING_TIME = MockMetric() 
     PUBLISHED_MESSAGES = MockMetric()
+    DECODE_CACHE_HITS = MockMetric()
+    DECODE_CACHE_MISSES = MockMetric()
+    DECODE_CACHE_EVICTIONS = MockMetric()
+    BUS_SUBSCRIBER_LAG = MockMetric()
+    BUS_SUBSCRIBER_DROPPED = MockMetric()
+    BUS_SUBSCRIBER_DELIVERED = MockMetric()
     
     def start_http_server(*args, **kwargs): pass
+    def mark_process_dead(*args, **kwargs): pass
 
 
 class MetricsServer:
-    def __init__(self, config: MetricsConfig) -> None:
+    def __init__(self, config: MetricsConfig, multiprocess_dir: Path | None = None) -> None:
+        """multiprocess_dir - отдавать метрики всех воркеров супервизора (PROMETHEUS_MULTIPROC_DIR)"""
         self.config = config
+        self.multiprocess_dir = multiprocess_dir
         self._server = None
     
     async def start(self) -> None:
-        if self.config.enabled and not METRICS_DISABLED:
+        self.start_sync()
+    
+    def start_sync(self) -> None:
+        if not self.config.enabled or METRICS_DISABLED:
+            return
+        if self.multiprocess_dir is not None:
+            registry = CollectorRegistry()
+            MultiProcessCollector(registry, path=str(self.multiprocess_dir))
+            start_http_server(self.config.port, registry=registry)
+        else:
             start_http_server(self.config.port)
-            logger.info("metrics_server_started", port=self.config.port)
+        logger.info(
+            "metrics_server_started",
+            port=self.config.port,
+            multiprocess=self.multiprocess_dir is not None,
+        )
     
     async def stop(self) -> None:
         logger.info("metrics_server_stopped")
\ No newline at end of file
@@ -5,6 +5,25 @@ from pathlib import Path
 os.environ['DISABLE_METRICS'] = '1'
 
 from config import Settings, GRPCConfig, ProcessingConfig, MetricsConfig
+from core.processor import DBCProcessor
+from utils.crc import CRC16ARC
+
+# Минимальная база для тестов: одно сообщение с одним сигналом
+DBC_CONTENT = '''VERSION ""
+
+BO_ 100 TestMessage: 8 Vector__XXX
+ SG_ Signal1 : 0|8@1+ (1,0) [0|255] "" Vector__XXX
+'''
+
+
+def create_can_frame(dev_addr=1, msg_id=100, value=42, payload=None):
+    """12-байтный кадр: адрес, данные (по умолчанию value в первом байте), CRC16-ARC"""
+    if payload is None:
+        payload = bytes([value, 0, 0, 0, 0, 0, 0, 0])
+    comm_addr = dev_addr | (msg_id << 5)
+    crc = CRC16ARC.calculate(comm_addr.to_bytes(2, 'little') + payload)
+    return comm_addr.to_bytes(2, 'little') + payload + crc.to_bytes(2, 'little')
+
 
 @pytest.fixture
 def test_settings():
@@ -17,4 +36,27 @@ def test_settings():
 
 @pytest.fixture
 def sample_can_frame():
-    return bytes([0x61, 0x0C, 0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08, 0x45, 0x67])
\ No newline at end of file
+    return bytes([0x61, 0x0C, 0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08, 0x45, 0x67])
+
+@pytest.fixture
+def can_frame():
+    """Фабрика кадров create_can_frame"""
+    return create_can_frame
+
+@pytest.fixture
+def dbc_content():
+    """Содержимое dbc_file; модуль со своей базой переопределяет эту фикстуру"""
+    return DBC_CONTENT
+
+@pytest.fixture
+def dbc_file(tmp_path, dbc_content):
+    path = tmp_path / "test.dbc"
+    path.write_text(dbc_content)
+    return path
+
+@pytest.fixture
+async def processor(dbc_file):
+    processor = DBCProcessor(dbc_file)
+    await processor.initialize()
+    yield processor
+    await processor.close()
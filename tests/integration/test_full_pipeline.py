@@ -147,3 +147,432 @@ BO_ 200 BroadcastMessage: 8 Vector__XXX
             
             # Проверяем что статистика залогировалась
             mock_logger.info.assert_called_with("stats", **dbc_service.stats)
+
+    async def test_handle_batch(self, dbc_service):
+        """Пакетная обработка: валидные, битые и неизвестные кадры"""
+        published = []
+
+        async def publish(message):
+            published.append(message)
+            return True
+
+        dbc_service.grpc_server.publish_message = publish
+        replies = []
+        items = [
+            ("t1", self.create_can_frame(dev_addr=1, msg_id=100), replies.append),
+            ("t2", b"short", replies.append),
+            ("t3", self.create_can_frame(dev_addr=0, msg_id=200), replies.append),
+            ("t4", self.create_can_frame(dev_addr=3, msg_id=100)[:-2] + b"\xFF\xFF", replies.append),
+            ("t5", self.create_can_frame(dev_addr=2, msg_id=999), None),
+        ]
+
+        await dbc_service.handle_batch(items)
+
+        assert dbc_service.stats["total"] == 5
+        assert dbc_service.stats["errors"] == 2
+        assert dbc_service.stats["valid"] == 3
+        assert [m.device_address for m in published] == [1, 0, 2]
+        assert published[0].signals["Signal1"] == 0x01
+        assert published[1].packet_type == "broadcast"
+        assert published[2].parsed is False
+        # Ответ на каждый кадр со своим reply, включая отброшенные
+        assert len(replies) == 4
+        assert replies.count(None) == 2
+        assert [m.source_topic for m in replies if m] == ["t1", "t3"]
+
+    async def test_stream_survives_decode_error(self, dbc_service):
+        """Ошибка декодирования пачки: каждый кадр потока получает ответ, поток завершается"""
+        from interfaces.grpc.protocol import pb2
+
+        async def failing_decode(*args, **kwargs):
+            raise RuntimeError("decode worker exited")
+
+        dbc_service._decode_buffer = failing_decode
+        servicer = dbc_service.grpc_server._servicer
+        servicer.set_message_handler(dbc_service.submit_message)
+        servicer._stream_queue_size = 2
+
+        async def requests():
+            for i in range(10):
+                yield pb2.FrameRequest(topic="t", payload=self.create_can_frame(dev_addr=i % 8))
+
+        async def collect():
+            return [response async for response in servicer.ProcessFrames(requests(), None)]
+
+        await dbc_service.batcher.start()
+        try:
+            responses = await asyncio.wait_for(collect(), timeout=5.0)
+        finally:
+            await dbc_service.batcher.stop()
+
+        assert len(responses) == 10
+        assert not any(r.success for r in responses)
+        assert dbc_service.stats["errors"] == 10
+
+    async def test_submit_through_batcher(self, dbc_service):
+        """Кадры из очереди батчинга доходят до публикации"""
+        await dbc_service.batcher.start()
+        for i in range(50):
+            await dbc_service.submit_message(f"topic_{i}", self.create_can_frame(dev_addr=1, msg_id=100))
+        await dbc_service.batcher.stop()
+
+        assert dbc_service.stats["total"] == 50
+        assert dbc_service.stats["valid"] == 50
+
+    async def test_submit_reply_per_frame(self, dbc_service):
+        """Каждый кадр из очереди батчинга получает свой результат"""
+        replies = {}
+        await dbc_service.batcher.start()
+        for i in range(20):
+            await dbc_service.submit_message(
+                f"topic_{i}",
+                self.create_can_frame(dev_addr=i % 8, msg_id=100),
+                lambda message, i=i: replies.__setitem__(i, message),
+            )
+        await dbc_service.batcher.stop()
+
+        assert sorted(replies) == list(range(20))
+        assert all(replies[i].source_topic == f"topic_{i}" for i in range(20))
+        assert all(replies[i].device_address == i % 8 for i in range(20))
+
+    async def test_process_frame_batch(self, dbc_service):
+        """Пакет кадров из одного запроса обрабатывается без очереди батчинга"""
+        frames = b"".join([
+            self.create_can_frame(dev_addr=1, msg_id=100),
+            self.create_can_frame(dev_addr=3, msg_id=100)[:-2] + b"\xFF\xFF",
+            self.create_can_frame(dev_addr=0, msg_id=200),
+            self.create_can_frame(dev_addr=2, msg_id=999),
+        ]) + b"\x00\x01"  # неполный хвост отбрасывается
+
+        messages = await dbc_service.process_frame_batch("site_1", frames)
+
+        assert len(messages) == 4
+        assert messages[1] is None
+        assert messages[0].signals["Signal1"] == 0x01
+        assert messages[2].packet_type == "broadcast"
+        assert messages[3].parsed is False
+        assert all(m.source_topic == "site_1" for m in messages if m)
+        assert dbc_service.stats["total"] == 4
+        assert dbc_service.stats["valid"] == 3
+        assert dbc_service.stats["errors"] == 1
+
+    async def test_compact_stream(self, dbc_service):
+        """Компактный поток: словарь в первом ответе, значения сигналов в массивах"""
+        from interfaces.grpc.protocol import pb2
+
+        servicer = dbc_service.grpc_server._servicer
+        servicer.set_batch_handler(dbc_service.process_frame_batch)
+        servicer.set_schema_provider(lambda topic, dev_addr: dbc_service.dbc_processor.schema)
+
+        async def requests():
+            for _ in range(2):
+                yield pb2.FrameBatchRequest(topic="site", frames=b"".join([
+                    self.create_can_frame(dev_addr=1, msg_id=100),
+                    self.create_can_frame(dev_addr=0, msg_id=200),
+                ]))
+
+        responses = [r async for r in servicer.StreamCompactFrames(requests(), None)]
+
+        first, second = responses
+        assert [m.name for m in first.schema.messages] == ["TestMessage", "BroadcastMessage"]
+        assert not second.HasField("schema")
+        assert list(second.message_index) == [0, 1]
+        assert list(second.device_address) == [1, 0]
+        # Signal1, Status - целые; Signal2 - масштабированный float
+        assert list(second.integers) == [0x01, 0x01]
+        assert second.values[0] == pytest.approx(0x0302 * 0.1)
+
+    async def test_signal_projection(self, dbc_service):
+        """Проекция: в ответах только запрошенные сигналы, в словаре - тоже"""
+        from interfaces.grpc.protocol import pb2
+
+        servicer = dbc_service.grpc_server._servicer
+        servicer.set_batch_handler(dbc_service.process_frame_batch)
+        servicer.set_schema_provider(lambda topic, dev_addr: dbc_service.dbc_processor.schema)
+        frames = self.create_can_frame(dev_addr=1, msg_id=100)
+
+        response = await servicer.ProcessFrameBatch(
+            pb2.FrameBatchRequest(topic="t", frames=frames, signals=["Signal2"]), None
+        )
+        assert [s.name for s in response.results[0].frame.signals] == ["Signal2"]
+
+        async def requests():
+            yield pb2.FrameBatchRequest(topic="t", frames=frames, signals=["Signal2"])
+
+        compact = [r async for r in servicer.StreamCompactFrames(requests(), None)][0]
+        schema = {m.name: [s.name for s in m.signals] for m in compact.schema.messages}
+        assert schema == {"TestMessage": ["Signal2"], "BroadcastMessage": []}
+        assert list(compact.integers) == []
+        assert compact.values[0] == pytest.approx(0x0302 * 0.1)
+
+    async def test_subscription_filters_before_decode(self, dbc_service):
+        """Подписка: кадры вне адресов/CAN ID не декодируются, статус FRAME_FILTERED"""
+        from interfaces.grpc.protocol import pb2
+
+        servicer = dbc_service.grpc_server._servicer
+        servicer.set_batch_handler(dbc_service.process_frame_batch)
+        frames = b"".join([
+            self.create_can_frame(dev_addr=1, msg_id=100),
+            self.create_can_frame(dev_addr=2, msg_id=100),
+            self.create_can_frame(dev_addr=1, msg_id=200),
+            self.create_can_frame(dev_addr=1, msg_id=100)[:-2] + b"\xFF\xFF",
+        ])
+        subscription = pb2.Subscription(
+            device_addresses=[1], can_message_ids=[100], signals=["Signal2"]
+        )
+
+        with patch.object(
+            dbc_service.dbc_processor, "decode_frames",
+            wraps=dbc_service.dbc_processor.decode_frames,
+        ) as decode_frames:
+            response = await servicer.ProcessFrameBatch(
+                pb2.FrameBatchRequest(topic="t", frames=frames, subscription=subscription), None
+            )
+
+        assert list(response.status) == [
+            pb2.FRAME_DECODED, pb2.FRAME_FILTERED, pb2.FRAME_FILTERED, pb2.FRAME_REJECTED
+        ]
+        assert [s.name for s in response.results[0].frame.signals] == ["Signal2"]
+        batch = decode_frames.call_args.args[0]
+        assert batch.accepted.tolist() == [True, False, False, False]
+        assert dbc_service.stats["filtered"] == 2
+        assert dbc_service.stats["errors"] == 1
+
+    async def test_subscription_deadband_stream(self, dbc_service):
+        """Только изменения: кадр без изменения больше deadband не выдаётся"""
+        from interfaces.grpc.protocol import pb2
+
+        servicer = dbc_service.grpc_server._servicer
+        servicer.set_batch_handler(dbc_service.process_frame_batch)
+        subscription = pb2.Subscription(signals=["Signal2"], deadband=1.0)
+
+        def frame(raw):
+            return self.create_can_frame(payload=bytes([0, *raw.to_bytes(2, "little"), 0, 0, 0, 0, 0]))
+
+        async def requests():
+            yield pb2.FrameBatchRequest(
+                topic="t", frames=frame(100) + frame(105), subscription=subscription
+            )
+            yield pb2.FrameBatchRequest(topic="t", frames=frame(120) + frame(125))
+
+        responses = [r async for r in servicer.StreamFrameBatches(requests(), None)]
+
+        # 10.0 V -> 10.5 (не больше 1.0) -> 12.0 -> 12.5
+        assert [list(r.status) for r in responses] == [
+            [pb2.FRAME_DECODED, pb2.FRAME_FILTERED],
+            [pb2.FRAME_DECODED, pb2.FRAME_FILTERED],
+        ]
+        assert responses[1].results[0].frame.signals[0].number == pytest.approx(12.0)
+
+    async def test_subscription_stream_replies_filtered(self, dbc_service):
+        """ProcessFrames с подпиской: ответ на каждый кадр, отфильтрованные - с ошибкой"""
+        from interfaces.grpc.protocol import pb2
+
+        servicer = dbc_service.grpc_server._servicer
+        servicer.set_message_handler(dbc_service.submit_message)
+        subscription = pb2.Subscription(
+            device_addresses=[1], ranges=[pb2.SignalRange(signal="Signal1", max=10)]
+        )
+        frames = [
+            self.create_can_frame(dev_addr=1, payload=bytes([5, 0, 0, 0, 0, 0, 0, 0])),
+            self.create_can_frame(dev_addr=2, payload=bytes([5, 0, 0, 0, 0, 0, 0, 0])),
+            self.create_can_frame(dev_addr=1, payload=bytes([50, 0, 0, 0, 0, 0, 0, 0])),
+        ]
+
+        async def requests():
+            for frame in frames:
+                yield pb2.FrameRequest(topic="t", payload=frame, subscription=subscription)
+
+        async def collect():
+            return [response async for response in servicer.ProcessFrames(requests(), None)]
+
+        await dbc_service.batcher.start()
+        try:
+            responses = await asyncio.wait_for(collect(), timeout=5.0)
+        finally:
+            await dbc_service.batcher.stop()
+
+        # Отфильтрованный до парсинга кадр может опередить декодируемые
+        results = sorted((r.device_address, r.success, r.error) for r in responses)
+        assert results == [
+            (1, False, "Filtered by subscription"),
+            (1, True, ""),
+            (2, False, "Filtered by subscription"),
+        ]
+
+    async def test_hot_reload_notifies_streams(self, dbc_service, integration_settings):
+        """ReloadDBC: новый словарь в WatchSchema и в следующем ответе компактного потока"""
+        from interfaces.grpc.protocol import pb2
+
+        servicer = dbc_service.grpc_server._servicer
+        servicer.set_batch_handler(dbc_service.process_frame_batch)
+        servicer.set_schema_provider(lambda topic, dev_addr: dbc_service.dbc_processor.schema)
+        servicer.set_reload_handler(dbc_service.reload_dbc)
+        frames = self.create_can_frame(dev_addr=1, msg_id=100)
+
+        watch = servicer.WatchSchema(pb2.WatchSchemaRequest(), None)
+        assert (await watch.__anext__()).version == 1
+
+        reload_done = asyncio.Event()
+
+        async def requests():
+            yield pb2.FrameBatchRequest(topic="t", frames=frames)
+            await reload_done.wait()
+            yield pb2.FrameBatchRequest(topic="t", frames=frames)
+
+        compact = servicer.StreamCompactFrames(requests(), None)
+        assert (await compact.__anext__()).schema.version == 1
+
+        dbc_file = integration_settings.dbc_file
+        dbc_file.write_text(dbc_file.read_text().replace("(0.1,0)", "(0.2,0)"))
+        response = await servicer.ReloadDBC(pb2.ReloadRequest(), None)
+        reload_done.set()
+
+        assert response.success and list(response.changed) == [100]
+        assert (await asyncio.wait_for(watch.__anext__(), timeout=1.0)).version == 2
+        second = await compact.__anext__()
+        assert second.schema.version == 2
+        assert second.values[0] == pytest.approx(0x0302 * 0.2)
+        await watch.aclose()
+
+    async def test_reload_error_response(self, dbc_service, tmp_path):
+        """Ошибка перезагрузки возвращается клиенту, база не меняется"""
+        from interfaces.grpc.protocol import pb2
+
+        servicer = dbc_service.grpc_server._servicer
+        servicer.set_reload_handler(dbc_service.reload_dbc)
+
+        response = await servicer.ReloadDBC(
+            pb2.ReloadRequest(dbc_file=str(tmp_path / "missing.dbc")), None
+        )
+
+        assert not response.success and response.error
+        assert dbc_service.dbc_processor.schema.version == 1
+
+    async def test_reload_path_restricted(self, dbc_service, integration_settings, tmp_path):
+        """ReloadDBC принимает только путь из настроек, пока не разрешены произвольные"""
+        from interfaces.grpc.protocol import pb2
+
+        servicer = dbc_service.grpc_server._servicer
+        servicer.set_reload_handler(dbc_service.reload_dbc)
+        other = tmp_path / "other" / "other.dbc"
+        other.parent.mkdir()
+        other.write_text(integration_settings.dbc_file.read_text())
+
+        rejected = await servicer.ReloadDBC(pb2.ReloadRequest(dbc_file=str(other)), None)
+        configured = await servicer.ReloadDBC(
+            pb2.ReloadRequest(dbc_file=str(integration_settings.dbc_file)), None
+        )
+
+        assert not rejected.success and "not allowed" in rejected.error
+        assert not list(other.parent.glob("*.dbcc"))
+        assert configured.success
+
+        integration_settings.processing.dbc_reload_any_path = True
+        assert (await servicer.ReloadDBC(pb2.ReloadRequest(dbc_file=str(other)), None)).success
+        assert dbc_service.dbc_processor.dbc_file == other
+
+    async def test_watch_file_reloads(self, dbc_service, integration_settings):
+        """Изменение файла подхватывается фоновой проверкой"""
+        watcher = asyncio.create_task(dbc_service._watch_dbc(0.01))
+        await asyncio.sleep(0)  # исходное состояние файла запомнено
+        try:
+            dbc_file = integration_settings.dbc_file
+            dbc_file.write_text(dbc_file.read_text() + '''
+BO_ 300 Added: 8 Vector__XXX
+ SG_ Counter : 0|8@1+ (1,0) [0|255] "" Vector__XXX
+''')
+            for _ in range(100):
+                if 300 in dbc_service.dbc_processor.schema.messages:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            watcher.cancel()
+
+        assert dbc_service.dbc_processor.schema.version == 2
+
+
+class TestMultipleDatabases:
+    @pytest.fixture
+    async def dbc_service(self, tmp_path):
+        from config import DBCRoute
+
+        (tmp_path / "gen1.dbc").write_text('''VERSION ""
+
+BO_ 100 Gen1Status: 8 Vector__XXX
+ SG_ Voltage : 0|16@1+ (0.1,0) [0|6553.5] "V" Vector__XXX
+''')
+        (tmp_path / "gen2.dbc").write_text('''VERSION ""
+
+BO_ 100 Gen2Status: 8 Vector__XXX
+ SG_ Voltage : 0|16@1+ (0.01,0) [0|655.35] "V" Vector__XXX
+''')
+        settings = Settings(
+            dbc_file=tmp_path / "gen1.dbc",
+            dbc_routes=[DBCRoute(
+                name="gen2", dbc_file=tmp_path / "gen2.dbc",
+                topics=["site/gen2"], device_ranges=[(16, 31)],
+            )],
+            grpc=GRPCConfig(host="localhost", port=50054, max_workers=4),
+            processing=ProcessingConfig(worker_pool_size=2),
+            metrics=MetricsConfig(enabled=False)
+        )
+        service = DBCService(settings)
+        await service.dbc_router.initialize()
+        yield service
+        await service.shutdown()
+
+    # Voltage = 10000 (сырое значение)
+    PAYLOAD = bytes([0x10, 0x27, 0, 0, 0, 0, 0, 0])
+
+    async def test_routed_batches(self, dbc_service, can_frame):
+        """Пакет декодируется базой топика или адреса устройства"""
+        frames = can_frame(1, payload=self.PAYLOAD) + can_frame(17, payload=self.PAYLOAD)
+
+        by_device = await dbc_service.process_frame_batch("site/gen1", frames)
+        by_topic = await dbc_service.process_frame_batch("site/gen2", frames)
+
+        assert [m.message_name for m in by_device] == ["Gen1Status", "Gen2Status"]
+        assert [m.message_name for m in by_topic] == ["Gen2Status", "Gen2Status"]
+        assert dbc_service.schema_for("site/gen2").messages[100].name == "Gen2Status"
+        assert dbc_service.schema_for("").messages[100].name == "Gen1Status"
+
+    async def test_compact_stream_routed_by_device(self, dbc_service, can_frame):
+        """Компактный поток: кадры, декодированные базой адреса, не кодируются словарём топика"""
+        from interfaces.grpc.protocol import pb2
+
+        servicer = dbc_service.grpc_server._servicer
+        servicer.set_batch_handler(dbc_service.process_frame_batch)
+        servicer.set_schema_provider(dbc_service.schema_for)
+
+        frames = can_frame(1, payload=self.PAYLOAD) + can_frame(17, payload=self.PAYLOAD)
+
+        async def requests():
+            yield pb2.FrameBatchRequest(topic="site/gen1", frames=frames)
+
+        (compact,) = [r async for r in servicer.StreamCompactFrames(requests(), None)]
+
+        assert [m.name for m in compact.schema.messages] == ["Gen1Status"]
+        assert list(compact.status) == [pb2.FRAME_DECODED, pb2.FRAME_UNKNOWN]
+        assert list(compact.device_address) == [1]
+        assert list(compact.values) == [pytest.approx(1000.0)]
+
+    async def test_reload_by_name(self, dbc_service, can_frame):
+        """ReloadDBC с именем базы перезагружает только её"""
+        from interfaces.grpc.protocol import pb2
+
+        servicer = dbc_service.grpc_server._servicer
+        servicer.set_reload_handler(dbc_service.reload_dbc)
+        gen2 = dbc_service.dbc_router.get("gen2")
+        versions = {dbc_service.schema_for("").version, dbc_service.schema_for("site/gen2").version}
+        gen2.dbc_file.write_text(gen2.dbc_file.read_text().replace("(0.01,0)", "(0.02,0)"))
+
+        response = await servicer.ReloadDBC(pb2.ReloadRequest(database="gen2"), None)
+        unknown = await servicer.ReloadDBC(pb2.ReloadRequest(database="gen3"), None)
+
+        assert response.success and list(response.changed) == [100]
+        assert response.version not in versions
+        assert dbc_service.schema_for("").version in versions
+        assert not unknown.success
+        messages = await dbc_service.process_frame_batch("", can_frame(17, payload=self.PAYLOAD))
+        assert messages[0].signals["Voltage"] == pytest.approx(200.0)
@@ -1,10 +1,12 @@
 import pytest
 import asyncio
 import time
+from types import SimpleNamespace
 from unittest.mock import patch
 from concurrent.futures import ThreadPoolExecutor
 
-from interfaces.grpc.server import GRPCServer
+from interfaces.grpc.protocol import pb2
+from interfaces.grpc.server import DBCServicer, GRPCServer
 from core.models import ParsedMessage
 from config import GRPCConfig
 
@@ -150,6 +152,36 @@ class TestGRPCServerIntegration:
         successful_count = sum(1 for r in results if r is True)
         assert successful_count > 0, "Хотя бы некоторые сообщения должны быть обработаны"
 
+    async def test_subscribe_receives_published(self, grpc_server):
+        """Subscribe получает опубликованные результаты по своему фильтру"""
+        servicer = grpc_server._servicer
+        request = pb2.SubscribeRequest(
+            name="dashboard",
+            subscription=pb2.Subscription(device_addresses=[2], signals=["signal1"]),
+            overflow=pb2.OVERFLOW_DROP_NEWEST,
+            buffer_size=2,
+        )
+        stream = servicer.Subscribe(request, None)
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0)
+
+        for device_addr in (1, 2, 2, 2, 3):
+            assert await grpc_server.publish_message(self.create_test_message(device_addr))
+
+        subscriber = grpc_server.bus.subscribers[0]
+        assert subscriber.name.startswith("dashboard")
+        assert subscriber.policy == "drop_newest"
+
+        response = await asyncio.wait_for(first, timeout=1.0)
+        assert response.device_address == 2
+        assert [s.name for s in response.frame.signals] == ["signal1"]
+        assert subscriber.dropped == 1
+
+        await grpc_server.stop()
+        rest = [r async for r in stream]
+        assert [r.device_address for r in rest] == [2]
+        assert grpc_server.bus.subscribers == []
+
     async def test_server_lifecycle(self):
         """Тест жизненного цикла сервера"""
         config = GRPCConfig(host="localhost", port=50053, max_workers=2)
@@ -175,4 +207,331 @@ class TestGRPCServerIntegration:
             result = await server.publish_message(message)
             # Результат может быть любым, главное чтобы не было исключения
         except Exception as e:
-            pytest.fail(f"Публикация после остановки сервера вызвала исключение: {e}")
\ No newline at end of file
+            pytest.fail(f"Публикация после остановки сервера вызвала исключение: {e}")
+
+
+class TestProcessFramesStreaming:
+    """ProcessFrames: ответы каждого потока относятся к его собственным кадрам"""
+
+    async def requests(self, topic, count, delay=0.0):
+        for i in range(count):
+            if delay:
+                await asyncio.sleep(delay)
+            yield pb2.FrameRequest(topic=topic, payload=bytes([i]))
+
+    def create_servicer(self):
+        servicer = DBCServicer()
+
+        async def handler(topic, payload, reply):
+            # Результат приходит асинхронно, как после батчинга
+            await asyncio.sleep(0)
+            if payload == b"\xff":
+                reply(None)
+                return
+            reply(ParsedMessage.model_construct(
+                device_address=payload[0],
+                packet_type="unicast",
+                can_message_id=100,
+                message_name="TestMessage",
+                signals={},
+                raw_payload=payload.hex().upper(),
+                crc16="0x0000",
+                crc_valid=True,
+                timestamp="",
+                parsed=True,
+                source_topic=topic,
+                error=None,
+            ))
+
+        servicer.set_message_handler(handler)
+        return servicer
+
+    async def collect(self, servicer, requests):
+        return [response async for response in servicer.ProcessFrames(requests, None)]
+
+    async def test_responses_match_requests(self):
+        """На каждый кадр - ровно один ответ, поток завершается сам"""
+        servicer = self.create_servicer()
+        responses = await asyncio.wait_for(
+            self.collect(servicer, self.requests("a", 50)), timeout=2.0
+        )
+
+        assert [r.device_address for r in responses] == list(range(50))
+        assert all(r.success for r in responses)
+        assert servicer.active_streams == 0
+
+    async def test_concurrent_streams_isolated(self):
+        """Параллельные потоки не получают чужих результатов"""
+        servicer = self.create_servicer()
+        first, second = await asyncio.wait_for(asyncio.gather(
+            self.collect(servicer, self.requests("first", 30, delay=0.001)),
+            self.collect(servicer, self.requests("second", 20)),
+        ), timeout=2.0)
+
+        assert len(first) == 30 and len(second) == 20
+        assert all(r.frame.source_topic == "first" for r in first)
+        assert all(r.frame.source_topic == "second" for r in second)
+
+    async def test_backpressure_without_drops(self):
+        """Маленькое окно ожидания тормозит чтение, но ответы не теряются"""
+        servicer = self.create_servicer()
+        servicer._stream_queue_size = 2
+        responses = await asyncio.wait_for(
+            self.collect(servicer, self.requests("a", 100)), timeout=2.0
+        )
+
+        assert [r.device_address for r in responses] == list(range(100))
+
+    async def test_invalid_frame_error_response(self):
+        """Отброшенный кадр даёт ответ с ошибкой вместо тишины"""
+        servicer = self.create_servicer()
+
+        async def requests():
+            yield pb2.FrameRequest(topic="t", payload=b"\x01")
+            yield pb2.FrameRequest(topic="t", payload=b"\xff")
+
+        responses = await asyncio.wait_for(self.collect(servicer, requests()), timeout=2.0)
+
+        assert [r.success for r in responses] == [True, False]
+        assert responses[1].error
+
+    async def test_handler_error_response(self):
+        """Исключение обработчика не рвёт поток"""
+        servicer = DBCServicer()
+
+        async def failing(topic, payload, reply):
+            raise ValueError("boom")
+
+        servicer.set_message_handler(failing)
+        responses = await asyncio.wait_for(
+            self.collect(servicer, self.requests("t", 3)), timeout=2.0
+        )
+
+        assert [r.success for r in responses] == [False, False, False]
+
+    async def test_subscription_skips_frames(self):
+        """Кадры вне подписки не передаются обработчику, но получают ответ"""
+        servicer = self.create_servicer()
+        subscription = pb2.Subscription(device_addresses=[1, 3])
+
+        async def requests():
+            for addr in range(5):
+                yield pb2.FrameRequest(
+                    topic="t", payload=bytes([addr, 0]), subscription=subscription
+                )
+
+        responses = await asyncio.wait_for(self.collect(servicer, requests()), timeout=2.0)
+
+        assert [(r.device_address, r.success) for r in responses] == [
+            (0, False), (1, True), (2, False), (3, True), (4, False)
+        ]
+        assert responses[0].error == "Filtered by subscription"
+
+
+class TestTypedResponses:
+    """FrameResponse.frame заполняется из результата декодирования, JSON - по запросу"""
+
+    def create_message(self):
+        from cantools.database.namedsignalvalue import NamedSignalValue
+        return ParsedMessage.model_construct(
+            device_address=0,
+            packet_type="broadcast",
+            can_message_id=100,
+            message_name="TestMessage",
+            signals={
+                "Counter": -5,
+                "Voltage": 51.4,
+                "Data": (1 << 64) - 1,
+                "State": NamedSignalValue(1, "On"),
+            },
+            raw_payload="0102030405060708",
+            crc16="0xABCD",
+            crc_valid=True,
+            timestamp="",
+            parsed=True,
+            source_topic="site",
+            error=None,
+        )
+
+    def test_typed_frame(self):
+        """Типы значений сигналов сохраняются без промежуточного JSON"""
+        response = DBCServicer()._create_response(self.create_message())
+        frame = response.frame
+
+        assert response.data == ""
+        assert frame.broadcast is True
+        assert frame.raw_payload == bytes.fromhex("0102030405060708")
+        assert frame.crc16 == 0xABCD
+        signals = {s.name: s for s in frame.signals}
+        assert signals["Counter"].WhichOneof("value") == "integer"
+        assert signals["Counter"].integer == -5
+        assert signals["Voltage"].number == 51.4
+        assert signals["Data"].unsigned == (1 << 64) - 1
+        assert signals["State"].label == "On"
+
+    def test_json_opt_in_metadata(self):
+        """Устаревший JSON формат включается метаданными вызова"""
+        servicer = DBCServicer()
+        context = SimpleNamespace(invocation_metadata=lambda: (("x-response-format", "json"),))
+
+        assert servicer._wants_json(None) is False
+        assert servicer._wants_json(context) is True
+
+        response = servicer._create_response(self.create_message(), as_json=True)
+        assert '"source_topic":"site"' in response.data
+        assert not response.HasField("frame")
+
+    def test_json_server_default(self):
+        """Формат по умолчанию задаётся в GRPCConfig.response_format"""
+        servicer = GRPCServer(GRPCConfig(response_format="json"))._servicer
+        assert servicer._wants_json(None) is True
+
+
+class TestFrameBatchRPC:
+    """ProcessFrameBatch / StreamFrameBatches: упакованные кадры и статусы"""
+
+    def create_message(self, topic, index, parsed=True):
+        return ParsedMessage.model_construct(
+            device_address=index,
+            packet_type="unicast",
+            can_message_id=100 if parsed else 999,
+            message_name="TestMessage" if parsed else "Unknown",
+            signals={},
+            raw_payload="",
+            crc16="0x0000",
+            crc_valid=parsed,
+            timestamp="",
+            parsed=parsed,
+            source_topic=topic,
+            error=None,
+        )
+
+    def create_servicer(self):
+        servicer = DBCServicer()
+
+        async def batch_handler(topic, frames, subscription=None):
+            # Каждый третий кадр отброшен, каждый пятый - неизвестный CAN ID
+            messages = []
+            for i in range(len(frames) // 12):
+                if i % 3 == 2:
+                    messages.append(None)
+                else:
+                    messages.append(self.create_message(topic, i, parsed=i % 5 != 4))
+            return messages
+
+        servicer.set_batch_handler(batch_handler)
+        return servicer
+
+    async def test_unary_batch(self):
+        """Статус на каждый кадр, результаты - только для неотброшенных"""
+        servicer = self.create_servicer()
+        request = pb2.FrameBatchRequest(topic="site", frames=bytes(12 * 10))
+
+        response = await servicer.ProcessFrameBatch(request, None)
+
+        assert response.count == 10
+        assert list(response.status) == [1, 1, 0, 1, 2, 0, 1, 1, 0, 2]
+        assert [r.device_address for r in response.results] == [0, 1, 3, 4, 6, 7, 9]
+        # Ответ сериализуется как обычное protobuf сообщение
+        assert pb2.FrameBatchResponse.FromString(response.SerializeToString()) == response
+
+    async def test_stream_batches_in_order(self):
+        """Ответы потока идут в порядке пакетов"""
+        servicer = self.create_servicer()
+
+        async def requests():
+            for size in (1, 4, 0):
+                yield pb2.FrameBatchRequest(topic=f"batch_{size}", frames=bytes(12 * size))
+
+        responses = [r async for r in servicer.StreamFrameBatches(requests(), None)]
+
+        assert [r.count for r in responses] == [1, 4, 0]
+
+    async def test_batch_handler_error(self):
+        """Ошибка обработчика - все кадры пакета помечены отброшенными"""
+        servicer = DBCServicer()
+
+        async def failing(topic, frames, subscription=None):
+            raise ValueError("boom")
+
+        servicer.set_batch_handler(failing)
+        response = await servicer.ProcessFrameBatch(
+            pb2.FrameBatchRequest(topic="t", frames=bytes(36)), None
+        )
+
+        assert response.count == 3
+        assert response.status == bytes(3)
+        assert len(response.results) == 0
+
+
+class TestConflationMode:
+    """GRPCServer с conflation_interval_ms: подписчики получают последние значения"""
+
+    async def test_publish_conflated(self):
+        server = GRPCServer(GRPCConfig(port=50057, conflation_interval_ms=1000))
+        subscriber = server.bus.subscribe("dashboard")
+        await server.start()
+
+        for i in range(100):
+            message = ParsedMessage.model_construct(
+                device_address=i % 2, can_message_id=100, signals={"Signal1": i}
+            )
+            assert await server.publish_message(message)
+
+        assert subscriber.lag == 0
+        assert server.conflator.pending == 2
+
+        await server.stop()
+        delivered = [m async for m in subscriber]
+        assert [m.signals["Signal1"] for m in delivered] == [98, 99]
+
+
+class TestServiceRegistration:
+    """Сервис зарегистрирован в aio.server: вызовы через настоящий канал"""
+
+    async def test_batch_over_channel(self):
+        from grpc import aio
+        from interfaces.grpc.protocol import pb2_grpc
+
+        server = GRPCServer(GRPCConfig(host="127.0.0.1", port=0, compression="gzip"))
+        frames_seen = []
+
+        async def batch_handler(topic, frames, subscription=None):
+            frames_seen.append(len(frames))
+            return [TestFrameBatchRPC().create_message(topic, i) for i in range(len(frames) // 12)]
+
+        server.set_batch_handler(batch_handler)
+        await server.start()
+        assert server.port > 0
+        try:
+            async with aio.insecure_channel(f"127.0.0.1:{server.port}") as channel:
+                stub = pb2_grpc.DBCServiceStub(channel)
+                response = await stub.ProcessFrameBatch(
+                    pb2.FrameBatchRequest(topic="site", frames=bytes(12 * 3)), timeout=5
+                )
+                watch = stub.WatchSchema(pb2.WatchSchemaRequest(), timeout=5)
+                # Словаря нет - поток завершается без сообщений
+                assert await watch.read() is aio.EOF
+        finally:
+            await server.stop()
+
+        assert frames_seen == [36]
+        assert response.count == 3 and list(response.status) == [1, 1, 1]
+
+    def test_server_options(self):
+        """Настройки транспорта переходят в channel args; нули - умолчания gRPC"""
+        from interfaces.grpc.server import server_options
+
+        options = dict(server_options(GRPCConfig(
+            max_message_size=1 << 20, max_concurrent_streams=64,
+            http2_stream_window_bytes=1 << 22, so_reuseport=True, max_pings_without_data=2,
+        )))
+
+        assert options["grpc.max_receive_message_length"] == 1 << 20
+        assert options["grpc.max_send_message_length"] == 1 << 20
+        assert options["grpc.max_concurrent_streams"] == 64
+        assert options["grpc.http2.lookahead_bytes"] == 1 << 22
+        assert options["grpc.so_reuseport"] == 1
+        assert options["grpc.http2.max_pings_without_data"] == 2
+        assert "grpc.max_connection_age_ms" not in options
+        assert dict(server_options(GRPCConfig()))["grpc.so_reuseport"] == 0
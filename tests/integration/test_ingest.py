@@ -0,0 +1,164 @@
+import asyncio
+import socket
+
+import pytest
+
+from config import GRPCConfig, IngestConfig, MetricsConfig, ProcessingConfig, Settings
+from interfaces.ingest import IngestServer
+from service import DBCService
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timeout"
+        await asyncio.sleep(0.01)
+
+
+class TestIngestServer:
+    @pytest.fixture
+    async def ingest(self):
+        server = IngestServer(IngestConfig(host="127.0.0.1", tcp_port=0, udp_port=0, topic="raw"))
+        received = []
+
+        async def handler(topic, frames):
+            received.append((topic, frames))
+
+        server.set_handler(handler)
+        await server.start()
+        server.received = received
+        yield server
+        await server.stop()
+
+    def frames(self, server):
+        return b"".join(frames for _, frames in server.received)
+
+    async def test_tcp_stream_realigned(self, ingest, can_frame):
+        """Кадры, разрезанные на произвольные куски, собираются по 12 байт"""
+        data = b"".join(can_frame(value=i) for i in range(100))
+        _, writer = await asyncio.open_connection("127.0.0.1", ingest.tcp_port)
+        for start in range(0, len(data), 7):
+            writer.write(data[start:start + 7])
+            await writer.drain()
+        await wait_for(lambda: ingest.stats["frames"] == 100)
+        writer.close()
+        await writer.wait_closed()
+
+        assert self.frames(ingest) == data
+        assert all(topic == "raw" and len(frames) % 12 == 0 for topic, frames in ingest.received)
+
+    async def test_tcp_truncated_tail(self, ingest, can_frame):
+        """Обрыв соединения посреди кадра - хвост отбрасывается"""
+        frame = can_frame()
+        _, writer = await asyncio.open_connection("127.0.0.1", ingest.tcp_port)
+        writer.write(frame * 2 + frame[:5])
+        await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+        await wait_for(lambda: ingest.stats["malformed"] == 1)
+
+        assert self.frames(ingest) == frame * 2
+
+    async def test_udp_datagrams(self, ingest, can_frame):
+        """Датаграмма из N кадров; неполный хвост датаграммы отбрасывается"""
+        frame = can_frame()
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(frame * 3, ("127.0.0.1", ingest.udp_port))
+            sock.sendto(frame * 2 + b"\x00" * 5, ("127.0.0.1", ingest.udp_port))
+            await wait_for(lambda: ingest.stats["frames"] == 5)
+
+        assert self.frames(ingest) == frame * 5
+        assert ingest.stats["malformed"] == 1
+
+    async def test_udp_dropped_on_overflow(self, can_frame):
+        """Очередь переполнена - датаграммы отбрасываются"""
+        server = IngestServer(IngestConfig(
+            host="127.0.0.1", tcp_port=None, udp_port=0, max_queue_frames=4
+        ))
+        release = asyncio.Event()
+
+        async def handler(topic, frames):
+            await release.wait()
+
+        server.set_handler(handler)
+        await server.start()
+        try:
+            frame = can_frame()
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                for _ in range(10):
+                    sock.sendto(frame * 2, ("127.0.0.1", server.udp_port))
+                await wait_for(lambda: server.stats["buffers"] + server.stats["dropped"] // 2 == 10)
+            assert server.stats["dropped"] > 0
+        finally:
+            release.set()
+            await server.stop()
+
+    async def test_tcp_backpressure(self, can_frame):
+        """Очередь переполнена - чтение TCP приостанавливается, кадры не теряются"""
+        server = IngestServer(IngestConfig(
+            host="127.0.0.1", tcp_port=0, udp_port=None,
+            read_buffer_size=120, max_queue_frames=20, max_batch_frames=10,
+        ))
+        release = asyncio.Event()
+        received = []
+
+        async def handler(topic, frames):
+            await release.wait()
+            received.append(frames)
+
+        server.set_handler(handler)
+        await server.start()
+        try:
+            data = b"".join(can_frame(value=i % 256) for i in range(2000))
+            _, writer = await asyncio.open_connection("127.0.0.1", server.tcp_port)
+            writer.write(data)
+            await wait_for(lambda: server._paused)
+            assert server._queued_frames < 200
+
+            release.set()
+            await writer.drain()
+            await wait_for(lambda: server.stats["frames"] == 2000)
+            writer.close()
+            await writer.wait_closed()
+            assert b"".join(received) == data
+            assert server.stats["dropped"] == 0
+        finally:
+            release.set()
+            await server.stop()
+
+
+class TestServiceIngest:
+    @pytest.fixture
+    async def service(self, dbc_file):
+        settings = Settings(
+            dbc_file=dbc_file,
+            grpc=GRPCConfig(host="127.0.0.1", port=0),
+            ingest=IngestConfig(enabled=True, host="127.0.0.1", tcp_port=0, udp_port=0),
+            processing=ProcessingConfig(batch_timeout_ms=1.0),
+            metrics=MetricsConfig(enabled=False),
+        )
+        service = DBCService(settings)
+        serving = asyncio.create_task(service.start())
+        await wait_for(lambda: service.running)
+        yield service
+        await service.shutdown()
+        await serving
+
+    async def test_frames_decoded_and_published(self, service, can_frame):
+        """Кадры из TCP и UDP декодируются и публикуются подписчикам"""
+        subscriber = service.grpc_server.bus.subscribe("test")
+        ingest = service.ingest_server
+
+        _, writer = await asyncio.open_connection("127.0.0.1", ingest.tcp_port)
+        writer.write(can_frame(value=7) * 3)
+        await writer.drain()
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(can_frame(dev_addr=2, value=9) * 2, ("127.0.0.1", ingest.udp_port))
+            await wait_for(lambda: service.stats["published"] == 5)
+        writer.close()
+        await writer.wait_closed()
+
+        messages = [await subscriber.get() for _ in range(5)]
+        assert sorted(m.signals["Signal1"] for m in messages) == [7, 7, 7, 9, 9]
+        assert {m.source_topic for m in messages} == {"ingest"}
+        service.grpc_server.bus.unsubscribe(subscriber)
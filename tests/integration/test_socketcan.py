@@ -0,0 +1,136 @@
+import asyncio
+import socket
+import struct
+
+import numpy as np
+import pytest
+
+from config import GRPCConfig, MetricsConfig, ProcessingConfig, Settings, SocketCANConfig
+from core.parser import FrameParser
+from interfaces.socketcan import (
+    CAN_EFF_FLAG,
+    CAN_ERR_FLAG,
+    CAN_RTR_FLAG,
+    SocketCANSource,
+    can_frames_to_batch,
+)
+from service import DBCService
+from utils.crc import CRC16ARC
+
+CAN_FRAME = struct.Struct("=IB3x8s")
+
+
+def socketcan_frame(dev_addr=1, msg_id=100, value=42, flags=CAN_EFF_FLAG):
+    """struct can_frame с идентификатором dev_addr | msg_id << 5"""
+    return CAN_FRAME.pack((dev_addr | msg_id << 5) | flags, 8, bytes([value, 0, 0, 0, 0, 0, 0, 0]))
+
+
+def vcan_available(interface="vcan0"):
+    if not hasattr(socket, "AF_CAN"):
+        return False
+    try:
+        with socket.socket(socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW) as sock:
+            sock.bind((interface,))
+    except OSError:
+        return False
+    return True
+
+
+class TestCANFrameConversion:
+    def test_matches_wire_format(self, can_frame):
+        """Пакет из SocketCAN совпадает с разбором тех же кадров в 12-байтном формате"""
+        keys = [(1, 100), (31, 200), (0, 1023), (5, 63)]
+        batch = can_frames_to_batch(
+            b"".join(socketcan_frame(d, m, value=i) for i, (d, m) in enumerate(keys))
+        )
+        expected = FrameParser()._parse_batch_sync(
+            b"".join(can_frame(d, m, value=i) for i, (d, m) in enumerate(keys))
+        )
+
+        for field in ("dev_addr", "msg_id", "data", "crc16", "rejected"):
+            np.testing.assert_array_equal(getattr(batch, field), getattr(expected, field))
+
+    def test_standard_identifier(self):
+        """11-битный идентификатор: msg_id до 63"""
+        batch = can_frames_to_batch(socketcan_frame(3, 50, flags=0))
+        assert batch.dev_addr.tolist() == [3]
+        assert batch.msg_id.tolist() == [50]
+        assert not batch.rejected.any()
+
+    def test_rejected_frames(self):
+        """RTR, кадры ошибок и идентификаторы шире 16 бит отбрасываются"""
+        frames = [
+            socketcan_frame(flags=CAN_EFF_FLAG | CAN_RTR_FLAG),
+            socketcan_frame(flags=CAN_ERR_FLAG),
+            CAN_FRAME.pack(0x10000 | CAN_EFF_FLAG, 8, bytes(8)),
+            socketcan_frame(),
+        ]
+        batch = can_frames_to_batch(b"".join(frames))
+        assert batch.rejected.tolist() == [True, True, True, False]
+
+    def test_buffer_reusable(self):
+        """Пакет не ссылается на приёмный буфер"""
+        buffer = bytearray(socketcan_frame(value=7))
+        batch = can_frames_to_batch(memoryview(buffer))
+        buffer[:] = bytes(len(buffer))
+        assert batch.data[0, 0] == 7
+        assert batch.dev_addr.tolist() == [1]
+
+
+class TestServiceCANBatch:
+    @pytest.fixture
+    async def service(self, dbc_file):
+        settings = Settings(
+            dbc_file=dbc_file,
+            grpc=GRPCConfig(host="127.0.0.1", port=0),
+            processing=ProcessingConfig(batch_timeout_ms=1.0),
+            metrics=MetricsConfig(enabled=False),
+        )
+        service = DBCService(settings)
+        await service.dbc_processor.initialize()
+        yield service
+        await service.shutdown()
+
+    async def test_process_can_batch(self, service, can_frame):
+        """Кадры шины декодируются без 12-байтного формата"""
+        frames = [
+            socketcan_frame(value=5), socketcan_frame(flags=CAN_RTR_FLAG), socketcan_frame(2, value=9),
+        ]
+        messages = await service.process_can_batch("vcan0", can_frames_to_batch(b"".join(frames)))
+
+        assert messages[1] is None
+        assert [messages[0].signals["Signal1"], messages[2].signals["Signal1"]] == [5, 9]
+        assert messages[2].device_address == 2
+        assert messages[0].crc16 == f"0x{CRC16ARC.calculate(can_frame(value=5)[:10]):04X}"
+        assert service.stats["published"] == 2
+        assert service.stats["errors"] == 1
+
+
+@pytest.mark.skipif(not vcan_available(), reason="vcan0 не настроен")
+class TestSocketCANSource:
+    async def test_read_from_vcan(self):
+        """Кадры, отправленные в vcan0, приходят пакетами обработчику"""
+        source = SocketCANSource(SocketCANConfig(interface="vcan0", batch_frames=64))
+        received = []
+
+        async def handler(topic, batch):
+            received.append((topic, batch))
+
+        source.set_handler(handler)
+        await source.start()
+        try:
+            with socket.socket(socket.AF_CAN, socket.SOCK_RAW, socket.CAN_RAW) as sock:
+                sock.bind(("vcan0",))
+                for i in range(200):
+                    sock.send(socketcan_frame(value=i % 256))
+            deadline = asyncio.get_running_loop().time() + 5
+            while source.stats["frames"] < 200:
+                assert asyncio.get_running_loop().time() < deadline
+                await asyncio.sleep(0.01)
+        finally:
+            await source.stop()
+
+        assert {topic for topic, _ in received} == {"vcan0"}
+        values = np.concatenate([batch.data[:, 0] for _, batch in received])
+        assert values.tolist() == [i % 256 for i in range(200)]
+        assert all(len(batch) <= 64 for _, batch in received)
@@ -0,0 +1,94 @@
+import os
+import signal
+import socket
+import time
+
+import grpc
+import pytest
+
+from config import (
+    GRPCConfig, MetricsConfig, ProcessingConfig, Settings, SocketCANConfig, SupervisorConfig,
+)
+from interfaces.grpc.protocol import pb2, pb2_grpc
+from supervisor import Supervisor, worker_settings
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestSupervisor:
+    @pytest.fixture
+    def settings(self, tmp_path, dbc_file):
+        return Settings(
+            dbc_file=dbc_file,
+            grpc=GRPCConfig(host="127.0.0.1", port=free_port()),
+            processing=ProcessingConfig(batch_timeout_ms=1.0),
+            metrics=MetricsConfig(enabled=False),
+            supervisor=SupervisorConfig(
+                workers=2, shutdown_timeout_s=5.0, restart_delay_s=0.0,
+                metrics_dir=tmp_path / "metrics",
+            ),
+        )
+
+    @pytest.fixture
+    def supervisor(self, settings, monkeypatch):
+        # Каталог метрик супервизор задаёт через окружение - вернуть после теста
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", "")
+        supervisor = Supervisor(settings)
+        supervisor.start()
+        yield supervisor
+        supervisor.stop()
+
+    def process_batch(self, port, frames):
+        with grpc.insecure_channel(f"127.0.0.1:{port}") as channel:
+            stub = pb2_grpc.DBCServiceStub(channel)
+            return stub.ProcessFrameBatch(
+                pb2.FrameBatchRequest(topic="t", frames=frames), timeout=5
+            )
+
+    def test_worker_settings(self, settings):
+        """Воркеры делят порт, метрики отдаёт только супервизор"""
+        worker = worker_settings(settings)
+        assert worker.grpc.so_reuseport and worker.ingest.reuse_port
+        assert not worker.metrics.enabled
+        assert worker.grpc.port == settings.grpc.port
+        assert not settings.grpc.so_reuseport
+
+    def test_socketcan_single_reader(self, settings):
+        """Шину CAN читает только первый воркер - без дублей кадров"""
+        settings = settings.model_copy(update={
+            "socketcan": SocketCANConfig(enabled=True, interface="vcan0")
+        })
+        assert worker_settings(settings, 0).socketcan.enabled
+        assert not worker_settings(settings, 1).socketcan.enabled
+
+    def test_workers_share_port(self, supervisor, settings, can_frame):
+        """Все воркеры слушают один порт; каждое соединение обслуживается"""
+        assert supervisor.wait_ready(30)
+        assert len(set(supervisor.pids)) == 2
+        assert os.environ["PROMETHEUS_MULTIPROC_DIR"] == str(settings.supervisor.metrics_dir)
+
+        for _ in range(4):
+            response = self.process_batch(settings.grpc.port, can_frame() * 3)
+            assert list(response.status) == [pb2.FRAME_DECODED] * 3
+            assert response.results[0].frame.message_name == "TestMessage"
+
+    def test_restart_and_coordinated_stop(self, supervisor, settings, can_frame):
+        """Упавший воркер перезапускается; остановка завершает всех штатно"""
+        assert supervisor.wait_ready(30)
+        crashed = supervisor.pids[0]
+        os.kill(crashed, signal.SIGKILL)
+
+        deadline = time.monotonic() + 10
+        while supervisor.restarts == 0 and time.monotonic() < deadline:
+            supervisor.poll(timeout=0.5)
+        assert supervisor.restarts == 1 and crashed not in supervisor.pids
+        assert supervisor.wait_ready(30)
+        assert self.process_batch(settings.grpc.port, can_frame() * 3).count == 3
+
+        processes = [p for p in supervisor._processes]
+        supervisor.stop()
+        assert [p.exitcode for p in processes] == [0, 0]
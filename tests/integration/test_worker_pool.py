@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from core.parser import FrameParser
+from core.workers import DecodeWorkerPool
+
+
+DBC_CONTENT = '''VERSION ""
+
+BO_ 100 TestMessage: 8 Vector__XXX
+ SG_ Signal1 : 0|8@1+ (1,0) [0|255] "" Vector__XXX
+ SG_ Signal2 : 8|16@1+ (0.1,0) [0|6553.5] "V" Vector__XXX
+
+BO_ 200 BroadcastMessage: 8 Vector__XXX
+ SG_ Status : 0|8@1+ (1,0) [0|255] "" Vector__XXX
+ SG_ Counter : 8|16@1- (1,-5) [0|65535] "" Vector__XXX
+
+BO_ 300 HighFreqMessage: 8 Vector__XXX
+ SG_ Data : 0|64@1+ (1,0) [0|18446744073709551615] "" Vector__XXX
+
+BO_ 400 MuxMessage: 8 Vector__XXX
+ SG_ Mux M : 0|8@1+ (1,0) [0|255] "" Vector__XXX
+ SG_ A m0 : 8|16@1+ (1,0) [0|65535] "" Vector__XXX
+'''
+
+
+@pytest.fixture
+def dbc_content():
+    return DBC_CONTENT
+
+
+class TestDecodeWorkerPool:
+    @pytest.fixture
+    async def pool(self, processor):
+        pool = DecodeWorkerPool(processor.dbc_file, workers=2, slot_frames=64)
+        await pool.start(processor)
+        yield pool
+        await pool.close()
+
+    async def test_matches_inline_pipeline(self, processor, pool, can_frame):
+        """Результат пула совпадает с обработкой в основном процессе"""
+        frames = [
+            can_frame(i % 32, [100, 200, 300, 400, 999][i % 5],
+                      payload=bytes([(i * 7 + j) % 256 for j in range(8)]))
+            for i in range(500)
+        ]
+        frames[10] = frames[10][:-2] + b"\xFF\xFF"
+        buffer = b"".join(frames)
+        topics = [f"topic_{i}" for i in range(len(frames))]
+
+        batch, decoded = await pool.process(buffer)
+        pooled = processor.build_messages(batch, decoded, topics)
+
+        inline_batch = await FrameParser().parse_batch(buffer)
+        inline = processor.build_messages(
+            inline_batch, processor.decode_frames(inline_batch), topics
+        )
+
+        assert pooled[10] is None
+        assert [m and m.model_dump() for m in pooled] == [m and m.model_dump() for m in inline]
+
+    async def test_order_preserved_per_device(self, processor, pool, can_frame):
+        """Порядок кадров одного адреса сохраняется"""
+        frames = [
+            can_frame(i % 3, 200, payload=bytes([i % 256, 0, 0, 0, 0, 0, 0, 0]))
+            for i in range(300)
+        ]
+        batch, decoded = await pool.process(b"".join(frames))
+        messages = processor.build_messages(batch, decoded, [""] * len(frames))
+
+        for dev in range(3):
+            statuses = [m.signals["Status"] for m in messages if m.device_address == dev]
+            assert statuses == [i % 256 for i in range(300) if i % 3 == dev]
+
+    async def test_results_after_reload(self, processor, pool, can_frame):
+        """Пул, запущенный до перезагрузки DBC, собирает колонки своими декодерами"""
+        frames = b"".join(
+            can_frame(1, 100, payload=bytes([i, 2, 3, 0, 0, 0, 0, 0])) for i in range(4)
+        )
+        processor.dbc_file.write_text(
+            DBC_CONTENT.replace(" SG_ Signal2 : 8|16@1+ (0.1,0) [0|6553.5] \"V\" Vector__XXX\n", "")
+        )
+        await processor.reload()
+
+        batch, decoded = await pool.process(frames)
+        assert list(decoded[100].signals) == ["Signal1", "Signal2"]
+
+        # Декодер процессора уже другой: кадры декодируются по одному новым
+        messages = processor.build_messages(batch, decoded, [""] * 4)
+        assert [m.signals for m in messages] == [{"Signal1": i} for i in range(4)]
+        await pool.drain()
+
+    async def test_killed_worker(self, processor, pool, can_frame):
+        """Завершённый воркер: пакеты не зависают, декодируются в основном процессе, воркер перезапускается"""
+        frames = [
+            can_frame(i % 32, [100, 200][i % 2], payload=bytes([i % 256, 1, 2, 0, 0, 0, 0, 0]))
+            for i in range(200)
+        ]
+        buffer = b"".join(frames)
+        topics = [""] * len(frames)
+        inline_batch = await FrameParser().parse_batch(buffer)
+        expected = [
+            m.model_dump()
+            for m in processor.build_messages(inline_batch, processor.decode_frames(inline_batch), topics)
+        ]
+
+        process = pool._processes[0]
+        process.kill()
+        await asyncio.get_running_loop().run_in_executor(None, process.join, 5)
+
+        batch, decoded = await asyncio.wait_for(pool.process(buffer), timeout=5)
+        assert [m.model_dump() for m in processor.build_messages(batch, decoded, topics)] == expected
+
+        deadline = asyncio.get_running_loop().time() + 30
+        while pool.restarts < 1:
+            assert asyncio.get_running_loop().time() < deadline
+            await asyncio.sleep(0.05)
+
+        assert pool._processes[0].is_alive()
+        batch, decoded = await asyncio.wait_for(pool.process(buffer), timeout=5)
+        assert [m.model_dump() for m in processor.build_messages(batch, decoded, topics)] == expected
@@ -0,0 +1,195 @@
+# tests/unit/test_artifact.py - предкомпилированный DBC на диске
+import os
+
+import cantools
+import numpy as np
+import pytest
+
+from core.artifact import (
+    ARTIFACT_VERSION,
+    _HEADER,
+    artifact_path,
+    load_database,
+    read_artifact,
+)
+from core.models import CommAddr, CommData
+from core.processor import DBCProcessor
+from core.schema import MessageInfo, SignalInfo
+
+
+DBC_CONTENT = '''VERSION ""
+
+BO_ 100 TestMessage: 8 Vector__XXX
+ SG_ Signal1 : 0|8@1+ (1,0) [0|255] "" Vector__XXX
+ SG_ Signal2 : 8|16@1+ (0.1,0) [0|6553.5] "V" Vector__XXX
+ SG_ Mode : 24|4@1+ (1,0) [0|15] "" Vector__XXX
+ SG_ Temp : 28|12@1- (2,-40) [-4136|4054] "C" Vector__XXX
+ SG_ Motorola : 47|16@0- (1,0) [-32768|32767] "" Vector__XXX
+
+BO_ 200 BroadcastMessage: 6 Vector__XXX
+ SG_ Status : 0|8@1+ (1,0) [0|255] "" Vector__XXX
+ SG_ Counter : 8|16@1- (1,-5) [0|65535] "" Vector__XXX
+
+BO_ 300 FloatMessage: 8 Vector__XXX
+ SG_ Value : 0|32@1- (1,0) [0|0] "" Vector__XXX
+
+BO_ 400 MuxMessage: 8 Vector__XXX
+ SG_ Mux M : 0|8@1+ (1,0) [0|255] "" Vector__XXX
+ SG_ A m0 : 8|16@1+ (1,0) [0|65535] "" Vector__XXX
+ SG_ B m1 : 8|16@1+ (0.5,0) [0|32767] "" Vector__XXX
+
+CM_ SG_ 100 Mode "Operating mode";
+VAL_ 100 Mode 0 "Off" 1 "On" 2 "Fault" ;
+SIG_VALTYPE_ 300 Value : 1;
+'''
+
+
+def comm_data(msg_id, data):
+    return CommData(frame_id=CommAddr(dev_addr=1, msg_id=msg_id, reserved=0), data=data, crc16=0)
+
+
+@pytest.fixture
+def dbc_content():
+    return DBC_CONTENT
+
+
+class TestDBCArtifact:
+    def test_first_load_writes_artifact(self, dbc_file):
+        """Первая загрузка разбирает DBC и сохраняет артефакт, вторая - читает его"""
+        compiled = load_database(dbc_file)
+        assert compiled.db is not None
+        assert artifact_path(dbc_file).exists()
+
+        restored = load_database(dbc_file)
+        assert restored.db is None
+        assert restored.names == compiled.names
+        assert restored.layouts == compiled.layouts
+        assert restored.messages == compiled.messages
+        assert [frame_id for frame_id, d in restored.decoders.items() if d is None] == [300, 400]
+
+    def test_decode_matches_cantools(self, dbc_file):
+        """Восстановленные декодеры совпадают с cantools, включая VAL_ и big-endian"""
+        load_database(dbc_file)
+        restored = load_database(dbc_file)
+        db = cantools.database.load_file(str(dbc_file))
+
+        rng = np.random.default_rng(19)
+        for frame_id in (100, 200):
+            message = db.get_message_by_frame_id(frame_id)
+            decoder = restored.decoders[frame_id]
+            for payload in rng.integers(0, 256, size=(200, 8), dtype=np.uint8):
+                data = payload.tobytes()
+                data = data[:3] + bytes([data[3] & 0xF0 | payload[0] % 3]) + data[4:]
+                assert decoder.decode(data) == message.decode(data[:message.length])
+
+        choice = restored.decoders[100].decode(bytes([0, 0, 0, 2, 0, 0, 0, 0]))["Mode"]
+        expected = db.get_message_by_frame_id(100).decode(bytes([0, 0, 0, 2, 0, 0, 0, 0]))["Mode"]
+        assert choice == expected and choice.name == "Fault"
+        assert choice.comments == expected.comments
+
+    def test_short_frame_error(self, dbc_file):
+        """Укороченный кадр без объекта cantools - та же ошибка DecodeError"""
+        load_database(dbc_file)
+        decoder = load_database(dbc_file).decoders[100]
+        with pytest.raises(cantools.database.errors.DecodeError, match="Wrong data size"):
+            decoder.decode(b"\x01")
+
+    def test_changed_dbc_rebuilds(self, dbc_file):
+        """Другой хэш DBC - артефакт игнорируется и перезаписывается"""
+        load_database(dbc_file)
+        dbc_file.write_text(DBC_CONTENT.replace("(0.1,0)", "(0.5,0)"))
+
+        compiled = load_database(dbc_file)
+        assert compiled.db is not None
+        assert load_database(dbc_file).decoders[100].signals[1].scale == 0.5
+
+    def test_corrupted_or_foreign_version_ignored(self, dbc_file):
+        """Повреждённый файл или другая версия формата - пересборка из DBC"""
+        load_database(dbc_file)
+        path = artifact_path(dbc_file)
+        content = path.read_bytes()
+
+        path.write_bytes(content[:-10])
+        assert load_database(dbc_file).db is not None
+
+        header = bytearray(path.read_bytes())
+        _HEADER.pack_into(header, 0, b"DBCC", ARTIFACT_VERSION + 1, *_HEADER.unpack_from(header)[2:])
+        path.write_bytes(bytes(header))
+        assert load_database(dbc_file).db is not None
+        assert read_artifact(path, b"\x00" * 32) is None
+
+    def test_readonly_directory(self, dbc_file, monkeypatch):
+        """Ошибка записи артефакта не мешает загрузке"""
+        def deny(*args, **kwargs):
+            raise PermissionError("read-only")
+
+        monkeypatch.setattr(os, "replace", deny)
+        assert load_database(dbc_file).db is not None
+        assert not artifact_path(dbc_file).exists()
+
+    def test_schema_from_artifact(self, dbc_file):
+        """Словарь из артефакта: типы значений, масштаб, метки VAL_, fallback-сообщения"""
+        load_database(dbc_file)
+        restored = load_database(dbc_file)
+
+        assert restored.db is None
+        assert [info.name for info in restored.messages.values()] == [
+            "TestMessage", "BroadcastMessage", "FloatMessage", "MuxMessage"
+        ]
+        assert restored.messages[100].signals[1:4] == (
+            SignalInfo("Signal2", "V", "float", None, 0.1, 0),
+            SignalInfo("Mode", "", "unsigned", {0: "Off", 1: "On", 2: "Fault"}),
+            SignalInfo("Temp", "C", "integer", None, 2, -40),
+        )
+        assert restored.messages[200].signals[1] == SignalInfo("Counter", "", "integer", None, 1, -5)
+        assert restored.messages[400] == MessageInfo(3, 400, "MuxMessage", (
+            SignalInfo("Mux", "", "float"),
+            SignalInfo("A", "", "float"),
+            SignalInfo("B", "", "float", None, 0.5, 0),
+        ))
+
+
+class TestProcessorFromArtifact:
+    @pytest.fixture
+    async def processor(self, dbc_file):
+        await DBCProcessor(dbc_file, use_artifact=True).initialize()
+        processor = DBCProcessor(dbc_file, use_artifact=True)
+        await processor.initialize()
+        yield processor
+        await processor.close()
+
+    async def test_compiled_without_cantools(self, tmp_path):
+        """Все сообщения скомпилированы: декодирование без разбора DBC"""
+        dbc_file = tmp_path / "compiled.dbc"
+        dbc_file.write_text(DBC_CONTENT[:DBC_CONTENT.index("BO_ 300")] + '''
+VAL_ 100 Mode 0 "Off" 1 "On" 2 "Fault" ;
+''')
+        await DBCProcessor(dbc_file, use_artifact=True).initialize()
+        processor = DBCProcessor(dbc_file, use_artifact=True)
+        await processor.initialize()
+
+        result = await processor.process_message(comm_data(100, bytes([1, 2, 3, 1, 0, 0, 0, 0])))
+        assert result.parsed and result.signals["Signal1"] == 1
+        assert str(result.signals["Mode"]) == "On"
+        unknown = await processor.process_message(comm_data(999, bytes(8)))
+        assert unknown.parsed is False
+        assert processor._db is None
+
+    async def test_fallback_database_loaded_on_initialize(self, processor):
+        """Есть мультиплексор: база cantools разобрана при инициализации, не на первом кадре"""
+        assert processor._db is not None
+        result = await processor.process_message(comm_data(400, bytes([1, 4, 0, 0, 0, 0, 0, 0])))
+        assert result.signals == {"Mux": 1, "B": 2.0}
+
+        processor.dbc_file.write_text(DBC_CONTENT.replace("(1,-5)", "(1,-7)"))
+        await processor.reload()
+        assert processor._db is not None
+
+    async def test_reload_from_artifact(self, processor):
+        """Перезагрузка сравнивает отпечатки раскладок из артефакта"""
+        processor.dbc_file.write_text(DBC_CONTENT.replace("(1,-5)", "(1,-7)"))
+        diff = await processor.reload()
+        assert diff.changed == {200} and not diff.added and not diff.removed
+
+        diff = await processor.reload()
+        assert not diff
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from core.batcher import FrameBatcher
+
+
+class TestFrameBatcher:
+    @pytest.fixture
+    def batches(self):
+        return []
+
+    def make_batcher(self, batches, **kwargs):
+        async def handler(batch):
+            batches.append(list(batch))
+
+        return FrameBatcher(handler, **kwargs)
+
+    async def test_flushes_on_max_batch_size(self, batches):
+        """Пачка отдаётся при достижении max_batch_size"""
+        batcher = self.make_batcher(batches, max_batch_size=10, batch_timeout_ms=10_000)
+        await batcher.start()
+
+        for i in range(25):
+            await batcher.submit(i)
+        await asyncio.sleep(0.01)
+
+        assert batches == [list(range(10)), list(range(10, 20))]
+        await batcher.stop()
+        assert batches[-1] == list(range(20, 25))
+
+    async def test_flushes_on_timeout(self, batches):
+        """Неполная пачка отдаётся по таймауту"""
+        batcher = self.make_batcher(batches, max_batch_size=100, batch_timeout_ms=20)
+        await batcher.start()
+
+        await batcher.submit("a")
+        await batcher.submit("b")
+        await asyncio.sleep(0.1)
+
+        assert batches == [["a", "b"]]
+        await batcher.stop()
+
+    async def test_bounded_queue(self, batches):
+        """Очередь ограничена max_queue_size"""
+        batcher = self.make_batcher(batches, max_queue_size=3)
+
+        assert all(batcher.submit_nowait(i) for i in range(3))
+        assert batcher.submit_nowait(3) is False
+        assert batcher.dropped == 1
+        assert batcher.pending == 3
+
+    async def test_stop_drains_queue(self, batches):
+        """При остановке обрабатывается всё поставленное"""
+        batcher = self.make_batcher(batches, max_batch_size=4, batch_timeout_ms=10_000)
+        await batcher.start()
+        for i in range(6):
+            batcher.submit_nowait(i)
+
+        await batcher.stop()
+
+        assert [item for batch in batches for item in batch] == list(range(6))
+
+    async def test_handler_error_does_not_stop_loop(self):
+        """Ошибка обработчика не останавливает цикл"""
+        calls = []
+
+        async def handler(batch):
+            calls.append(batch)
+            if len(calls) == 1:
+                raise ValueError("boom")
+
+        batcher = FrameBatcher(handler, max_batch_size=1, batch_timeout_ms=1)
+        await batcher.start()
+        await batcher.submit(1)
+        await batcher.submit(2)
+        await batcher.stop()
+
+        assert calls == [[1], [2]]
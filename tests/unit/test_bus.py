@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from core.bus import PublishBus, Subscriber
+from core.models import ParsedMessageRecord
+from core.subscriptions import Subscription
+
+
+def create_message(dev_addr=1, can_id=100, value=0):
+    return ParsedMessageRecord(dev_addr, can_id, "TestMessage", {"Signal1": value}, bytes(8), 0)
+
+
+async def drain_open(subscriber):
+    return [message async for message in subscriber]
+
+
+async def drain(subscriber):
+    subscriber.close()
+    return await drain_open(subscriber)
+
+
+class TestSubscriber:
+    async def test_drop_oldest(self):
+        """drop_oldest: в буфере остаются последние capacity сообщений"""
+        subscriber = Subscriber("s", capacity=3, policy="drop_oldest")
+        for i in range(5):
+            await subscriber.put(create_message(value=i))
+
+        assert subscriber.lag == 3
+        assert subscriber.dropped == 2
+        assert [m.signals["Signal1"] for m in await drain(subscriber)] == [2, 3, 4]
+
+    async def test_drop_newest(self):
+        """drop_newest: новые сообщения отбрасываются, пока буфер полон"""
+        subscriber = Subscriber("s", capacity=3, policy="drop_newest")
+        for i in range(5):
+            await subscriber.put(create_message(value=i))
+
+        assert subscriber.dropped == 2
+        assert [m.signals["Signal1"] for m in await drain(subscriber)] == [0, 1, 2]
+
+    async def test_conflate(self):
+        """conflate: одно последнее сообщение на (dev_addr, can_id), порядок ключей сохраняется"""
+        subscriber = Subscriber("s", capacity=10, policy="conflate")
+        for i in range(6):
+            await subscriber.put(create_message(dev_addr=i % 2, value=i))
+        await subscriber.put(create_message(can_id=200, value=9))
+
+        delivered = await drain(subscriber)
+
+        assert [(m.device_address, m.can_message_id) for m in delivered] == [(0, 100), (1, 100), (1, 200)]
+        assert [m.signals["Signal1"] for m in delivered] == [4, 5, 9]
+        assert subscriber.dropped == 4
+
+    async def test_conflate_capacity(self):
+        """Ключей больше ёмкости - вытесняется самый старый ключ"""
+        subscriber = Subscriber("s", capacity=2, policy="conflate")
+        for can_id in (1, 2, 3):
+            await subscriber.put(create_message(can_id=can_id))
+
+        assert [m.can_message_id for m in await drain(subscriber)] == [2, 3]
+
+    async def test_block(self):
+        """block: публикация ждёт, пока подписчик не заберёт сообщение"""
+        subscriber = Subscriber("s", capacity=2, policy="block")
+        await subscriber.put(create_message(value=0))
+        await subscriber.put(create_message(value=1))
+
+        blocked = asyncio.create_task(subscriber.put(create_message(value=2)))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        assert (await subscriber.get()).signals["Signal1"] == 0
+        await asyncio.wait_for(blocked, timeout=1.0)
+        assert subscriber.dropped == 0
+        assert [m.signals["Signal1"] for m in await drain(subscriber)] == [1, 2]
+
+    async def test_close_releases_blocked_producer(self):
+        """Закрытие подписчика не оставляет публикацию висеть"""
+        subscriber = Subscriber("s", capacity=1, policy="block")
+        await subscriber.put(create_message())
+        blocked = asyncio.create_task(subscriber.put(create_message()))
+        await asyncio.sleep(0)
+
+        subscriber.close()
+
+        await asyncio.wait_for(blocked, timeout=1.0)
+        assert subscriber.lag == 1
+
+    def test_unknown_policy(self):
+        with pytest.raises(ValueError):
+            Subscriber("s", policy="lossless")
+
+
+class TestPublishBus:
+    async def test_fan_out_with_filters(self):
+        """Каждый подписчик получает только сообщения своего фильтра"""
+        bus = PublishBus(capacity=100)
+        everything = bus.subscribe("all")
+        device_2 = bus.subscribe("dev", subscription=Subscription(dev_addrs=[2]))
+
+        for dev_addr in range(4):
+            await bus.publish(create_message(dev_addr=dev_addr))
+
+        assert everything.lag == 4
+        assert [m.device_address for m in await drain(device_2)] == [2]
+        assert bus.published == 4
+
+    async def test_slow_subscriber_does_not_grow(self):
+        """Медленный подписчик ограничен ёмкостью, остальные получают всё"""
+        bus = PublishBus(capacity=10, policy="drop_oldest")
+        slow = bus.subscribe("slow")
+        fast = bus.subscribe("fast", capacity=1000)
+
+        for i in range(500):
+            await bus.publish(create_message(value=i))
+
+        assert slow.lag == 10 and slow.dropped == 490
+        assert fast.lag == 500 and fast.dropped == 0
+
+    async def test_unsubscribe_closes(self):
+        """Отписка закрывает подписчика: итерация завершается"""
+        bus = PublishBus()
+        subscriber = bus.subscribe("s")
+        consumer = asyncio.create_task(drain_open(subscriber))
+        await bus.publish(create_message())
+        await asyncio.sleep(0)
+
+        bus.unsubscribe(subscriber)
+
+        assert len(await asyncio.wait_for(consumer, timeout=1.0)) == 1
+        assert bus.subscribers == []
+        await bus.publish(create_message())
+        assert subscriber.lag == 0
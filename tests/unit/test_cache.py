@@ -0,0 +1,61 @@
+import pytest
+
+from core.cache import DecodeCache
+
+
+class TestDecodeCache:
+    def test_miss_then_hit(self):
+        """Промах, затем попадание"""
+        cache = DecodeCache(capacity=10)
+        assert cache.get(100, b"\x01" * 8) is None
+
+        cache.put(100, b"\x01" * 8, {"Signal1": 1})
+        assert cache.get(100, b"\x01" * 8) == {"Signal1": 1}
+        assert cache.stats == {"size": 1, "hits": 1, "misses": 1, "evictions": 0}
+
+    def test_key_includes_can_id(self):
+        """Одинаковые данные разных CAN ID не пересекаются"""
+        cache = DecodeCache(capacity=10)
+        cache.put(100, b"\x00" * 8, {"A": 1})
+        assert cache.get(200, b"\x00" * 8) is None
+
+    def test_results_are_immutable(self):
+        """Результаты нельзя изменить, исходный dict не разделяется"""
+        cache = DecodeCache(capacity=10)
+        signals = {"Signal1": 1}
+        frozen = cache.put(100, b"\x00" * 8, signals)
+        signals["Signal1"] = 2
+
+        with pytest.raises(TypeError):
+            frozen["Signal1"] = 3
+        assert cache.get(100, b"\x00" * 8)["Signal1"] == 1
+
+    def test_lru_eviction(self):
+        """Вытесняется давно не использованная запись"""
+        cache = DecodeCache(capacity=2)
+        cache.put(1, b"a", {"x": 1})
+        cache.put(2, b"b", {"x": 2})
+        cache.get(1, b"a")
+        cache.put(3, b"c", {"x": 3})
+
+        assert cache.get(2, b"b") is None
+        assert cache.get(1, b"a") is not None
+        assert cache.evictions == 1
+        assert len(cache) == 2
+
+    def test_disabled(self):
+        """Отключённый кэш ничего не хранит и не считает"""
+        cache = DecodeCache(capacity=10, enabled=False)
+        cache.put(1, b"a", {"x": 1})
+        assert cache.get(1, b"a") is None
+        assert cache.stats == {"size": 0, "hits": 0, "misses": 0, "evictions": 0}
+
+    def test_invalidate_by_can_id(self):
+        """Сброс записей выбранных CAN ID"""
+        cache = DecodeCache(capacity=10)
+        cache.put(1, b"a", {"x": 1})
+        cache.put(2, b"b", {"x": 2})
+        cache.invalidate({1})
+
+        assert cache.get(1, b"a") is None
+        assert cache.get(2, b"b") is not None
@@ -0,0 +1,52 @@
+import asyncio
+
+from core.conflation import Conflator
+from core.models import ParsedMessageRecord
+
+
+def create_message(dev_addr=1, can_id=100, value=0):
+    return ParsedMessageRecord(dev_addr, can_id, "TestMessage", {"Signal1": value}, bytes(8), 0)
+
+
+class TestConflator:
+    async def test_latest_value_per_key(self):
+        """Выгрузка: одно последнее сообщение на ключ, в порядке первого появления"""
+        sent = []
+
+        async def sink(message):
+            sent.append(message)
+
+        conflator = Conflator(sink)
+        for i in range(1000):
+            conflator.update(create_message(dev_addr=i % 4, value=i))
+        conflator.update(create_message(can_id=200, value=-1))
+
+        assert conflator.pending == 5
+        assert await conflator.flush() == 5
+        assert [(m.device_address, m.can_message_id) for m in sent] == [
+            (0, 100), (1, 100), (2, 100), (3, 100), (1, 200)
+        ]
+        assert [m.signals["Signal1"] for m in sent] == [996, 997, 998, 999, -1]
+        assert conflator.conflated == 996
+        assert conflator.pending == 0
+
+    async def test_periodic_flush(self):
+        """Объём выдачи ограничен числом ключей за интервал, stop выгружает остаток"""
+        sent = []
+
+        async def sink(message):
+            sent.append(message)
+
+        conflator = Conflator(sink, interval_ms=10)
+        await conflator.start()
+        for i in range(2000):
+            conflator.update(create_message(dev_addr=i % 3, value=i))
+            if i % 100 == 0:
+                await asyncio.sleep(0)
+        await asyncio.sleep(0.03)
+        conflator.update(create_message(dev_addr=7))
+        await conflator.stop()
+
+        assert len(sent) <= 3 * 4 + 1
+        assert sent[-1].device_address == 7
+        assert conflator.pending == 0
@@ -66,3 +66,53 @@ class TestCRC16ARC:
         crc1 = CRC16ARC.calculate(data)
         crc2 = CRC16ARC.calculate(data)
         assert crc1 == crc2
+
+    def test_table_matches_bitwise(self):
+        """Табличный и побитовый расчёт совпадают"""
+        for data in [b"", b"123456789", b"\xFF" * 8, bytes(range(256))]:
+            expected = CRC16ARC.calculate_bitwise(data)
+            assert CRC16ARC.calculate_table(data) == expected
+            assert CRC16ARC.calculate(data) == expected
+
+
+class TestCRC16ARCBulk:
+    def make_buffer(self, count=100):
+        frames = []
+        for i in range(count):
+            body = bytes([(i + j) % 256 for j in range(10)])
+            frames.append(body + CRC16ARC.calculate(body).to_bytes(2, "little"))
+        return bytearray(b"".join(frames))
+
+    def test_calculate_many_all_valid(self):
+        """Все кадры с корректным CRC"""
+        mask = CRC16ARC.calculate_many(bytes(self.make_buffer()))
+        assert mask.dtype == bool
+        assert mask.shape == (100,)
+        assert mask.all()
+
+    def test_calculate_many_detects_corruption(self):
+        """Испорченные кадры помечаются False"""
+        buffer = self.make_buffer()
+        buffer[5 * 12 + 3] ^= 0xFF
+        buffer[7 * 12 + 11] ^= 0x01
+
+        mask = CRC16ARC.calculate_many(memoryview(buffer))
+        assert not mask[5]
+        assert not mask[7]
+        assert mask.sum() == 98
+
+    def test_calculate_many_ignores_partial_tail(self):
+        """Неполный хвост буфера не учитывается"""
+        buffer = bytes(self.make_buffer(3)) + b"\x01\x02\x03"
+        assert CRC16ARC.calculate_many(buffer).shape == (3,)
+
+    def test_calculate_many_custom_layout(self):
+        """Произвольный шаг и длина кадра"""
+        body = b"123456789"
+        frame = body + CRC16ARC.calculate(body).to_bytes(2, "little") + b"\x00"
+        mask = CRC16ARC.calculate_many(frame * 4, stride=12, length=9)
+        assert mask.all()
+
+    def test_calculate_many_invalid_stride(self):
+        with pytest.raises(ValueError):
+            CRC16ARC.calculate_many(bytes(24), stride=10, length=10)
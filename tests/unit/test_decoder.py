@@ -0,0 +1,199 @@
+import random
+
+import cantools
+import numpy as np
+import pytest
+
+from core.decoder import CompiledMessage, compile_message
+
+
+DBC_CONTENT = '''VERSION ""
+
+BO_ 100 TestMessage: 8 Vector__XXX
+ SG_ Signal1 : 0|8@1+ (1,0) [0|255] "" Vector__XXX
+ SG_ Signal2 : 8|16@1+ (0.1,0) [0|6553.5] "V" Vector__XXX
+ SG_ Signal3 : 24|12@1- (1,-10) [-2058|2037] "" Vector__XXX
+ SG_ Signal4 : 36|28@1+ (2,5) [0|0] "" Vector__XXX
+
+BO_ 200 MotorolaMessage: 8 Vector__XXX
+ SG_ Speed : 7|16@0+ (0.01,0) [0|655.35] "km/h" Vector__XXX
+ SG_ Torque : 23|12@0- (0.5,-100) [0|0] "Nm" Vector__XXX
+ SG_ Flags : 27|3@0+ (1,0) [0|7] "" Vector__XXX
+ SG_ Mixed : 40|20@1- (1,0) [0|0] "" Vector__XXX
+
+BO_ 300 HighFreqMessage: 8 Vector__XXX
+ SG_ Data : 0|64@1+ (1,0) [0|18446744073709551615] "" Vector__XXX
+
+BO_ 400 ChoiceMessage: 4 Vector__XXX
+ SG_ State : 0|4@1+ (1,0) [0|15] "" Vector__XXX
+ SG_ Mode : 4|4@1+ (2,1) [0|31] "" Vector__XXX
+ SG_ Level : 15|8@0- (1,0) [0|0] "" Vector__XXX
+
+BO_ 500 MuxMessage: 8 Vector__XXX
+ SG_ Mux M : 0|8@1+ (1,0) [0|255] "" Vector__XXX
+ SG_ A m0 : 8|16@1+ (1,0) [0|65535] "" Vector__XXX
+ SG_ B m1 : 8|16@1+ (0.5,0) [0|0] "" Vector__XXX
+
+BO_ 600 FloatMessage: 8 Vector__XXX
+ SG_ Value : 0|32@1- (1,0) [0|0] "" Vector__XXX
+
+BO_ 700 WideMessage: 8 Vector__XXX
+ SG_ Wide64 : 0|64@1+ (3,7) [0|0] "" Vector__XXX
+
+BO_ 800 Wide63Message: 8 Vector__XXX
+ SG_ Wide63 : 0|63@1+ (2,-1) [0|0] "" Vector__XXX
+ SG_ Bit : 63|1@1+ (1,0) [0|1] "" Vector__XXX
+
+BO_ 900 ScaledChoiceMessage: 8 Vector__XXX
+ SG_ Current : 0|32@1+ (0.001,-1000) [0|0] "A" Vector__XXX
+ SG_ Raw : 32|32@1+ (1,0) [0|0] "" Vector__XXX
+
+VAL_ 400 State 0 "Off" 1 "On" 2 "Error" ;
+VAL_ 400 Mode 3 "Eco" ;
+VAL_ 900 Current 4294967295 "SNA" 4294967294 "Error" 0 "Zero" ;
+
+SIG_VALTYPE_ 600 Value : 1;
+'''
+
+
+@pytest.fixture
+def dbc_content():
+    return DBC_CONTENT
+
+
+@pytest.fixture
+def db(dbc_file):
+    return cantools.database.load_file(str(dbc_file))
+
+
+class TestCompiledDecoder:
+    @pytest.mark.parametrize("frame_id", [100, 200, 300, 400, 700, 800, 900])
+    def test_matches_cantools_random_payloads(self, db, frame_id):
+        """Дифференциальный тест: совпадение с cantools на случайных данных"""
+        message = db.get_message_by_frame_id(frame_id)
+        decoder = compile_message(message)
+        assert isinstance(decoder, CompiledMessage)
+
+        rng = random.Random(frame_id)
+        payloads = [bytes(8), b"\xFF" * 8] + [rng.randbytes(8) for _ in range(2000)]
+
+        for payload in payloads:
+            data = payload[:message.length]
+            expected = message.decode(data)
+            actual = decoder.decode(data)
+            assert actual == expected, payload.hex()
+            assert list(actual) == list(expected)
+            assert [type(v) for v in actual.values()] == [type(v) for v in expected.values()]
+
+    def test_excess_data_is_trimmed(self, db):
+        """Лишние байты отбрасываются, как в cantools"""
+        message = db.get_message_by_frame_id(400)
+        decoder = compile_message(message)
+        data = bytes([0x21, 0x00, 0x80, 0x00, 0xAA, 0xBB, 0xCC, 0xDD])
+        assert decoder.decode(data) == message.decode(data)
+
+    def test_short_data_raises_like_cantools(self, db):
+        """Укороченные данные - та же ошибка, что и у cantools"""
+        decoder = compile_message(db.get_message_by_frame_id(100))
+        with pytest.raises(cantools.database.DecodeError):
+            decoder.decode(b"\x01\x02")
+
+    def test_multiplexed_falls_back(self, db):
+        """Мультиплексированные сообщения не компилируются"""
+        assert compile_message(db.get_message_by_frame_id(500)) is None
+
+    def test_float_signal_falls_back(self, db):
+        """Float сигналы не компилируются"""
+        assert compile_message(db.get_message_by_frame_id(600)) is None
+
+
+class TestColumnarDecoder:
+    @pytest.mark.parametrize("frame_id", [100, 200, 300, 400, 700, 800, 900])
+    def test_columns_match_row_decode(self, db, frame_id):
+        """Колоночный результат совпадает с построчным (без таблиц значений)"""
+        message = db.get_message_by_frame_id(frame_id)
+        decoder = compile_message(message)
+        rng = np.random.default_rng(frame_id)
+        payloads = rng.integers(0, 256, size=(500, 8), dtype=np.uint8)
+
+        columns = decoder.decode_columns(payloads)
+
+        assert list(columns) == [s.name for s in message.signals]
+        for i, row in enumerate(payloads):
+            expected = message.decode(row.tobytes(), decode_choices=False)
+            for name, value in expected.items():
+                assert columns[name][i] == value, (name, row.tobytes().hex())
+
+    def test_column_dtypes(self, db):
+        """Целые сигналы (в т.ч. с целым масштабом) остаются целыми, дробные - float64"""
+        columns = compile_message(db.get_message_by_frame_id(100)).decode_columns(
+            np.zeros((3, 8), dtype=np.uint8)
+        )
+        assert columns["Signal1"].dtype == np.uint64
+        assert columns["Signal2"].dtype == np.float64
+        assert columns["Signal3"].dtype == np.int64
+        assert columns["Signal3"].tolist() == [-10, -10, -10]
+
+    def test_wide_integer_columns_exact(self, db):
+        """63/64-битные беззнаковые с целым масштабом - без переполнения int64"""
+        payloads = np.full((2, 8), 0xFF, dtype=np.uint8)
+        payloads[1, :] = 0
+        for frame_id in (700, 800):
+            message = db.get_message_by_frame_id(frame_id)
+            columns = compile_message(message).decode_columns(payloads)
+            for i, row in enumerate(payloads):
+                expected = message.decode(row.tobytes())
+                assert {name: columns[name][i] for name in expected} == expected
+
+    def test_choice_found_by_raw_value(self, db):
+        """Метка VAL_ ищется по сырому значению, а не по обращению масштаба"""
+        decoder = compile_message(db.get_message_by_frame_id(900))
+        payloads = np.zeros((2, 8), dtype=np.uint8)
+        payloads[0, :4] = 0xFF
+        raw = decoder.raw_columns(payloads)
+
+        rows = decoder.rows_from_columns(decoder.scale_columns(raw), raw)
+        assert [row["Current"] for row in rows] == ["SNA", "Zero"]
+
+    def test_decode_projection(self, db):
+        """Проекция декодирует только выбранные сигналы в порядке сообщения"""
+        message = db.get_message_by_frame_id(200)
+        decoder = compile_message(message)
+        data = bytes(range(10, 18))
+
+        projected = decoder.decode(data, {"Flags", "Speed", "Missing"})
+
+        full = message.decode(data)
+        assert list(projected) == ["Speed", "Flags"]
+        assert projected == {"Speed": full["Speed"], "Flags": full["Flags"]}
+        assert decoder.decode(data, set()) == {}
+
+    @pytest.mark.parametrize("frame_id", [100, 200, 300, 400, 700, 800, 900])
+    def test_row_from_columns_matches_rows(self, db, frame_id):
+        """Одна строка колонок совпадает с rows_from_columns, в том числе с проекцией"""
+        decoder = compile_message(db.get_message_by_frame_id(frame_id))
+        rng = np.random.default_rng(frame_id + 2)
+        raw = decoder.raw_columns(rng.integers(0, 256, size=(50, 8), dtype=np.uint8))
+        columns = decoder.scale_columns(raw)
+        first = decoder.signals[0].name
+
+        for i, row in enumerate(decoder.rows_from_columns(columns, raw)):
+            assert decoder.row_from_columns(columns, raw, i) == row
+            assert decoder.row_from_columns(columns, raw, i, {first}) == {first: row[first]}
+
+    @pytest.mark.parametrize("frame_id", [100, 200, 300, 400, 700, 800, 900])
+    def test_rows_from_columns_match_decode(self, db, frame_id):
+        """Строки из колонок совпадают с decode(), включая таблицы значений и типы"""
+        message = db.get_message_by_frame_id(frame_id)
+        decoder = compile_message(message)
+        rng = np.random.default_rng(frame_id + 1)
+        payloads = rng.integers(0, 256, size=(300, 8), dtype=np.uint8)
+
+        raw = decoder.raw_columns(payloads)
+        rows = decoder.rows_from_columns(decoder.scale_columns(raw), decoder.choice_columns(raw))
+
+        for payload, row in zip(payloads, rows):
+            expected = message.decode(payload.tobytes())
+            assert row == expected
+            assert [type(v) for v in row.values()] == [type(v) for v in expected.values()]
+
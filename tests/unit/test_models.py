@@ -1,7 +1,14 @@
 import pytest
 from datetime import datetime
 from pydantic import ValidationError
-from core.models import CommAddr, CommData, ParsedMessage
+from core.models import (
+    CommAddr,
+    CommAddrRecord,
+    CommData,
+    CommDataRecord,
+    ParsedMessage,
+    ParsedMessageRecord,
+)
 
 
 class TestCommAddr:
@@ -141,3 +148,70 @@ class TestParsedMessage:
             parsed=True
         )
         assert broadcast_msg.packet_type == "broadcast"
+
+
+class TestFrameRecords:
+    def test_addr_record_fields(self):
+        """Тест полей CommAddrRecord"""
+        addr = CommAddrRecord(0, 100, 0)
+        assert addr.dev_addr == 0
+        assert addr.msg_id == 100
+        assert addr.is_broadcast is True
+        assert CommAddrRecord(5, 100, 0).is_broadcast is False
+
+    def test_records_use_slots(self):
+        """Записи не имеют __dict__"""
+        record = CommDataRecord(CommAddrRecord(1, 100, 0), b"\x00" * 8, 0x1234)
+        assert not hasattr(record, "__dict__")
+        with pytest.raises(AttributeError):
+            record.extra = 1
+
+    def test_data_record_timestamp(self):
+        """timestamp заполняется автоматически"""
+        record = CommDataRecord(CommAddrRecord(1, 100, 0), b"\x00" * 8, 0)
+        assert record.timestamp > 0
+        assert CommDataRecord(CommAddrRecord(1, 100, 0), b"\x00" * 8, 0, 1.5).timestamp == 1.5
+
+    def test_to_model_roundtrip(self):
+        """Преобразование в pydantic модель на границе API"""
+        record = CommDataRecord(CommAddrRecord(3, 200, 1), bytes(range(8)), 0xBEEF)
+        model = record.to_model()
+
+        assert isinstance(model, CommData)
+        assert model.frame_id == CommAddr(dev_addr=3, msg_id=200, reserved=1)
+        assert model.data == bytes(range(8))
+        assert model.crc16 == 0xBEEF
+        assert isinstance(model.timestamp, datetime)
+
+
+class TestParsedMessageRecord:
+    def create_record(self, **kwargs):
+        defaults = dict(
+            device_address=0, can_message_id=100, message_name="TestMessage",
+            signals={"Signal1": 1}, data=bytes(range(1, 9)), crc=0xBEEF, source_topic="t",
+        )
+        defaults.update(kwargs)
+        return ParsedMessageRecord(**defaults)
+
+    def test_lazy_raw_payload(self):
+        """hex строка формируется только при обращении и один раз"""
+        record = self.create_record()
+        assert record._raw_payload is None
+
+        assert record.raw_payload == "0102030405060708"
+        assert record.raw_payload is record.raw_payload
+        assert record.crc16 == "0xBEEF"
+        assert record.packet_type == "broadcast"
+        assert self.create_record(device_address=5).packet_type == "unicast"
+
+    def test_matches_parsed_message(self):
+        """model_dump совпадает с pydantic моделью"""
+        record = self.create_record(parsed=False, crc_valid=False, error="Unknown CAN ID: 100")
+        model = record.to_model()
+
+        assert isinstance(model, ParsedMessage)
+        assert model.model_dump() == record.model_dump()
+        assert model.raw_payload == "0102030405060708"
+
+    def test_uses_slots(self):
+        assert not hasattr(self.create_record(), "__dict__")
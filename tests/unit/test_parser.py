@@ -103,3 +103,85 @@ class TestFrameParserExtended:
         frame = bytes(12)  # Создаем кадр с неправильным CRC
         frame_with_bad_crc = frame[:-2] + b"\xFF\xFF"
         await parser.parse(frame_with_bad_crc)
+
+
+class TestFrameParserBatch:
+    @pytest.fixture
+    async def parser(self):
+        parser = FrameParser()
+        yield parser
+        await parser.close()
+
+    def create_valid_frame(self, dev_addr=1, msg_id=100, payload=None):
+        if payload is None:
+            payload = bytes([0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08])
+
+        comm_addr = dev_addr | (msg_id << 5)
+        crc_data = comm_addr.to_bytes(2, 'little') + payload
+        crc = CRC16ARC.calculate(crc_data)
+
+        return comm_addr.to_bytes(2, 'little') + payload + crc.to_bytes(2, 'little')
+
+    async def test_parse_batch_matches_single(self, parser):
+        """Пакетный парсинг совпадает с покадровым"""
+        frames = [
+            self.create_valid_frame(dev_addr=i % 32, msg_id=(i * 37) % 1024,
+                                    payload=bytes([(i + j) % 256 for j in range(8)]))
+            for i in range(200)
+        ]
+        batch = await parser.parse_batch(b"".join(frames))
+
+        assert len(batch) == 200
+        assert not batch.rejected.any()
+        for i, frame in enumerate(frames):
+            single = await parser.parse(frame)
+            assert batch.dev_addr[i] == single.frame_id.dev_addr
+            assert batch.msg_id[i] == single.frame_id.msg_id
+            assert batch.reserved[i] == single.frame_id.reserved
+            assert batch.data[i].tobytes() == single.data
+            assert batch.crc16[i] == single.crc16
+
+    async def test_parse_batch_rejection_mask(self, parser):
+        """Кадры с плохим CRC помечаются в маске"""
+        good = self.create_valid_frame()
+        bad = good[:-2] + b"\xFF\xFF"
+        batch = await parser.parse_batch(memoryview(good + bad + good))
+
+        assert batch.rejected.tolist() == [False, True, False]
+        assert batch.accepted.sum() == 2
+
+    async def test_parse_batch_rejects_out_of_range_msg_id(self, parser):
+        """msg_id > 1023 отбрасывается"""
+        batch = await parser.parse_batch(self.create_valid_frame(msg_id=1500))
+        assert batch.rejected.tolist() == [True]
+
+    async def test_parse_batch_partial_tail(self, parser):
+        """Неполный хвост игнорируется"""
+        batch = await parser.parse_batch(self.create_valid_frame() + b"\x00\x01")
+        assert len(batch) == 1
+
+    async def test_parse_batch_empty(self, parser):
+        batch = await parser.parse_batch(b"")
+        assert len(batch) == 0
+
+    async def test_parse_at_offset(self, parser):
+        """Кадр разбирается по смещению прямо в пакетном буфере"""
+        frames = [self.create_valid_frame(dev_addr=i, msg_id=100 + i) for i in range(3)]
+        buffer = memoryview(b"".join(frames))
+
+        for i in range(3):
+            record = await parser.parse(buffer, offset=i * 12)
+            assert record.frame_id.dev_addr == i
+            assert record.frame_id.msg_id == 100 + i
+            assert record.data == frames[i][2:10]
+            assert type(record.data) is bytes
+
+        assert await parser.parse(buffer, offset=30) is None
+        assert await parser.parse(buffer, offset=-1) is None
+
+    async def test_parse_buffer_types(self, parser):
+        """bytes, memoryview и bytearray дают одинаковый результат"""
+        frame = self.create_valid_frame()
+        records = [await parser.parse(buf) for buf in (frame, memoryview(frame), bytearray(frame))]
+
+        assert all(r.data == frame[2:10] and r.crc16 == records[0].crc16 for r in records)
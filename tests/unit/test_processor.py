@@ -5,6 +5,7 @@ from pathlib import Path
 from core.processor import DBCProcessor
 from core.models import CommAddr, CommData, ParsedMessage
 import cantools
+import numpy as np
 
 
 class TestDBCProcessorExtended:
@@ -123,4 +124,186 @@ BO_ 200 BroadcastMessage: 8 Vector__XXX
             result = await processor.process_message(comm_data, "pattern_test")
             
             assert result is not None
-            assert result.raw_payload == data_pattern.hex().upper()
\ No newline at end of file
+            assert result.raw_payload == data_pattern.hex().upper()
+
+    async def test_compiled_decoders_match_cantools(self, processor):
+        """Скомпилированные декодеры дают тот же результат, что и cantools"""
+        assert processor._decoders[100] is not None
+        assert processor._decoders[200] is not None
+
+        data = bytes([0x10, 0x34, 0x12, 0x00, 0x00, 0x00, 0x00, 0x00])
+        result = await processor.process_message(self.create_comm_data(msg_id=100, data=data), "t")
+
+        assert result.signals == processor.db.get_message_by_frame_id(100).decode(data)
+        assert result.signals["Signal2"] == pytest.approx(0x1234 * 0.1)
+
+    async def test_decode_batch_groups_by_can_id(self, processor):
+        """Колоночное декодирование пакета с группировкой по CAN ID"""
+        msg_ids = np.array([100, 200, 100, 999, 100], dtype=np.uint16)
+        payloads = np.arange(40, dtype=np.uint8).reshape(5, 8)
+
+        result = await processor.decode_batch(msg_ids, payloads)
+
+        assert set(result) == {100, 200}
+        columns = result[100]
+        assert columns.message_name == "TestMessage"
+        assert columns.rows.tolist() == [0, 2, 4]
+        for position, row in enumerate(columns.rows):
+            expected = processor.db.get_message_by_frame_id(100).decode(payloads[row].tobytes())
+            assert columns.signals["Signal1"][position] == expected["Signal1"]
+            assert columns.signals["Signal2"][position] == pytest.approx(expected["Signal2"])
+        assert result[200].signals["Status"].tolist() == [8]
+
+    async def test_decode_batch_empty(self, processor):
+        result = await processor.decode_batch(np.array([], dtype=np.uint16), np.zeros((0, 8), np.uint8))
+        assert result == {}
+
+    async def test_decode_cache_per_processor(self, mock_dbc_file, processor):
+        """Кэш декодирования принадлежит процессору и считает попадания"""
+        comm_data = self.create_comm_data(msg_id=100)
+        result1 = await processor.process_message(comm_data, "t")
+        result2 = await processor.process_message(comm_data, "t")
+
+        assert processor.cache_stats["hits"] == 1
+        assert processor.cache_stats["misses"] == 1
+        assert result1.signals == result2.signals
+        result1.signals["Signal1"] = -1
+        assert result2.signals["Signal1"] != -1
+
+        other = DBCProcessor(mock_dbc_file)
+        await other.initialize()
+        assert other.cache_stats["size"] == 0
+        await other.close()
+
+    async def test_decode_cache_disabled(self, mock_dbc_file):
+        """При отключённом кэше декодирование работает без него"""
+        processor = DBCProcessor(mock_dbc_file, cache_enabled=False)
+        await processor.initialize()
+        comm_data = self.create_comm_data(msg_id=100)
+
+        for _ in range(3):
+            result = await processor.process_message(comm_data, "t")
+            assert result.parsed is True
+        assert processor.cache_stats["hits"] == 0
+        await processor.close()
+
+    async def test_batch_records_decode_lazily(self, processor):
+        """Записи пакета ссылаются на колонки, словарь сигналов - при обращении"""
+        from core.parser import FrameParser
+        from utils.crc import CRC16ARC
+
+        def frame(msg_id, payload):
+            head = (1 | (msg_id << 5)).to_bytes(2, "little") + payload
+            return head + CRC16ARC.calculate(head).to_bytes(2, "little")
+
+        payloads = [bytes([i, i + 1, i + 2, 0, 0, 0, 0, 0]) for i in range(4)]
+        batch = await FrameParser().parse_batch(b"".join(frame(100, p) for p in payloads))
+        records = processor.build_messages(batch, processor.decode_frames(batch), ["t"] * 4)
+
+        message = processor.db.get_message_by_frame_id(100)
+        assert not any(r.is_decoded for r in records)
+        assert records[1].project({"Signal1"}) == {"Signal1": 1}
+        assert not records[1].is_decoded
+        for record, payload in zip(records, payloads):
+            assert record.signals == message.decode(payload)
+            assert record.is_decoded
+
+    async def test_single_frame_lazy_without_cache(self, mock_dbc_file):
+        """Без кэша покадровый путь тоже откладывает декодирование"""
+        processor = DBCProcessor(mock_dbc_file, cache_enabled=False)
+        await processor.initialize()
+        comm_data = self.create_comm_data(msg_id=100)
+
+        result = await processor.process_message(comm_data, "t")
+
+        assert not result.is_decoded
+        assert result.project({"Signal2"}) == {"Signal2": pytest.approx(0x0302 * 0.1)}
+        assert result.signals == processor.db.get_message_by_frame_id(100).decode(comm_data.data)
+        await processor.close()
+
+
+class TestDBCReload:
+    """Горячая перезагрузка DBC: diff, подмена декодеров, сброс кэша"""
+
+    BASE = '''VERSION ""
+
+BO_ 100 TestMessage: 8 Vector__XXX
+ SG_ Signal1 : 0|8@1+ (1,0) [0|255] "" Vector__XXX
+ SG_ Signal2 : 8|16@1+ (0.1,0) [0|6553.5] "V" Vector__XXX
+
+BO_ 200 BroadcastMessage: 8 Vector__XXX
+ SG_ Status : 0|8@1+ (1,0) [0|255] "" Vector__XXX
+
+BO_ 300 Other: 8 Vector__XXX
+ SG_ Counter : 0|8@1+ (1,0) [0|255] "" Vector__XXX
+'''
+
+    @pytest.fixture
+    async def processor(self, tmp_path):
+        dbc_file = tmp_path / "reload.dbc"
+        dbc_file.write_text(self.BASE)
+        processor = DBCProcessor(dbc_file)
+        await processor.initialize()
+        yield processor
+        await processor.close()
+
+    def comm_data(self, msg_id):
+        comm_addr = CommAddr(dev_addr=1, msg_id=msg_id, reserved=0)
+        return CommData(frame_id=comm_addr, data=bytes([1, 2, 3, 4, 5, 6, 7, 8]), crc16=0)
+
+    async def test_reload_diff_and_swap(self, processor):
+        """Изменённый масштаб, новое и удалённое сообщения; кэш сброшен только для изменённых"""
+        await processor.process_message(self.comm_data(100))
+        await processor.process_message(self.comm_data(300))
+        processor.dbc_file.write_text(
+            self.BASE.replace("(0.1,0)", "(0.5,0)").replace("BO_ 200 BroadcastMessage", "BO_ 400 NewMessage")
+        )
+
+        diff = await processor.reload()
+
+        assert diff.added == {400} and diff.removed == {200} and diff.changed == {100}
+        assert diff.version == 2 and processor.schema.version == 2
+        assert 400 in processor.schema.messages and 200 not in processor.schema.messages
+        assert processor._decode_cache.stats["size"] == 1  # осталась запись CAN ID 300
+
+        result = await processor.process_message(self.comm_data(100))
+        assert result.signals["Signal2"] == pytest.approx(0x0302 * 0.5)
+        unknown = await processor.process_message(self.comm_data(200))
+        assert unknown.parsed is False
+
+    async def test_reload_without_changes(self, processor):
+        """Без изменений сообщений версия словаря не меняется"""
+        schema = processor.schema
+        processor.dbc_file.write_text(self.BASE + "\nCM_ \"comment\";\n")
+
+        diff = await processor.reload()
+
+        assert not diff
+        assert processor.schema is schema
+
+    async def test_reload_failure_keeps_database(self, processor, tmp_path):
+        """Ошибка разбора - прежняя база продолжает работать"""
+        broken = tmp_path / "broken.dbc"
+        broken.write_text("BO_ 100 Broken: x\n")
+        db = processor.db
+
+        with pytest.raises(Exception):
+            await processor.reload(broken)
+
+        assert processor.db is db
+        assert processor.dbc_file != broken
+        assert (await processor.process_message(self.comm_data(100))).parsed
+
+    async def test_batch_records_keep_old_decoder(self, processor):
+        """Записи пакета, собранные до перезагрузки, декодируются старым декодером"""
+        from core.parser import FrameParser
+        from utils.crc import CRC16ARC
+
+        head = (1 | (100 << 5)).to_bytes(2, "little") + bytes([1, 2, 3, 0, 0, 0, 0, 0])
+        batch = await FrameParser().parse_batch(head + CRC16ARC.calculate(head).to_bytes(2, "little"))
+        records = processor.build_messages(batch, processor.decode_frames(batch), ["t"])
+
+        processor.dbc_file.write_text(self.BASE.replace("(0.1,0)", "(0.5,0)"))
+        await processor.reload()
+
+        assert records[0].signals["Signal2"] == pytest.approx(0x0302 * 0.1)
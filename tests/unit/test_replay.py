@@ -0,0 +1,116 @@
+import pytest
+
+from core.replay import Capture, decode_handler, detect_format, jsonl_sink, main, replay
+
+ADDR = 1 | 100 << 5
+
+
+def write_candump(path, count, step=0.001):
+    lines = [
+        f"({1700000000 + i * step:.6f}) vcan0 {ADDR:08X}#{i % 256:02X}00000000000000"
+        for i in range(count)
+    ]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+class TestCapture:
+    def test_detect_format(self, tmp_path):
+        """Формат по расширению файла"""
+        assert detect_format(tmp_path / "a.log") == "candump"
+        assert detect_format(tmp_path / "a.BLF") == "blf"
+        assert detect_format(tmp_path / "a.asc") == "asc"
+        assert detect_format(tmp_path / "a.bin") == "raw"
+
+    def test_raw_chunks(self, tmp_path, can_frame):
+        """Сырая запись: пакеты по chunk_frames, неполный хвост файла отбрасывается"""
+        data = b"".join(can_frame(value=i) for i in range(10))
+        path = tmp_path / "capture.bin"
+        path.write_bytes(data + b"\x01\x02")
+
+        chunks = list(Capture(path).chunks(4))
+        assert [len(chunk.frames) // 12 for chunk in chunks] == [4, 4, 2]
+        assert b"".join(bytes(chunk.frames) for chunk in chunks) == data
+        assert all(chunk.timestamps is None for chunk in chunks)
+
+    def test_candump_converted(self, tmp_path, can_frame):
+        """Журнал candump переводится в 12-байтные кадры с CRC; RTR пропускается"""
+        path = write_candump(tmp_path / "capture.log", 3)
+        with path.open("a") as f:
+            f.write("(1700000001.000000) vcan0 123#R\n")
+
+        capture = Capture(path)
+        (chunk,) = list(capture.chunks())
+        assert chunk.frames == b"".join(can_frame(value=i) for i in range(3))
+        assert chunk.timestamps.tolist() == pytest.approx([1700000000, 1700000000.001, 1700000000.002])
+        assert capture.skipped == 1
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError):
+            Capture(tmp_path / "a.bin", "pcap")
+
+
+class TestReplay:
+    async def test_max_speed(self, tmp_path, processor, can_frame):
+        """Максимальная скорость: все кадры декодированы, отчёт заполнен"""
+        path = tmp_path / "capture.bin"
+        path.write_bytes(b"".join(can_frame(value=i % 256) for i in range(1000)))
+        batches = []
+
+        report = await replay(
+            Capture(path), decode_handler(processor), chunk_frames=256, sink=batches.append
+        )
+
+        assert report.frames == report.decoded == 1000
+        assert report.errors == 0
+        assert report.frames_per_second > 0
+        assert 0 < report.latency_p50_ms <= report.latency_p99_ms
+        assert [m.signals["Signal1"] for batch in batches for m in batch][:3] == [0, 1, 2]
+
+    async def test_recorded_timing(self, tmp_path, processor):
+        """По записанному времени с ускорением: 0.2 с записи при speed=2 - около 0.1 с"""
+        path = write_candump(tmp_path / "capture.log", 201)
+
+        report = await replay(Capture(path), decode_handler(processor), speed=2.0)
+
+        assert report.frames == 201
+        assert 0.09 <= report.duration_s < 0.5
+
+    async def test_raw_has_no_timing(self, tmp_path, processor, can_frame):
+        path = tmp_path / "capture.bin"
+        path.write_bytes(can_frame())
+        with pytest.raises(ValueError):
+            await replay(Capture(path), decode_handler(processor), speed=1.0)
+
+    def test_backfill_cli(self, tmp_path, dbc_file, capsys):
+        """Пакетное декодирование записи в JSON Lines"""
+        capture = write_candump(tmp_path / "capture.log", 5)
+        output = tmp_path / "decoded.jsonl"
+
+        assert main([str(capture), "--dbc", str(dbc_file), "--output", str(output)]) == 0
+
+        lines = output.read_text().splitlines()
+        assert len(lines) == 5
+        assert '"Signal1":4' in lines[-1]
+        assert '"frames":5' in capsys.readouterr().out
+
+    def test_backfill_cli_choices(self, tmp_path, dbc_file, dbc_content):
+        """Сигналы с таблицей VAL_ выгружаются меткой"""
+        dbc_file.write_text(dbc_content + '''
+VAL_ 100 Signal1 0 "Off" 1 "On" ;
+''')
+        capture = write_candump(tmp_path / "capture.log", 3)
+        output = tmp_path / "decoded.jsonl"
+
+        assert main([str(capture), "--dbc", str(dbc_file), "--output", str(output)]) == 0
+
+        lines = output.read_text().splitlines()
+        assert '"Signal1":"Off"' in lines[0]
+        assert '"Signal1":"On"' in lines[1]
+        assert '"Signal1":2' in lines[2]
+
+    def test_jsonl_sink_skips_rejected(self, tmp_path):
+        path = tmp_path / "out.jsonl"
+        with path.open("wb") as f:
+            jsonl_sink(f)([None])
+        assert path.read_bytes() == b""
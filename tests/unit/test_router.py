@@ -0,0 +1,119 @@
+# tests/unit/test_router.py - маршрутизация кадров по нескольким DBC
+import pytest
+
+from core.models import CommAddr, CommData
+from core.parser import FrameParser
+from core.processor import DBCProcessor
+from core.router import DBCRouter
+
+
+GEN1 = '''VERSION ""
+
+BO_ 100 Gen1Status: 8 Vector__XXX
+ SG_ Voltage : 0|16@1+ (0.1,0) [0|6553.5] "V" Vector__XXX
+
+BO_ 200 Gen1Counter: 8 Vector__XXX
+ SG_ Counter : 0|8@1+ (1,0) [0|255] "" Vector__XXX
+'''
+
+GEN2 = '''VERSION ""
+
+BO_ 100 Gen2Status: 8 Vector__XXX
+ SG_ Voltage : 0|16@1+ (0.01,0) [0|655.35] "V" Vector__XXX
+ SG_ Current : 16|16@1- (0.1,0) [-3276.8|3276.7] "A" Vector__XXX
+'''
+
+# Voltage = 10000, Current = -10 (сырые значения)
+PAYLOAD = bytes([0x10, 0x27, 0xF6, 0xFF, 0, 0, 0, 0])
+
+
+class TestDBCRouter:
+    @pytest.fixture
+    async def router(self, tmp_path):
+        (tmp_path / "gen1.dbc").write_text(GEN1)
+        (tmp_path / "gen2.dbc").write_text(GEN2)
+        router = DBCRouter(DBCProcessor(tmp_path / "gen1.dbc"))
+        router.add_database(
+            "gen2", DBCProcessor(tmp_path / "gen2.dbc"),
+            topics=["site/gen2"], device_ranges=[(16, 23)],
+        )
+        await router.initialize()
+        yield router
+        await router.close()
+
+    def test_dispatch_table(self, router):
+        """Правило топика сильнее правила адреса, без правил - база по умолчанию"""
+        gen2 = router.get("gen2")
+        assert router.route("", 16) is gen2 and router.route("", 23) is gen2
+        assert router.route("", 24) is router.default
+        assert router.route("site/gen2", 1) is gen2
+        assert router.route("other", 1) is router.default
+
+    def test_invalid_routes(self, router, tmp_path):
+        """Пересекающиеся адреса, повтор топика или имени - ошибка конфигурации"""
+        processor = DBCProcessor(tmp_path / "gen1.dbc")
+        with pytest.raises(ValueError, match="already routed"):
+            router.add_database("gen3", processor, device_ranges=[(20, 25)])
+        with pytest.raises(ValueError, match="already routed"):
+            router.add_database("gen3", processor, topics=["site/gen2"])
+        with pytest.raises(ValueError, match="Invalid"):
+            router.add_database("gen3", processor, device_ranges=[(30, 40)])
+        with pytest.raises(ValueError, match="Duplicate"):
+            router.add_database("gen2", processor)
+        with pytest.raises(KeyError):
+            router.get("gen3")
+
+    async def test_single_frame_routed(self, router):
+        """Один CAN ID - разные сообщения в зависимости от адреса"""
+        data = bytes([0x10, 0x27, 0, 0, 0, 0, 0, 0])
+        gen1 = await router.process_message(
+            CommData(frame_id=CommAddr(dev_addr=1, msg_id=100, reserved=0), data=data, crc16=0)
+        )
+        gen2 = await router.process_message(
+            CommData(frame_id=CommAddr(dev_addr=17, msg_id=100, reserved=0), data=data, crc16=0)
+        )
+        assert gen1.message_name == "Gen1Status" and gen1.signals["Voltage"] == pytest.approx(1000.0)
+        assert gen2.message_name == "Gen2Status" and gen2.signals["Voltage"] == pytest.approx(100.0)
+
+    async def test_mixed_batch(self, router, can_frame):
+        """Пакет с кадрами обеих баз: порядок и отброшенные кадры сохраняются"""
+        frames = [
+            can_frame(dev, msg, payload=PAYLOAD)
+            for dev, msg in [(1, 100), (17, 100), (2, 200), (18, 200)]
+        ]
+        frames.insert(2, frames[0][:-2] + b"\xFF\xFF")
+        topics = [""] * len(frames)
+        batch = await FrameParser().parse_batch(b"".join(frames))
+
+        assert router.route_batch(batch, topics).tolist() == [0, 1, 0, 0, 1]
+        parts = router.decode_frames(batch, topics)
+        assert len(parts) == 2
+        messages = router.build_messages(parts, topics)
+
+        assert [m and m.message_name for m in messages] == [
+            "Gen1Status", "Gen2Status", None, "Gen1Counter", "Unknown",
+        ]
+        assert messages[1].signals == {"Voltage": pytest.approx(100.0), "Current": pytest.approx(-1.0)}
+
+    async def test_topic_batch(self, router, can_frame):
+        """Пакет одного топика целиком уходит в его базу"""
+        frames = b"".join(can_frame(dev, 100, payload=PAYLOAD) for dev in range(4))
+        topics = ["site/gen2"] * 4
+        batch = await FrameParser().parse_batch(frames)
+
+        parts = router.decode_frames(batch, topics)
+        assert len(parts) == 1 and parts[0][0] is router.get("gen2")
+        assert {m.message_name for m in router.build_messages(parts, topics)} == {"Gen2Status"}
+        assert router.schema_for("site/gen2") is router.get("gen2").schema
+
+    async def test_reload_single_database(self, router):
+        """Перезагрузка одной базы не трогает остальные; версии словарей не совпадают"""
+        default_schema = router.default.schema
+        gen2 = router.get("gen2")
+        gen2.dbc_file.write_text(GEN2.replace("(0.01,0)", "(0.02,0)"))
+
+        diff = await router.reload("gen2")
+
+        assert diff.changed == {100}
+        assert router.default.schema is default_schema
+        assert gen2.schema.version != default_schema.version
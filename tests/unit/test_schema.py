@@ -0,0 +1,115 @@
+import math
+
+import pytest
+
+from core.processor import DBCProcessor
+from core.schema import KIND_FLOAT, KIND_INTEGER, KIND_UNSIGNED
+from interfaces.grpc.compact import CompactEncoder
+from interfaces.grpc.protocol import pb2
+from core.models import ParsedMessage
+
+DBC_CONTENT = '''VERSION ""
+
+BO_ 300 Second: 8 Vector__XXX
+ SG_ Raw : 0|64@1+ (1,0) [0|18446744073709551615] "" Vector__XXX
+
+BO_ 100 First: 8 Vector__XXX
+ SG_ Signed : 0|8@1- (1,0) [-128|127] "" Vector__XXX
+ SG_ Voltage : 8|16@1+ (0.1,0) [0|6553.5] "V" Vector__XXX
+ SG_ State : 24|2@1+ (1,0) [0|3] "" Vector__XXX
+
+BO_ 200 Mux: 8 Vector__XXX
+ SG_ Selector M : 0|8@1+ (1,0) [0|255] "" Vector__XXX
+ SG_ A m0 : 8|8@1+ (1,0) [0|255] "" Vector__XXX
+ SG_ B m1 : 8|8@1+ (1,0) [0|255] "" Vector__XXX
+
+BO_ 400 Scaled: 8 Vector__XXX
+ SG_ Mode : 0|8@1+ (2,10) [10|520] "" Vector__XXX
+ SG_ Level : 8|8@1+ (0.5,0) [0|127.5] "" Vector__XXX
+
+VAL_ 100 State 0 "Off" 1 "On" ;
+VAL_ 400 Mode 0 "Idle" ;
+VAL_ 400 Level 3 "Full" ;
+'''
+
+
+@pytest.fixture
+def dbc_content():
+    return DBC_CONTENT
+
+
+class TestDBCSchema:
+    def create_message(self, can_id, signals, parsed=True):
+        return ParsedMessage.model_construct(
+            device_address=7, packet_type="unicast", can_message_id=can_id,
+            message_name="", signals=signals, raw_payload="", crc16="0x0000",
+            crc_valid=True, timestamp="", parsed=parsed, source_topic="", error=None,
+        )
+
+    async def test_schema_layout(self, processor):
+        """Индексы по возрастанию CAN ID, типы сигналов совпадают с декодером"""
+        schema = processor.schema
+        assert schema.version == 1
+        assert [schema.messages[i].index for i in (100, 200, 300)] == [0, 1, 2]
+
+        first = schema.messages[100]
+        assert [s.kind for s in first.signals] == [KIND_INTEGER, KIND_FLOAT, KIND_UNSIGNED]
+        assert first.signals[1].unit == "V"
+        assert first.signals[2].choices == {0: "Off", 1: "On"}
+        # Мультиплексор декодируется cantools - все сигналы float
+        assert {s.kind for s in schema.messages[200].signals} == {KIND_FLOAT}
+        assert schema.messages[300].signals[0].kind == KIND_UNSIGNED
+
+    async def test_uninitialized(self, tmp_path):
+        with pytest.raises(RuntimeError):
+            DBCProcessor(tmp_path / "missing.dbc").schema
+
+    async def test_compact_encoding(self, processor):
+        """Значения упакованы в порядке схемы, словарь - только в первом ответе"""
+        from cantools.database.namedsignalvalue import NamedSignalValue
+
+        encoder = CompactEncoder()
+        messages = [
+            self.create_message(100, {"Signed": -3, "Voltage": 51.4, "State": NamedSignalValue(1, "On")}),
+            None,
+            self.create_message(300, {"Raw": (1 << 64) - 1}),
+            self.create_message(200, {"Selector": 1, "B": 5}),
+            self.create_message(999, {}, parsed=False),
+        ]
+
+        batch = encoder.encode(processor.schema, messages)
+
+        assert batch.HasField("schema")
+        assert batch.schema.version == 1
+        assert list(batch.status) == [
+            pb2.FRAME_DECODED, pb2.FRAME_REJECTED, pb2.FRAME_DECODED,
+            pb2.FRAME_DECODED, pb2.FRAME_UNKNOWN,
+        ]
+        assert list(batch.message_index) == [0, 2, 1]
+        assert list(batch.device_address) == [7, 7, 7]
+        assert list(batch.integers) == [-3, 1, -1]
+        assert batch.values[0] == 51.4
+        # Mux: Selector, A, B - сигнал A отсутствует при Selector=1
+        assert batch.values[1] == 1.0
+        assert math.isnan(batch.values[2])
+        assert batch.values[3] == 5.0
+
+        again = encoder.encode(processor.schema, messages[:1])
+        assert not again.HasField("schema")
+
+    async def test_compact_choice_physical(self, processor):
+        """Метка VAL_ передаётся физическим значением; масштаб - в словаре"""
+        from cantools.database.namedsignalvalue import NamedSignalValue
+
+        message = self.create_message(
+            400, {"Mode": NamedSignalValue(0, "Idle"), "Level": NamedSignalValue(3, "Full")}
+        )
+        batch = CompactEncoder().encode(processor.schema, [message])
+
+        assert list(batch.integers) == [10]
+        assert list(batch.values) == [1.5]
+        mode, level = batch.schema.messages[3].signals
+        assert (mode.scale, mode.offset, dict(mode.choices)) == (2, 10, {0: "Idle"})
+        assert (level.scale, level.offset) == (0.5, 0)
+        # Ключ метки восстанавливается из значения по масштабу словаря
+        assert level.choices[int((batch.values[0] - level.offset) / level.scale)] == "Full"
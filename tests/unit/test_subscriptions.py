@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from cantools.database.namedsignalvalue import NamedSignalValue
+
+from core.models import ParsedMessageRecord
+from core.schema import DBCSchema, MessageInfo, SignalInfo
+from core.subscriptions import SignalRange, Subscription
+
+
+def create_message(dev_addr=1, can_id=100, **signals):
+    return ParsedMessageRecord(dev_addr, can_id, "TestMessage", signals, bytes(8), 0)
+
+
+class TestSubscription:
+    def test_frame_filters(self, can_frame):
+        """Адреса и CAN ID: скалярная проверка и маска пакета совпадают"""
+        subscription = Subscription(dev_addrs=[1, 3], can_ids=[100])
+        pairs = [(1, 100), (2, 100), (3, 100), (1, 200), (31, 2047)]
+
+        expected = [True, False, True, False, False]
+        assert [subscription.accepts(*pair) for pair in pairs] == expected
+        assert [subscription.accepts_frame(can_frame(*pair, value=0)) for pair in pairs] == expected
+
+        dev_addr = np.array([p[0] for p in pairs], dtype=np.uint16)
+        msg_id = np.array([p[1] for p in pairs], dtype=np.uint16)
+        assert subscription.frame_mask(dev_addr, msg_id).tolist() == expected
+        frames = b"".join(can_frame(*pair, value=0) for pair in pairs)
+        assert subscription.buffer_mask(frames).tolist() == expected
+
+    def test_no_frame_filter(self):
+        """Без адресов и CAN ID маски нет - подходят все кадры"""
+        subscription = Subscription(signals=["Signal1"])
+
+        assert not subscription.filters_frames
+        assert subscription.frame_mask(np.zeros(3, np.uint16), np.zeros(3, np.uint16)) is None
+        assert subscription.accepts(5, 700)
+        assert subscription.signals == frozenset({"Signal1"})
+
+    def test_ranges(self):
+        """Предикат применяется только к сигналам, которые есть в кадре"""
+        subscription = Subscription(
+            signals=["Signal1"], ranges=[SignalRange("Signal2", min=10.0, max=20.0)]
+        )
+
+        assert subscription.admit(create_message(Signal1=1, Signal2=15.0))
+        assert not subscription.admit(create_message(Signal1=1, Signal2=25.0))
+        assert not subscription.admit(create_message(Signal1=1, Signal2=5.0))
+        assert subscription.admit(create_message(Status=3))
+
+    def test_ranges_on_choices(self):
+        """Значения VAL_ сравниваются в физических единицах по словарю базы"""
+        mode = SignalInfo("Mode", "", "integer", {4: "Run"}, scale=0.5, offset=10)
+        schema = DBCSchema(1, {100: MessageInfo(0, 100, "TestMessage", (mode,))})
+        subscription = Subscription(
+            ranges=[SignalRange("Mode", min=11.0, max=13.0)], schema=lambda message: schema
+        )
+
+        # raw 4 -> 4 * 0.5 + 10 = 12.0
+        assert subscription.admit(create_message(Mode=NamedSignalValue(4, "Run")))
+        assert not subscription.admit(create_message(Mode=NamedSignalValue(8, "Stop")))
+        # Без словаря - по сырому значению
+        assert not Subscription(ranges=[SignalRange("Mode", min=11.0)]).admit(
+            create_message(Mode=NamedSignalValue(4, "Run"))
+        )
+
+    def test_deadband(self):
+        """Только изменения: состояние отдельно для каждой пары (dev_addr, can_id)"""
+        subscription = Subscription(signals=["Signal2"], deadband=0.5)
+
+        assert subscription.admit(create_message(Signal2=10.0))
+        assert not subscription.admit(create_message(Signal2=10.4))
+        assert subscription.admit(create_message(dev_addr=2, Signal2=10.4))
+        assert subscription.admit(create_message(Signal2=10.6))
+        assert not subscription.admit(create_message(Signal1=7, Signal2=10.6))
+
+    @pytest.mark.parametrize("deadband", [0.0, None])
+    def test_zero_deadband(self, deadband):
+        """deadband=0 - любое изменение, без deadband - все кадры"""
+        subscription = Subscription(deadband=deadband)
+
+        assert subscription.admit(create_message(Signal1=1))
+        assert subscription.admit(create_message(Signal1=1)) is (deadband is None)
+        assert subscription.admit(create_message(Signal1=2))
+
+    def test_apply(self, can_frame):
+        """apply заменяет отфильтрованные результаты на None и возвращает флаги"""
+        subscription = Subscription(can_ids=[100], ranges=[SignalRange("Signal1", max=5)])
+        frames = b"".join(can_frame(1, msg_id, value=0) for msg_id in (100, 200, 100, 100))
+        messages = [create_message(Signal1=1), create_message(can_id=200), None, create_message(Signal1=9)]
+
+        filtered = subscription.apply(frames, messages)
+
+        assert filtered == [False, True, False, True]
+        assert messages[1:] == [None, None, None]
+        assert messages[0] is not None